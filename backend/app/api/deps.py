@@ -1,40 +1,98 @@
+import secrets
 from typing import Generator, Optional
 from jose import JWTError, jwt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from app.core.config import settings
+from app.core.principal_cache import principal_cache
+from app.core.revocation import revocation_list
 from app.core.security import verify_password
 from app.models.user import User
 from app.schemas.user import TokenData
-from app.core.database import get_db
+from app.core.database import get_async_db, get_db
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login", auto_error=False)
 
-def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
-) -> User:
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def decode_access_token(token: str) -> dict:
+    """Validate an access token and return its claims"""
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        token_data = TokenData(username=username)
     except JWTError:
+        raise _credentials_exception()
+    if payload.get("sub") is None or payload.get("typ") != "access" or not payload.get("jti"):
+        raise _credentials_exception()
+    return payload
+
+def get_current_user(
+    request: Request,
+    db: Session = Depends(get_db),
+    token: str = Depends(oauth2_scheme)
+) -> User:
+    credentials_exception = _credentials_exception()
+    payload = decode_access_token(token)
+    subject: str = payload["sub"]
+    try:
+        token_data = TokenData(user_id=int(subject), is_active=payload.get("act", False))
+    except ValueError:
         raise credentials_exception
     
-    user = db.query(User).filter(User.username == token_data.username).first()
+    # Logged out or revoked; answered from memory
+    if revocation_list.is_revoked(payload["jti"]):
+        raise credentials_exception
+    
+    # Inactive at issue time: reject without a lookup
+    if not token_data.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    
+    # Picked up by the access log
+    request.state.user_id = token_data.user_id
+    
+    # Most requests are served from the cache without touching the DB
+    user = principal_cache.get(subject)
+    if user is not None:
+        return user
+    
+    user = db.query(User).filter(User.id == token_data.user_id).first()
     if user is None:
         raise credentials_exception
-    return user
+    return principal_cache.set(subject, user)
+
+def get_optional_user(
+    request: Request,
+    db: Session = Depends(get_db),
+    token: Optional[str] = Depends(optional_oauth2_scheme)
+) -> Optional[User]:
+    """The signed-in user on public endpoints; None when anonymous or the token is unusable"""
+    if not token:
+        return None
+    try:
+        user = get_current_user(request, db, token)
+    except HTTPException:
+        return None
+    return user if user.is_active else None
 
 def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
+
+def get_current_active_superuser(current_user: User = Depends(get_current_active_user)) -> User:
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required")
+    return current_user
+
+def require_metrics_token(token: Optional[str] = Depends(optional_oauth2_scheme)) -> None:
+    """Bearer check for scrapers against the static METRICS_SCRAPE_TOKEN; no user lookup"""
+    if not settings.METRICS_SCRAPE_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not token or not secrets.compare_digest(token.encode(), settings.METRICS_SCRAPE_TOKEN.encode()):
+        raise _credentials_exception()
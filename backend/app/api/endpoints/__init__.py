@@ -2,5 +2,7 @@ from .auth import router as auth_router
 from .books import router as books_router
 from .dictionary import router as dictionary_router
 from .reading import router as reading_router
+from .export import router as export_router
+from .admin import router as admin_router
 
-__all__ = ["auth_router", "books_router", "dictionary_router", "reading_router"]
\ No newline at end of file
+__all__ = ["auth_router", "books_router", "dictionary_router", "reading_router", "export_router", "admin_router"]
\ No newline at end of file
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from app.api.deps import get_current_active_superuser
+from app.core.config import settings
+from app.core.profiling import create_profiling_token, profile_store
+from app.models.user import User
+
+router = APIRouter()
+
+@router.post("/profiling-token")
+def issue_profiling_token(current_user: User = Depends(get_current_active_superuser)):
+    """Token to send as X-Profile-Token (or ?__profile=) on a request to profile it"""
+    return {
+        "token": create_profiling_token(current_user.id),
+        "expires_in": settings.PROFILING_TOKEN_EXPIRE_MINUTES * 60
+    }
+
+@router.get("/profiles/slowest")
+def slowest_requests(current_user: User = Depends(get_current_active_superuser)):
+    """Slowest recent requests, slowest first"""
+    return profile_store.slowest()
+
+@router.get("/profiles/{profile_id}")
+def get_profile(profile_id: str, current_user: User = Depends(get_current_active_superuser)):
+    """Request metadata plus folded stacks (flamegraph.pl / speedscope input)"""
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return profile
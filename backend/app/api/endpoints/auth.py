@@ -1,31 +1,36 @@
-from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from app.core.config import settings
-from app.core.security import create_access_token, get_password_hash, verify_password
-from app.api.deps import get_db, get_current_active_user
+from app.core.security import password_hasher, HashingPoolSaturated
+from app.core.login_throttle import login_throttle
+from app.core.revocation import revocation_list
+from app.api.deps import get_db, get_current_active_user, decode_access_token, oauth2_scheme
 from app.models.user import User as UserModel
-from app.schemas.user import UserCreate, User as UserSchema, Token
+from app.schemas.user import UserCreate, User as UserSchema, Token, RefreshRequest, LogoutRequest
+from app.services.token_service import TokenService, InvalidRefreshToken
 
 router = APIRouter()
 
-@router.post("/register", response_model=UserSchema)
-def register(user_in: UserCreate, db: Session = Depends(get_db)):
-    user = db.query(UserModel).filter(
-        (UserModel.email == user_in.email) | (UserModel.username == user_in.username)
+def _hashing_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Authentication is busy, please retry shortly",
+        headers={"Retry-After": "1"}
+    )
+
+def _find_existing_user(db: Session, email: str, username: str):
+    return db.query(UserModel).filter(
+        (UserModel.email == email) | (UserModel.username == username)
     ).first()
-    if user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, 
-            detail="User with this email or username already exists"
-        )
-    
+
+def _create_user(db: Session, user_in: UserCreate, hashed_password: str) -> UserModel:
     new_user = UserModel(
         email=user_in.email,
         username=user_in.username,
-        hashed_password=get_password_hash(user_in.password),
+        hashed_password=hashed_password,
         is_active=True
     )
     db.add(new_user)
@@ -33,19 +38,100 @@ def register(user_in: UserCreate, db: Session = Depends(get_db)):
     db.refresh(new_user)
     return new_user
 
+def _get_user_by_username(db: Session, username: str):
+    return db.query(UserModel).filter(UserModel.username == username).first()
+
+def _complete_login(db: Session, user: UserModel, new_hash: str = None) -> dict:
+    # Transparently move the stored hash to the configured bcrypt cost
+    if new_hash:
+        user.hashed_password = new_hash
+    tokens, _ = TokenService.issue_tokens(db, user)
+    db.commit()
+    return tokens
+
+# Auth endpoints are async so bcrypt runs on the dedicated hashing pool;
+# the short DB calls go to the regular threadpool.
+@router.post("/register", response_model=UserSchema)
+async def register(user_in: UserCreate, db: Session = Depends(get_db)):
+    user = await run_in_threadpool(_find_existing_user, db, user_in.email, user_in.username)
+    if user:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User with this email or username already exists"
+        )
+
+    try:
+        hashed_password = await password_hasher.hash(user_in.password)
+    except HashingPoolSaturated:
+        raise _hashing_busy()
+
+    return await run_in_threadpool(_create_user, db, user_in, hashed_password)
+
+def _login_throttled(retry_after: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many login attempts, please retry later",
+        headers={"Retry-After": str(retry_after)}
+    )
+
 @router.post("/login", response_model=Token)
-def login(db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()):
-    user = db.query(UserModel).filter(UserModel.username == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+async def login(request: Request, db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()):
+    # Throttle before the user lookup and bcrypt so stuffing costs us nothing
+    client_ip = request.client.host if request.client else "unknown"
+    retry_after = login_throttle.acquire(form_data.username, client_ip)
+    if retry_after:
+        raise _login_throttled(retry_after)
+
+    user = await run_in_threadpool(_get_user_by_username, db, form_data.username)
+    if not user:
+        login_throttle.record_failure(form_data.username, client_ip)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect username or password"
+        )
+
+    try:
+        valid, new_hash = await password_hasher.verify_and_update(form_data.password, user.hashed_password)
+    except HashingPoolSaturated:
+        raise _hashing_busy()
+
+    if not valid:
+        login_throttle.record_failure(form_data.username, client_ip)
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, 
+            status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password"
         )
-    
-    expiry = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    token = create_access_token(data={"sub": user.username}, expires_delta=expiry)
-    return {"access_token": token, "token_type": "bearer"}
+
+    login_throttle.record_success(form_data.username, client_ip)
+    return await run_in_threadpool(_complete_login, db, user, new_hash)
+
+@router.post("/refresh", response_model=Token)
+def refresh(request_in: RefreshRequest, db: Session = Depends(get_db)):
+    """Exchange a refresh token for a new token pair (no password needed)"""
+    try:
+        return TokenService.rotate(db, request_in.refresh_token)
+    except InvalidRefreshToken:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+@router.post("/logout")
+def logout(
+    logout_in: LogoutRequest = None,
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    """Revoke the presented access token and, if given, its refresh token family"""
+    payload = decode_access_token(token)
+    revocation_list.revoke(db, payload["jti"], current_user.id, datetime.utcfromtimestamp(payload["exp"]))
+    if logout_in and logout_in.refresh_token:
+        TokenService.revoke_refresh_token(db, logout_in.refresh_token, current_user.id)
+    db.commit()
+    return {"status": "success"}
 
 @router.get("/me", response_model=UserSchema)
 def get_me(current_user: UserModel = Depends(get_current_active_user)):
-    return current_user
\ No newline at end of file
+    return current_user
@@ -1,27 +1,46 @@
 import os, aiofiles, uuid
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, BackgroundTasks, Form, status
-from sqlalchemy.orm import Session
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, BackgroundTasks, Form, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, undefer
 from pypdf import PdfReader
-from app.api.deps import get_db, get_current_active_user
+from app.api.deps import get_async_db, get_db, get_current_active_user
+from app.core.cache import (
+    Validator, cached_json_response, make_state_etag, not_modified, response_cache, rows_validator, validator_headers
+)
+from app.core.database import SessionLocal
+from app.core.metrics import pdf_parse_duration
+from app.core.pagination import keyset_paginate, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from app.models.book import Book as BookModel
+from app.schemas.book import Book as BookSchema, BookSummary
+from app.schemas.responses import PaginatedResponse
 
 router = APIRouter()
+# Library listings select exactly the columns BookSummary renders
+SUMMARY_COLUMNS = [getattr(BookModel, name) for name in BookSummary.model_fields]
 UPLOAD_DIR = "storage/pdfs"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-def process_pdf(book_id: int, db: Session):
-    book = db.query(BookModel).filter(BookModel.id == book_id).first()
-    if not book:
-        return
+def process_pdf(book_id: int):
+    # Runs in the threadpool after the response, with its own session
+    db = SessionLocal()
     try:
-        reader = PdfReader(book.file_path)
-        book.total_pages = len(reader.pages)
-        book.status = "completed"
-    except Exception as e:
-        print(f"Error processing PDF: {e}")
-        book.status = "failed"
+        book = db.query(BookModel).filter(BookModel.id == book_id).first()
+        if not book:
+            return
+        try:
+            with pdf_parse_duration.labels("page_count").time():
+                reader = PdfReader(book.file_path)
+                book.total_pages = len(reader.pages)
+            book.status = "completed"
+        except Exception as e:
+            print(f"Error processing PDF: {e}")
+            book.status = "failed"
+        finally:
+            db.commit()
+            response_cache.invalidate(book.owner_id)
     finally:
-        db.commit()
+        db.close()
 
 @router.post("/upload")
 async def upload_book(
@@ -29,7 +48,7 @@ async def upload_book(
     title: str = Form(None),
     author: str = Form(None),
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_active_user)
 ):
     if not file.filename.lower().endswith('.pdf'):
@@ -56,10 +75,11 @@ async def upload_book(
     )
     
     db.add(db_book)
-    db.commit()
-    db.refresh(db_book)
+    await db.commit()
+    await db.refresh(db_book)
+    response_cache.invalidate(current_user.id)
     
-    background_tasks.add_task(process_pdf, db_book.id, db)
+    background_tasks.add_task(process_pdf, db_book.id)
     
     return {
         "id": db_book.id, 
@@ -73,37 +93,83 @@ async def upload_book(
         "status": db_book.status
     }
 
-@router.get("/")
-def list_books(db: Session = Depends(get_db), current_user = Depends(get_current_active_user)):
-    return db.query(BookModel).filter(BookModel.owner_id == current_user.id).all()
+@router.get("/", response_model=PaginatedResponse)
+def list_books(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+):
+    # Plain rows, no ORM identity map or text: the listing only renders them
+    query = db.query(*SUMMARY_COLUMNS).filter(BookModel.owner_id == current_user.id)
+    return cached_json_response(
+        request, current_user.id, "books",
+        lambda: keyset_paginate(query, BookModel, BookSummary, cursor, limit),
+        validator=lambda: rows_validator(db, BookModel, BookModel.owner_id == current_user.id)
+    )
+
+@router.get("/{book_id}", response_model=BookSchema)
+def get_book(request: Request, book_id: int, db: Session = Depends(get_db), current_user = Depends(get_current_active_user)):
+    owned = (BookModel.id == book_id, BookModel.owner_id == current_user.id)
 
-@router.get("/{book_id}")
-def get_book(book_id: int, db: Session = Depends(get_db), current_user = Depends(get_current_active_user)):
-    book = db.query(BookModel).filter(BookModel.id == book_id, BookModel.owner_id == current_user.id).first()
-    if not book: raise HTTPException(404, "Book not found")
-    return book
+    def validator():
+        # Only the timestamp is read; the text is loaded when the client is stale
+        row = db.query(BookModel.updated_at).filter(*owned).first()
+        if row is None: raise HTTPException(404, "Book not found")
+        return Validator((str(row.updated_at),), row.updated_at)
 
-@router.put("/{book_id}")
+    def build():
+        book = db.query(BookModel).options(undefer(BookModel.content)).filter(*owned).first()
+        if not book: raise HTTPException(404, "Book not found")
+        return BookSchema.model_validate(book)
+
+    # The body can be megabytes of text, so only the validator is cached
+    return cached_json_response(request, current_user.id, f"book:{book_id}", build, validator=validator, store_body=False)
+
+@router.put("/{book_id}", response_model=BookSummary)
 def update_book(book_id: int, data: dict, db: Session = Depends(get_db), current_user = Depends(get_current_active_user)):
-    book = db.query(BookModel).filter(BookModel.id == book_id, BookModel.owner_id == current_user.id).first()
-    if not book: raise HTTPException(404, "Book not found")
-    for key, val in data.items(): setattr(book, key, val)
+    # Ownership is checked and the update applied without loading the text
+    if not db.query(BookModel.id).filter(BookModel.id == book_id, BookModel.owner_id == current_user.id).first():
+        raise HTTPException(404, "Book not found")
+    values = {key: val for key, val in data.items() if key in BookModel.__table__.columns and key not in ("id", "owner_id")}
+    if values:
+        db.query(BookModel).filter(BookModel.id == book_id).update(values, synchronize_session=False)
     db.commit()
-    return book
+    response_cache.invalidate(current_user.id)
+    return BookSummary.model_validate(db.query(*SUMMARY_COLUMNS).filter(BookModel.id == book_id).one())
 
 @router.delete("/{book_id}")
 def delete_book(book_id: int, db: Session = Depends(get_db), current_user = Depends(get_current_active_user)):
-    book = db.query(BookModel).filter(BookModel.id == book_id, BookModel.owner_id == current_user.id).first()
+    book = db.query(BookModel.file_path).filter(BookModel.id == book_id, BookModel.owner_id == current_user.id).first()
     if not book: raise HTTPException(404, "Book not found")
-    
+
     # Clean up file from storage
     if os.path.exists(book.file_path):
         os.remove(book.file_path)
-        
-    db.delete(book)
+
+    db.query(BookModel).filter(BookModel.id == book_id).delete(synchronize_session=False)
     db.commit()
+    response_cache.invalidate(current_user.id)
     return {"status": "success"}
 
 @router.get("/{book_id}/page/{page_num}")
-def get_page_text(book_id: int, page_num: int):
+def get_page_text(
+    request: Request,
+    response: Response,
+    book_id: int,
+    page_num: int,
+    current_user = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    # Re-uploading or re-parsing the book moves updated_at, so the page's
+    # validator follows the row rather than the URL
+    book = db.query(BookModel.updated_at).filter(
+        BookModel.id == book_id, BookModel.owner_id == current_user.id
+    ).first()
+    if not book: raise HTTPException(404, "Book not found")
+    etag = make_state_etag(f"page:{book_id}:{page_num}", (str(book.updated_at),))
+    if not_modified(request, etag, book.updated_at):
+        return Response(status_code=304, headers=validator_headers(etag, book.updated_at))
+    response.headers.update(validator_headers(etag, book.updated_at))
     return {"text": "Sample page content", "page_number": page_num}
\ No newline at end of file
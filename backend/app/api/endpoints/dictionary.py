@@ -1,7 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.api.deps import get_current_active_user, get_db
+from typing import Optional
+from app.api.deps import get_async_db, get_current_active_user, get_db
+from app.core.cache import Validator, cached_json_response, response_cache, rows_validator
+from app.core.pagination import keyset_paginate, MAX_PAGE_SIZE
 from app.models.user import User
 from app.models.dictionary import DictionaryEntry
 from app.schemas.dictionary import (
@@ -10,6 +15,7 @@ from app.schemas.dictionary import (
     DictionaryEntryUpdate,
     WordLookup
 )
+from app.schemas.responses import PaginatedResponse
 from app.services.dictionary_service import DictionaryService
 
 router = APIRouter()
@@ -36,14 +42,16 @@ async def lookup_word(
 async def create_dictionary_entry(
     entry_in: DictionaryEntryCreate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Save word to personal dictionary"""
     # Check if word already exists for user
-    existing_entry = db.query(DictionaryEntry).filter(
-        DictionaryEntry.user_id == current_user.id,
-        DictionaryEntry.word == entry_in.word
-    ).first()
+    existing_entry = (await db.execute(
+        select(DictionaryEntry.id).where(
+            DictionaryEntry.user_id == current_user.id,
+            DictionaryEntry.word == entry_in.word
+        ).limit(1)
+    )).first()
     
     if existing_entry:
         raise HTTPException(
@@ -66,35 +74,42 @@ async def create_dictionary_entry(
                 
                 entry_in.part_of_speech = first_meaning.get("partOfSpeech", "")
     
-    # Create entry
+    # Create entry; page_number, audio_url and examples have no columns
     db_entry = DictionaryEntry(
         user_id=current_user.id,
         word=entry_in.word,
         definition=entry_in.definition,
         context=entry_in.context,
         book_id=entry_in.book_id,
-        page_number=entry_in.page_number,
         phonetic=entry_in.phonetic,
-        audio_url=entry_in.audio_url,
-        part_of_speech=entry_in.part_of_speech,
-        examples=entry_in.examples or []
+        part_of_speech=entry_in.part_of_speech
     )
     
     db.add(db_entry)
-    db.commit()
-    db.refresh(db_entry)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Lost a race with a concurrent save of the same word
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Word already in dictionary"
+        )
+    await db.refresh(db_entry)
+    response_cache.invalidate(current_user.id)
     
     return db_entry
 
-@router.get("/", response_model=List[DictionaryEntrySchema])
+@router.get("/", response_model=PaginatedResponse)
 def list_dictionary_entries(
-    skip: int = 0,
-    limit: int = 100,
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     mastered: Optional[int] = None,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """List dictionary entries for current user"""
+    """List dictionary entries for current user, newest first"""
     query = db.query(DictionaryEntry).filter(
         DictionaryEntry.user_id == current_user.id
     )
@@ -102,31 +117,49 @@ def list_dictionary_entries(
     if mastered is not None:
         query = query.filter(DictionaryEntry.mastered == mastered)
     
-    entries = query.order_by(
-        DictionaryEntry.created_at.desc()
-    ).offset(skip).limit(limit).all()
-    
-    return entries
+    return cached_json_response(
+        request,
+        current_user.id,
+        "dictionary",
+        lambda: keyset_paginate(query, DictionaryEntry, DictionaryEntrySchema, cursor, limit),
+        validator=lambda: rows_validator(db, DictionaryEntry, DictionaryEntry.user_id == current_user.id)
+    )
 
 @router.get("/{entry_id}", response_model=DictionaryEntrySchema)
 def get_dictionary_entry(
+    request: Request,
     entry_id: int,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Get dictionary entry by ID"""
-    entry = db.query(DictionaryEntry).filter(
-        DictionaryEntry.id == entry_id,
-        DictionaryEntry.user_id == current_user.id
-    ).first()
+    owned = (DictionaryEntry.id == entry_id, DictionaryEntry.user_id == current_user.id)
     
-    if not entry:
-        raise HTTPException(
+    def not_found():
+        return HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Dictionary entry not found"
         )
     
-    return entry
+    def validator():
+        row = db.query(DictionaryEntry.updated_at).filter(*owned).first()
+        if row is None:
+            raise not_found()
+        return Validator((str(row.updated_at),), row.updated_at)
+    
+    def build():
+        entry = db.query(DictionaryEntry).filter(*owned).first()
+        if not entry:
+            raise not_found()
+        return DictionaryEntrySchema.model_validate(entry)
+    
+    return cached_json_response(
+        request,
+        current_user.id,
+        f"dictionary:{entry_id}",
+        build,
+        validator=validator
+    )
 
 @router.put("/{entry_id}", response_model=DictionaryEntrySchema)
 def update_dictionary_entry(
@@ -154,6 +187,7 @@ def update_dictionary_entry(
     
     db.commit()
     db.refresh(entry)
+    response_cache.invalidate(current_user.id)
     
     return entry
 
@@ -177,5 +211,6 @@ def delete_dictionary_entry(
     
     db.delete(entry)
     db.commit()
+    response_cache.invalidate(current_user.id)
     
     return {"message": "Dictionary entry deleted successfully"}
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, BackgroundTasks
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional
 import logging
 import uuid
@@ -11,6 +12,7 @@ from app.models.user import User
 from app.models.book import Book
 from app.schemas.responses import StandardResponse, FileUploadResponse, ProcessingStatusResponse
 from app.services.enhanced_pdf_service import EnhancedPDFService
+from app.core.cache import response_cache
 from app.core.logging import request_logger
 
 router = APIRouter()
@@ -34,7 +36,10 @@ async def upload_book_enhanced(
         logger.info(f"Starting enhanced upload for user {current_user.id}")
         
         # Save and validate PDF
-        file_path, filename, error = EnhancedPDFService.save_pdf_with_validation(file, current_user.id)
+        # Copying, validating and hashing the upload all block; keep them off the event loop
+        file_path, filename, error = await run_in_threadpool(
+            EnhancedPDFService.save_pdf_with_validation, file, current_user.id
+        )
         
         if error:
             raise HTTPException(
@@ -84,7 +89,7 @@ async def upload_book_enhanced(
             detail=f"Upload failed: {str(e)}"
         )
 
-async def process_book_upload(
+def process_book_upload(
     job_id: str,
     file_path: str,
     filename: str,
@@ -94,7 +99,7 @@ async def process_book_upload(
     user_id: int,
     db: Session
 ):
-    """Background task to process book upload"""
+    """Background task to process book upload (sync, so it runs in the threadpool)"""
     try:
         processing_status[job_id]["progress"] = 10
         
@@ -125,6 +130,7 @@ async def process_book_upload(
         db.add(db_book)
         db.commit()
         db.refresh(db_book)
+        response_cache.invalidate(user_id)
         
         processing_status[job_id]["progress"] = 80
         
@@ -189,9 +195,9 @@ def get_enhanced_page_text(
     db: Session = Depends(get_db)
 ):
     """Get page text with surrounding context"""
-    book = db.query(Book).filter(
+    book = db.query(Book.file_path).filter(
         Book.id == book_id,
-        Book.user_id == current_user.id
+        Book.owner_id == current_user.id
     ).first()
     
     if not book:
@@ -225,9 +231,9 @@ def get_book_file_info(
     db: Session = Depends(get_db)
 ):
     """Get comprehensive file information"""
-    book = db.query(Book).filter(
+    book = db.query(Book.file_path).filter(
         Book.id == book_id,
-        Book.user_id == current_user.id
+        Book.owner_id == current_user.id
     ).first()
     
     if not book:
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from typing import Literal
+from app.api.deps import get_current_active_user
+from app.models.user import User
+from app.services.export_service import ExportService, EXPORT_TABLES, EXPORT_FORMATS
+
+router = APIRouter()
+
+@router.get("/{table}")
+def export_table(
+    table: str,
+    format: Literal["arrow", "parquet"] = "arrow",
+    all_users: bool = False,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Stream the user's rows (or, for admins, everyone's) as a columnar file"""
+    if table not in EXPORT_TABLES:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown export table '{table}'"
+        )
+    
+    if all_users and not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required"
+        )
+    
+    media_type, extension = EXPORT_FORMATS[format]
+    user_id = None if all_users else current_user.id
+    
+    return StreamingResponse(
+        ExportService.stream(table, format, user_id=user_id),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{table}.{extension}"'}
+    )
@@ -1,17 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Literal, Optional
 from datetime import datetime, timedelta
-from app.api.deps import get_current_active_user, get_db
+from app.api.deps import get_current_active_user, get_db, get_optional_user
+from app.core.cache import Validator, cached_json_response, response_cache, rows_validator
+from app.core.pagination import keyset_paginate, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from app.models.user import User
 from app.models.reading_session import ReadingSession
 from app.models.book import Book
+from app.schemas.responses import PaginatedResponse
 from app.schemas.reading_session import (
     ReadingSession as ReadingSessionSchema,
     ReadingSessionCreate,
     ReadingSessionUpdate,
-    ReadingStats
+    ReadingStats,
+    ReadingActivity,
+    ReadingHeartbeat,
+    ReadingEta
 )
+from app.services.activity_service import ActivityService
+from app.services.reading_speed_service import ReadingSpeedService
+from app.services.progress_buffer import progress_buffer
 
 router = APIRouter()
 
@@ -23,12 +33,12 @@ def create_reading_session(
 ):
     """Start a new reading session"""
     # Verify book belongs to user
-    book = db.query(Book).filter(
+    owned = db.query(Book.id).filter(
         Book.id == session_in.book_id,
-        Book.user_id == current_user.id
+        Book.owner_id == current_user.id
     ).first()
     
-    if not book:
+    if not owned:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Book not found"
@@ -44,8 +54,24 @@ def create_reading_session(
     )
     
     db.add(db_session)
+    
+    # A session logged with an end page is already finished; ending it
+    # here keeps a later PUT from counting it again
+    if session_in.end_page is not None:
+        db_session.ended_at = datetime.utcnow()
+        ReadingSpeedService.record_session(
+            db,
+            current_user.id,
+            session_in.book_id,
+            session_in.end_page - (session_in.start_page or 1),
+            session_in.duration_minutes
+        )
+    
     db.commit()
     db.refresh(db_session)
+    response_cache.invalidate(current_user.id)
+    if db_session.ended_at is None:
+        progress_buffer.open_session(db_session.id, current_user.id, db_session.book_id)
     
     return db_session
 
@@ -73,62 +99,142 @@ def update_reading_session(
     for field, value in update_data.items():
         setattr(session, field, value)
     
+    # Fold the session into the speed estimate the first time it is ended;
+    # end_page alone can't tell, heartbeats have been writing it all along
+    if session_update.end_page and session.ended_at is None:
+        session.ended_at = datetime.utcnow()
+        ReadingSpeedService.record_session(
+            db,
+            current_user.id,
+            session.book_id,
+            session_update.end_page - (session.start_page or 1),
+            session.duration_minutes,
+            session.words_saved
+        )
+    
     # Update book progress if end_page is provided
     if session_update.end_page:
-        book = db.query(Book).filter(
+        total_pages = db.query(Book.total_pages).filter(
             Book.id == session.book_id,
-            Book.user_id == current_user.id
-        ).first()
+            Book.owner_id == current_user.id
+        ).scalar()
         
-        if book and book.total_pages > 0:
-            book.current_page = session_update.end_page
-            book.progress = min(100.0, (session_update.end_page / book.total_pages) * 100)
+        if total_pages and total_pages > 0:
+            # A buffered heartbeat is older than this write
+            progress_buffer.discard(current_user.id, session.book_id)
+            db.query(Book).filter(Book.id == session.book_id).update({
+                Book.current_page: session_update.end_page,
+                Book.progress: min(100.0, (session_update.end_page / total_pages) * 100)
+            }, synchronize_session=False)
     
     db.commit()
     db.refresh(session)
+    response_cache.invalidate(current_user.id)
+    if session.ended_at is not None:
+        progress_buffer.close_session(session.id)
     
     return session
 
-@router.get("/sessions", response_model=List[ReadingSessionSchema])
+@router.post("/heartbeat", status_code=status.HTTP_202_ACCEPTED)
+def record_heartbeat(
+    heartbeat: ReadingHeartbeat,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Record reading progress; written to the database in batches"""
+    if heartbeat.session_id is not None and not progress_buffer.is_open_session(
+        heartbeat.session_id, current_user.id, heartbeat.book_id
+    ):
+        # Sessions started on another worker or before a restart are looked
+        # up once, so a bad id is reported to the client instead of silently
+        # matching nothing at flush time
+        session = db.query(ReadingSession.ended_at).filter(
+            ReadingSession.id == heartbeat.session_id,
+            ReadingSession.user_id == current_user.id,
+            ReadingSession.book_id == heartbeat.book_id
+        ).first()
+        if not session:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Reading session not found"
+            )
+        if session.ended_at is not None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Reading session has already ended"
+            )
+        progress_buffer.open_session(heartbeat.session_id, current_user.id, heartbeat.book_id)
+    
+    accepted = progress_buffer.record(
+        current_user.id,
+        heartbeat.book_id,
+        heartbeat.page,
+        session_id=heartbeat.session_id
+    )
+    if not accepted:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Progress cannot be saved right now, please retry shortly",
+            headers={"Retry-After": str(max(1, round(progress_buffer.flush_interval)))}
+        )
+    
+    return {"status": "accepted"}
+
+@router.get("/sessions", response_model=PaginatedResponse)
 def list_reading_sessions(
-    skip: int = 0,
-    limit: int = 50,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """List reading sessions for current user"""
-    sessions = db.query(ReadingSession).filter(
+    """List reading sessions for current user, newest first"""
+    query = db.query(ReadingSession).filter(
         ReadingSession.user_id == current_user.id
-    ).order_by(
-        ReadingSession.created_at.desc()
-    ).offset(skip).limit(limit).all()
+    )
     
-    return sessions
+    return keyset_paginate(query, ReadingSession, ReadingSessionSchema, cursor, limit)
 
 @router.get("/stats", response_model=ReadingStats)
 def get_reading_stats(
+    request: Request,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Get reading statistics"""
+    """Get reading statistics (cached until the user's data changes)"""
+    return cached_json_response(
+        request,
+        current_user.id,
+        "reading_stats",
+        lambda: compute_reading_stats(db, current_user.id),
+        validator=lambda: reading_stats_validator(db, current_user.id)
+    )
+
+def reading_stats_validator(db: Session, user_id: int) -> Validator:
+    """Stats only change when the user's books or sessions do"""
+    books = rows_validator(db, Book, Book.owner_id == user_id)
+    sessions = rows_validator(db, ReadingSession, ReadingSession.user_id == user_id)
+    return Validator(books.state + sessions.state)
+
+def compute_reading_stats(db: Session, user_id: int) -> ReadingStats:
+    """Compute reading statistics for a user"""
     # Total sessions and minutes
     sessions = db.query(ReadingSession).filter(
-        ReadingSession.user_id == current_user.id
+        ReadingSession.user_id == user_id
     ).all()
     
     total_sessions = len(sessions)
     total_minutes = sum(session.duration_minutes for session in sessions)
     
     # Total books
-    total_books = db.query(Book).filter(
-        Book.user_id == current_user.id
-    ).count()
+    total_books = db.query(func.count(Book.id)).filter(
+        Book.owner_id == user_id
+    ).scalar()
     
     # Total words saved
     total_words_saved = db.query(ReadingSession).filter(
-        ReadingSession.user_id == current_user.id
+        ReadingSession.user_id == user_id
     ).with_entities(
-        db.func.sum(ReadingSession.words_saved)
+        func.sum(ReadingSession.words_saved)
     ).scalar() or 0
     
     # Average session length
@@ -156,11 +262,71 @@ def get_reading_stats(
         favorite_reading_time=favorite_reading_time
     )
 
+@router.get("/activity", response_model=ReadingActivity)
+def get_reading_activity(
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    bucket: Literal["day", "week", "hour"] = "day",
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get time-bucketed reading activity and an hour-of-week heatmap"""
+    start, end = ActivityService.resolve_window(start, end)
+    try:
+        activity = ActivityService.get_activity(db, current_user.id, start, end, bucket)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    return activity
+
+@router.get("/eta/{book_id}", response_model=ReadingEta)
+def get_reading_eta(
+    book_id: int,
+    chapter_end_page: Optional[int] = Query(None, ge=0),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Estimate the reading time left in a book (and chapter)"""
+    book = db.query(Book.current_page, Book.total_pages).filter(
+        Book.id == book_id,
+        Book.owner_id == current_user.id
+    ).first()
+    
+    if not book:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Book not found"
+        )
+    
+    speed = ReadingSpeedService.get_speed(db, current_user.id, book_id)
+    return ReadingEta(
+        book_id=book_id,
+        **ReadingSpeedService.estimate(speed, book.current_page, book.total_pages, chapter_end_page)
+    )
+
 @router.get("/timer/presets")
-def get_timer_presets():
-    """Get available timer presets"""
-    return [
+def get_timer_presets(
+    book_id: Optional[int] = None,
+    current_user: Optional[User] = Depends(get_optional_user),
+    db: Session = Depends(get_db)
+):
+    """Get available timer presets, with expected pages for signed-in readers"""
+    presets = [
         {"minutes": 5, "label": "Quick Read"},
         {"minutes": 10, "label": "Focused Session"},
         {"minutes": 15, "label": "Deep Dive"}
-    ]
\ No newline at end of file
+    ]
+    
+    if current_user is None:
+        return presets
+    
+    speed = ReadingSpeedService.get_speed(db, current_user.id, book_id)
+    pages_per_minute = ReadingSpeedService.effective_pages_per_minute(speed)
+    if pages_per_minute:
+        for preset in presets:
+            preset["pages"] = max(1, round(preset["minutes"] * pages_per_minute))
+    
+    return presets
\ No newline at end of file
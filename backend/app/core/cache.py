@@ -0,0 +1,198 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+from fastapi import Request, Response
+from app.core.config import settings
+from app.core.serialization import render_json
+
+# version, etag, body (None when only the validator is kept), last_modified, expires_at
+CacheEntry = Tuple[int, str, Optional[bytes], Optional[datetime], float]
+
+
+class Validator(NamedTuple):
+    """Cheap summary of the rows behind a response, e.g. a count and max(updated_at)"""
+    state: tuple
+    last_modified: Optional[datetime] = None
+
+
+def make_etag(body: bytes) -> str:
+    """Strong validator derived from the exact response bytes"""
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+def make_state_etag(key: str, state: tuple) -> str:
+    """Strong validator derived from row state rather than rendered bytes.
+
+    The response for ``key`` is rendered from exactly the rows the state
+    summarises, so equal state means byte-identical bodies and the tag
+    can be strong; If-Match and Range then work as for make_etag.
+    """
+    return '"' + hashlib.sha1(repr((key, state)).encode()).hexdigest() + '"'
+
+
+def _opaque_tag(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {_opaque_tag(tag.strip()) for tag in if_none_match.split(",")}
+    return _opaque_tag(etag) in candidates
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; they are written with utcnow()
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def not_modified(request: Request, etag: Optional[str], last_modified: Optional[datetime] = None) -> bool:
+    """Evaluate If-None-Match, or If-Modified-Since when no ETag was sent"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        return etag is not None and etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if not if_modified_since or last_modified is None:
+        return False
+    try:
+        since = _as_utc(parsedate_to_datetime(if_modified_since))
+    except (TypeError, ValueError):
+        return False
+    # HTTP dates have one-second resolution
+    return _as_utc(last_modified).replace(microsecond=0) <= since
+
+
+def rows_validator(db, model, *criteria) -> Validator:
+    """Count, max(id) and max(updated_at) of the matching rows in one query.
+
+    Inserts move max(id), deletes move the count and updates move
+    max(updated_at), so any change to the rows changes the ETag. There is
+    no Last-Modified: deleting a row leaves max(updated_at) where it was,
+    so If-Modified-Since would keep answering 304 for a collection that
+    has lost a row.
+    """
+    from sqlalchemy import func
+
+    count, max_id, max_updated = db.query(
+        func.count(model.id), func.max(model.id), func.max(model.updated_at)
+    ).filter(*criteria).one()
+    return Validator((count, max_id, str(max_updated)))
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime] = None) -> Dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+    return headers
+
+
+class UserResponseCache:
+    """Per-user cache of rendered JSON responses.
+
+    Each user has a version counter; mutating endpoints call invalidate()
+    after committing, which makes every cached response for that user
+    stale. Entries also expire after ``ttl`` seconds, which bounds how
+    stale a response can be when writes land on another worker process.
+    """
+
+    def __init__(self, ttl: float = settings.RESPONSE_CACHE_TTL_SECONDS,
+                 max_entries: int = settings.RESPONSE_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._versions: Dict[int, int] = {}
+        self._entries: "OrderedDict[Tuple[int, str], CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def version(self, user_id: int) -> int:
+        return self._versions.get(user_id, 0)
+
+    def invalidate(self, user_id: int):
+        """Mark every cached response for the user as stale"""
+        with self._lock:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+
+    def get(self, user_id: int, key: str) -> Optional[Tuple[str, Optional[bytes], Optional[datetime]]]:
+        with self._lock:
+            entry = self._entries.get((user_id, key))
+            if entry is None:
+                self.misses += 1
+                return None
+            version, etag, body, last_modified, expires_at = entry
+            if version != self._versions.get(user_id, 0) or expires_at < time.monotonic():
+                del self._entries[(user_id, key)]
+                self.misses += 1
+                return None
+            self._entries.move_to_end((user_id, key))
+            self.hits += 1
+            return etag, body, last_modified
+
+    def set(self, user_id: int, key: str, body: Optional[bytes], version: int,
+            etag: Optional[str] = None, last_modified: Optional[datetime] = None) -> str:
+        """Store a body rendered while the user was at ``version``.
+
+        If a write invalidated the user in the meantime the entry is
+        stored already stale, so a concurrent rebuild cannot resurrect
+        pre-write data. ``body`` may be None to keep only the validator.
+        """
+        if etag is None:
+            etag = make_etag(body)
+        with self._lock:
+            self._entries[(user_id, key)] = (version, etag, body, last_modified, time.monotonic() + self.ttl)
+            self._entries.move_to_end((user_id, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return etag
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+
+
+response_cache = UserResponseCache()
+
+
+def cached_json_response(request: Request, user_id: int, key: str, build: Callable[[], Any],
+                         validator: Optional[Callable[[], Validator]] = None, store_body: bool = True) -> Response:
+    """Serve a per-user cached JSON response with conditional GET support.
+
+    While an entry is fresh, a matching If-None-Match (or If-Modified-Since)
+    is answered with a bodyless 304 without touching the database. On a
+    miss, ``validator`` is a cheap query (counts, max(updated_at)) whose
+    result becomes a strong ETag, plus Last-Modified when it gives one, so
+    a client that is already current still gets its 304 without ``build``
+    or the serializer running. Without a validator the ETag hashes the rendered body.
+    ``store_body=False`` keeps only the validator, for large bodies.
+    """
+    cache_key = f"{key}?{request.url.query}"
+    cached = response_cache.get(user_id, cache_key)
+    if cached is not None:
+        etag, body, last_modified = cached
+        if not_modified(request, etag, last_modified):
+            return Response(status_code=304, headers=validator_headers(etag, last_modified))
+        if body is not None:
+            return Response(content=body, media_type="application/json", headers=validator_headers(etag, last_modified))
+
+    version = response_cache.version(user_id)
+    etag = last_modified = None
+    if validator is not None:
+        state = validator()
+        etag, last_modified = make_state_etag(cache_key, state.state), state.last_modified
+        if not_modified(request, etag, last_modified):
+            response_cache.set(user_id, cache_key, None, version, etag, last_modified)
+            return Response(status_code=304, headers=validator_headers(etag, last_modified))
+
+    body = render_json(build())
+    etag = response_cache.set(user_id, cache_key, body if store_body else None, version, etag, last_modified)
+    return Response(content=body, media_type="application/json", headers=validator_headers(etag, last_modified))
@@ -1,15 +1,117 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 import os
 
 class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///./greatreading.db"
+    # Connection pool sized for the sync endpoint threadpool (40 threads)
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: float = 10.0
+    # Async engine for async endpoints; derived from DATABASE_URL when unset
+    # (sqlite -> sqlite+aiosqlite, postgresql -> postgresql+asyncpg)
+    ASYNC_DATABASE_URL: Optional[str] = None
+    # Sync DB statements issued on the event loop thread: "warn" logs each
+    # call site once, "raise" fails the statement, "off" disables the check
+    SYNC_DB_GUARD: str = "warn"
+    # PRAGMAs applied to every SQLite connection. WAL lets readers run
+    # alongside the single writer, and synchronous=NORMAL only fsyncs at
+    # checkpoints: a power loss can drop the last commits but never
+    # corrupts the file. Set SQLITE_TUNING=False for SQLite's defaults.
+    SQLITE_TUNING: bool = True
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 268435456  # 256MB
+    SQLITE_CACHE_SIZE: int = -65536  # negative means KiB, i.e. 64MB per connection
+    SQLITE_TEMP_STORE: str = "MEMORY"
     SECRET_KEY: str = "your-secret-key-here-change-in-production"
     ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    # bcrypt cost; stored hashes with a different cost are re-hashed on login
+    BCRYPT_ROUNDS: int = 12
+    # Dedicated password-hashing threads, and how many extra requests may
+    # wait for one before logins are shed with 429
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 16
+    # Resolved users are reused for this long; also the upper bound on how
+    # long a deactivation takes to reach other worker processes
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30.0
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    # Login attempts are token-bucketed per username and per client IP;
+    # repeated failures lock the key out with exponential backoff
+    LOGIN_USERNAME_BUCKET_CAPACITY: int = 5
+    LOGIN_USERNAME_REFILL_SECONDS: float = 12.0
+    LOGIN_IP_BUCKET_CAPACITY: int = 20
+    LOGIN_IP_REFILL_SECONDS: float = 3.0
+    # An IP's failure count drops by one this often, so unrelated typos
+    # behind a shared NAT never add up to a lockout
+    LOGIN_IP_FAILURE_DECAY_SECONDS: float = 300.0
+    LOGIN_LOCKOUT_THRESHOLD: int = 5
+    LOGIN_LOCKOUT_BASE_SECONDS: float = 30.0
+    LOGIN_LOCKOUT_MAX_SECONDS: float = 900.0
+    LOGIN_THROTTLE_IDLE_SECONDS: float = 3600.0
+    LOGIN_THROTTLE_MAX_ENTRIES: int = 100000
+    # Request rate limits: "memory" is per worker process, "sqlite" shares
+    # limits between all workers on the host through RATE_LIMIT_SQLITE_PATH
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_SQLITE_PATH: str = "./ratelimit.db"
+    RATE_LIMIT_MAX_ENTRIES: int = 100000
+    # Revoked access tokens are mirrored into each worker's memory; other
+    # workers see a revocation within REVOCATION_SYNC_INTERVAL_SECONDS
+    REVOCATION_SYNC_INTERVAL_SECONDS: float = 1.0
+    REVOCATION_BLOOM_CAPACITY: int = 100000
+    REVOCATION_BLOOM_ERROR_RATE: float = 0.001
+    # Log records waiting for the background writer; beyond this they are
+    # dropped (and counted) rather than blocking request handling
+    LOG_QUEUE_SIZE: int = 10000
+    # Access log sampling: errors (status >= 400) and requests slower than
+    # ACCESS_LOG_SLOW_MS are always logged, the rest at this rate
+    ACCESS_LOG_SAMPLE_RATE: float = 0.1
+    ACCESS_LOG_SLOW_MS: float = 1000.0
+    # Request profiling: admins can profile single requests with a signed
+    # token; a fraction of all requests is profiled speculatively and kept
+    # when slower than PROFILING_SLOW_MS
+    PROFILING_INTERVAL_MS: float = 5.0
+    PROFILING_AUTO_SAMPLE_RATE: float = 0.01
+    PROFILING_SLOW_MS: float = 1000.0
+    PROFILING_SLOWEST_N: int = 20
+    PROFILING_MAX_STORED: int = 50
+    PROFILING_TOKEN_EXPIRE_MINUTES: int = 10
+    # Bearer token Prometheus sends to scrape /metrics; unset disables the
+    # endpoint. Kept apart from user JWTs, which expire and need a login.
+    METRICS_SCRAPE_TOKEN: Optional[str] = None
+    # Debug mode adds per-request DB timing headers
+    DEBUG: bool = False
+    # Statements slower than this go to database.log (parameters redacted);
+    # a statement shape repeated this often in one request is flagged N+1
+    SLOW_QUERY_MS: float = 100.0
+    N_PLUS_ONE_THRESHOLD: int = 5
     UPLOAD_DIR: str = "./uploads"
     MAX_UPLOAD_SIZE: int = 104857600
     DICTIONARY_API_URL: str = "https://api.dictionaryapi.dev/api/v2/entries/en"
     FRONTEND_URL: str = "http://localhost:5173"
+    # Progress heartbeats are buffered in memory and written in batches.
+    # Up to PROGRESS_FLUSH_INTERVAL_SECONDS of accepted heartbeats can be
+    # lost if the process dies before the next flush.
+    PROGRESS_FLUSH_INTERVAL_SECONDS: float = 5.0
+    PROGRESS_FLUSH_MAX_PENDING: int = 500
+    # Books waiting to be written before new ones are refused; bounds memory
+    # while flushes keep failing
+    PROGRESS_BUFFER_CAPACITY: int = 10000
+    # Open reading sessions remembered per worker so heartbeats naming them
+    # skip the lookup; the least recently used are forgotten beyond this
+    PROGRESS_OPEN_SESSIONS_MAX: int = 100000
+    # Per-user response cache for polled endpoints (per worker process)
+    RESPONSE_CACHE_TTL_SECONDS: float = 30.0
+    RESPONSE_CACHE_MAX_ENTRIES: int = 10000
+    # Readiness checks run in the background on this interval; probes only
+    # read the last result, which counts as failed once 3 intervals old
+    HEALTH_CHECK_INTERVAL_SECONDS: float = 15.0
+    HEALTH_MIN_FREE_DISK_MB: int = 500
+    HEALTH_MAX_QUEUE_LAG_SECONDS: float = 60.0
+    HEALTH_UPSTREAM_TIMEOUT_SECONDS: float = 3.0
     
     class Config:
         env_file = ".env"
@@ -1,25 +1,171 @@
-from sqlalchemy import create_engine
+import os
+from typing import AsyncGenerator, Optional, Tuple
+from sqlalchemy import DateTime, create_engine, event, inspect
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.sql.expression import FunctionElement
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 
-engine = create_engine(
-    settings.DATABASE_URL, connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
-)
+
+def sqlite_pragmas(tuned: bool = settings.SQLITE_TUNING) -> list:
+    """PRAGMA statements run on every new SQLite connection"""
+    if not tuned:
+        return []
+    return [
+        f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}",
+        f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}",
+        f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}",
+        f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}",
+        f"PRAGMA temp_store={settings.SQLITE_TEMP_STORE}",
+    ]
+
+
+def _is_in_memory(url: str) -> bool:
+    return url.split("://", 1)[1] in ("", "/:memory:") or "mode=memory" in url
+
+
+def _install_pragmas(engine, pragmas: list):
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def create_db_engine(url: str = settings.DATABASE_URL, tuned: bool = settings.SQLITE_TUNING):
+    if not url.startswith("sqlite"):
+        return create_engine(
+            url, pool_size=settings.DB_POOL_SIZE, max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS, pool_pre_ping=True
+        )
+
+    in_memory = _is_in_memory(url)
+    options = {"connect_args": {"check_same_thread": False}}
+    if not in_memory:
+        # Sync endpoints run on up to 40 threadpool workers; the default
+        # pool of 5 + 10 overflow made them queue for a connection
+        options.update(
+            pool_size=settings.DB_POOL_SIZE, max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS
+        )
+    engine = create_engine(url, **options)
+
+    pragmas = sqlite_pragmas(tuned and not in_memory)
+    if pragmas:
+        _install_pragmas(engine, pragmas)
+
+    return engine
+
+
+def async_database_url(url: str = settings.DATABASE_URL) -> str:
+    """Same database through an asyncio driver"""
+    scheme, rest = url.split("://", 1)
+    dialect = scheme.split("+", 1)[0]
+    if dialect == "sqlite":
+        return f"sqlite+aiosqlite://{rest}"
+    if dialect in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg://{rest}"
+    return url
+
+
+def create_async_db_engine(url: Optional[str] = None, tuned: bool = settings.SQLITE_TUNING):
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
+
+    url = url or settings.ASYNC_DATABASE_URL or async_database_url()
+    pool = dict(
+        poolclass=AsyncAdaptedQueuePool, pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW, pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS
+    )
+    if not url.startswith("sqlite"):
+        return create_async_engine(url, pool_pre_ping=True, **pool)
+
+    in_memory = _is_in_memory(url)
+    if in_memory:
+        pool = dict(poolclass=StaticPool)
+    engine = create_async_engine(url, connect_args={"check_same_thread": False}, **pool)
+    pragmas = sqlite_pragmas(tuned and not in_memory)
+    if pragmas:
+        _install_pragmas(engine.sync_engine, pragmas)
+    return engine
+
+
+engine = create_db_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+
+class utcnow(FunctionElement):
+    """Server-side timestamp stored the way the ORM writes datetimes.
+
+    SQLite keeps DateTime as text and the ORM writes microseconds, while
+    CURRENT_TIMESTAMP stops at the second. Mixing the two breaks equality
+    on created_at, which keyset cursors rely on.
+    """
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _utcnow_default(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(utcnow, "sqlite")
+def _utcnow_sqlite(element, compiler, **kw):
+    return "strftime('%Y-%m-%d %H:%M:%f000', 'now')"
+
+
+BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Schema that create_all produced before migrations were introduced
+BASELINE_REVISION = "0001"
+
+def _alembic_config():
+    from alembic.config import Config
+
+    config = Config(os.path.join(BACKEND_ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_ROOT, "migrations"))
+    config.attributes["configure_logger"] = False
+    return config
+
+def schema_revisions(bind=None) -> Tuple[Optional[str], str]:
+    """The database's Alembic revision and the one the models expect"""
+    from alembic.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
+    head = ScriptDirectory.from_config(_alembic_config()).get_current_head()
+    with (bind or engine).connect() as connection:
+        return MigrationContext.configure(connection).get_current_revision(), head
+
+def run_migrations(bind=None, revision: str = "head"):
+    """Upgrade the schema with Alembic.
+
+    Databases created by create_all before migrations existed have tables
+    but no alembic_version; they are stamped at the baseline first and
+    then upgraded like any other.
+    """
+    from alembic import command
+
+    config = _alembic_config()
+    with (bind or engine).begin() as connection:
+        config.attributes["connection"] = connection
+        tables = inspect(connection).get_table_names()
+        if "users" in tables and "alembic_version" not in tables:
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, revision)
+
 def init_db():
-    # Import models inside the function to avoid circular imports
-    from app.models.user import User
-    from app.models.book import Book
-    
     try:
-        Base.metadata.create_all(bind=engine)
-        print("✅ Database tables created successfully!")
+        run_migrations()
+        print("✅ Database schema is up to date!")
     except Exception as e:
-        print(f"❌ Error creating database tables: {e}")
+        print(f"❌ Error migrating database: {e}")
 
 def get_db():
     db = SessionLocal()
@@ -27,3 +173,39 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def create_async_session_factory(url: Optional[str] = None, tuned: bool = settings.SQLITE_TUNING):
+    """Async sessions on an engine instrumented like the sync one.
+
+    Statement metrics and N+1 detection hook the async engine's
+    sync_engine, where SQLAlchemy fires its cursor events. The event loop
+    guard is deliberately not attached: these statements are meant to
+    run on the loop.
+    """
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    from app.core.metrics import instrument_engine
+    from app.core.query_monitor import instrument_queries
+
+    async_engine = create_async_db_engine(url, tuned)
+    instrument_engine(async_engine.sync_engine)
+    instrument_queries(async_engine.sync_engine)
+    return async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Created on first use so deployments without an async driver can still
+# serve every sync endpoint
+_async_session_factory = None
+
+def get_async_session_factory():
+    global _async_session_factory
+    if _async_session_factory is None:
+        _async_session_factory = create_async_session_factory()
+    return _async_session_factory
+
+def set_async_session_factory(factory):
+    """Serve get_async_db from another factory, e.g. a test database; None resets"""
+    global _async_session_factory
+    _async_session_factory = factory
+
+async def get_async_db() -> AsyncGenerator:
+    async with get_async_session_factory()() as db:
+        yield db
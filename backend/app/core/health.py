@@ -0,0 +1,164 @@
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional
+from sqlalchemy import text
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+OK = "ok"
+DEGRADED = "degraded"
+FAIL = "fail"
+
+
+class CheckResult(NamedTuple):
+    status: str
+    detail: str = ""
+    latency_ms: float = 0.0
+    checked_at: Optional[datetime] = None
+
+
+class _Check(NamedTuple):
+    name: str
+    func: Callable[[], CheckResult]
+    critical: bool
+
+
+def check_database(engine) -> CheckResult:
+    """Reachable, and migrated to the revision the models expect"""
+    from app.core.database import schema_revisions
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    # Serving from an older schema fails every query that touches a new
+    # column, so such a worker must not take traffic
+    current, head = schema_revisions(engine)
+    if current != head:
+        return CheckResult(FAIL, f"schema at {current or 'no revision'}, expected {head}; run migrations")
+    return CheckResult(OK)
+
+
+def check_upload_dir(path: str = settings.UPLOAD_DIR, min_free_mb: int = settings.HEALTH_MIN_FREE_DISK_MB) -> CheckResult:
+    probe = os.path.join(path, f".health-{uuid.uuid4().hex}")
+    with open(probe, "wb") as f:
+        f.write(b"ok")
+    os.remove(probe)
+    free_mb = shutil.disk_usage(path).free // (1024 * 1024)
+    if free_mb < min_free_mb:
+        return CheckResult(FAIL, f"{free_mb}MB free, need {min_free_mb}MB")
+    return CheckResult(OK, f"{free_mb}MB free")
+
+
+def check_job_queues(progress_buffer, processing_jobs: Dict[str, dict],
+                     max_lag: float = settings.HEALTH_MAX_QUEUE_LAG_SECONDS) -> CheckResult:
+    """Oldest unflushed heartbeat and oldest PDF job still processing"""
+    progress_lag = progress_buffer.oldest_pending_age()
+    now = datetime.now()
+    started = [job["started_at"] for job in list(processing_jobs.values()) if job.get("status") == "processing"]
+    job_lag = max(((now - at).total_seconds() for at in started), default=0.0)
+    detail = f"progress lag {progress_lag:.1f}s, {len(started)} PDF jobs, oldest {job_lag:.1f}s"
+    if progress_lag > max_lag:
+        return CheckResult(FAIL, detail)
+    if job_lag > max_lag * 10:
+        # A stuck upload affects one user, not the whole worker
+        return CheckResult(DEGRADED, detail)
+    return CheckResult(OK, detail)
+
+
+def check_dictionary_upstream(url: str = settings.DICTIONARY_API_URL,
+                              timeout: float = settings.HEALTH_UPSTREAM_TIMEOUT_SECONDS) -> CheckResult:
+    import httpx
+
+    response = httpx.get(f"{url}/hello", timeout=timeout)
+    if response.status_code >= 500:
+        return CheckResult(DEGRADED, f"upstream returned {response.status_code}")
+    return CheckResult(OK, f"upstream returned {response.status_code}")
+
+
+class HealthMonitor:
+    """Readiness checks run on a background thread.
+
+    Probes only read the cached results, so orchestrator traffic never
+    opens a connection or touches the disk. Non-critical checks can
+    degrade the report but never make the worker unready; results older
+    than ``max_age`` count as failed, which catches a dead checker thread.
+    """
+
+    def __init__(self, interval: float = settings.HEALTH_CHECK_INTERVAL_SECONDS, max_age: Optional[float] = None):
+        self.interval = interval
+        self.max_age = max_age if max_age is not None else interval * 3
+        self.started_at = time.monotonic()
+        self._checks: List[_Check] = []
+        self._results: Dict[str, CheckResult] = {}
+        self._last_run: Optional[float] = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def uptime(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def register(self, name: str, func: Callable[[], CheckResult], critical: bool = True):
+        self._checks.append(_Check(name, func, critical))
+
+    def run_checks(self) -> Dict[str, CheckResult]:
+        results = {}
+        for check in self._checks:
+            start = time.perf_counter()
+            try:
+                result = check.func()
+            except Exception as e:
+                result = CheckResult(FAIL if check.critical else DEGRADED, f"{type(e).__name__}: {e}")
+            if not check.critical and result.status == FAIL:
+                result = result._replace(status=DEGRADED)
+            results[check.name] = result._replace(
+                latency_ms=round((time.perf_counter() - start) * 1000, 2), checked_at=datetime.utcnow()
+            )
+        with self._lock:
+            self._results = results
+            self._last_run = time.monotonic()
+        failing = {name: r.detail for name, r in results.items() if r.status != OK}
+        if failing:
+            logger.warning(f"Health checks not ok: {failing}")
+        return results
+
+    def report(self) -> dict:
+        """Last results; ``ready`` is False until the first run completes"""
+        with self._lock:
+            results = dict(self._results)
+            last_run = self._last_run
+        if last_run is None:
+            return {"status": "starting", "ready": False, "checks": {}, "checked_at": None}
+        if time.monotonic() - last_run > self.max_age:
+            return {"status": FAIL, "ready": False, "checks": results, "checked_at": None,
+                    "detail": f"checks last ran {time.monotonic() - last_run:.0f}s ago"}
+        statuses = {result.status for result in results.values()}
+        status = FAIL if FAIL in statuses else DEGRADED if DEGRADED in statuses else OK
+        checked_at = min((r.checked_at for r in results.values()), default=None)
+        return {"status": status, "ready": status != FAIL, "checks": results, "checked_at": checked_at}
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="health-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread:
+            self._thread.join(timeout=settings.HEALTH_UPSTREAM_TIMEOUT_SECONDS + 5)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self.run_checks()
+            self._stopped.wait(self.interval)
+
+
+health_monitor = HealthMonitor()
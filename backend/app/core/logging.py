@@ -1,90 +1,163 @@
+import atexit
+import copy
 import logging
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 import json
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from .config import settings
 
-def setup_logging():
-    """Setup application logging configuration"""
-    
-    # Create logs directory if it doesn't exist
-    logs_dir = Path("logs")
-    logs_dir.mkdir(exist_ok=True)
-    
-    # Configure logging format
-    log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    date_format = "%Y-%m-%d %H:%M:%S"
-    
-    # Create formatter
-    formatter = logging.Formatter(log_format, date_format)
+# Loggers that also get their own file, in addition to greatreading.log
+DOMAIN_LOG_FILES = {
+    "api": "api_requests.log",
+    "database": "database.log",
+    "file_operations": "file_operations.log",
+}
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional["BoundedQueueHandler"] = None
+_setup_lock = threading.Lock()
+_traceback_formatter = logging.Formatter()
+
+class BoundedQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of blocking when full.
+
+    Drops are counted and reported as a single warning once the queue
+    has room again.
+    """
     
-    # Configure root logger
-    root_logger = logging.getLogger()
-    root_logger.setLevel(logging.INFO)
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._unreported = 0
     
-    # Console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(formatter)
-    root_logger.addHandler(console_handler)
+    def prepare(self, record):
+        """Copy of the record that is safe to hand to the writer thread.
+
+        The stock version formats the message with the traceback appended
+        and clears exc_info, so JSONFormatter never saw the exception.
+        Here only the arguments are merged; the traceback is rendered into
+        exc_text, which every formatter on the listener side uses.
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _traceback_formatter.formatException(record.exc_info)
+            # Tracebacks hold frames; don't keep them alive in the queue
+            record.exc_info = None
+        return record
     
-    # File handler with rotation
-    file_handler = RotatingFileHandler(
-        logs_dir / "greatreading.log",
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            self._unreported += 1
+            return
+        if self._unreported:
+            count, self._unreported = self._unreported, 0
+            notice = logging.LogRecord(
+                __name__, logging.WARNING, __file__, 0,
+                f"Log queue full, dropped {count} records", None, None
+            )
+            try:
+                self.queue.put_nowait(notice)
+            except queue.Full:
+                self._unreported += count
+
+def _file_handler(path: Path, formatter: logging.Formatter) -> RotatingFileHandler:
+    handler = RotatingFileHandler(
+        path,
         maxBytes=10485760,  # 10MB
         backupCount=10
     )
-    file_handler.setFormatter(formatter)
-    root_logger.addHandler(file_handler)
-    
-    # Error file handler (errors only)
-    error_handler = RotatingFileHandler(
-        logs_dir / "errors.log",
-        maxBytes=10485760,
-        backupCount=10
-    )
-    error_handler.setLevel(logging.ERROR)
-    error_handler.setFormatter(formatter)
-    root_logger.addHandler(error_handler)
-    
-    # API request logger
-    api_logger = logging.getLogger("api")
-    api_handler = RotatingFileHandler(
-        logs_dir / "api_requests.log",
-        maxBytes=10485760,
-        backupCount=10
-    )
-    api_handler.setFormatter(formatter)
-    api_logger.addHandler(api_handler)
-    
-    # Database logger
-    db_logger = logging.getLogger("database")
-    db_handler = RotatingFileHandler(
-        logs_dir / "database.log",
-        maxBytes=10485760,
-        backupCount=10
-    )
-    db_handler.setFormatter(formatter)
-    db_logger.addHandler(db_handler)
-    
-    # File operations logger
-    file_logger = logging.getLogger("file_operations")
-    file_op_handler = RotatingFileHandler(
-        logs_dir / "file_operations.log",
-        maxBytes=10485760,
-        backupCount=10
-    )
-    file_op_handler.setFormatter(formatter)
-    file_logger.addHandler(file_op_handler)
+    handler.setFormatter(formatter)
+    return handler
+
+def setup_logging(logs_dir: str = "logs") -> QueueListener:
+    """Setup application logging configuration.
+
+    Loggers only put records on a bounded in-memory queue; a single
+    background thread does the console and file writes (and rotation).
+    Calling this again is a no-op.
+    """
+    global _listener, _queue_handler
+    with _setup_lock:
+        if _listener is not None:
+            return _listener
+        
+        # Create logs directory if it doesn't exist
+        logs_path = Path(logs_dir)
+        logs_path.mkdir(exist_ok=True)
+        
+        # Configure logging format
+        log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+        date_format = "%Y-%m-%d %H:%M:%S"
+        formatter = logging.Formatter(log_format, date_format)
+        
+        # Console handler
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(formatter)
+        
+        # Main file and error file (errors only)
+        handlers = [console_handler, _file_handler(logs_path / "greatreading.log", formatter)]
+        error_handler = _file_handler(logs_path / "errors.log", formatter)
+        error_handler.setLevel(logging.ERROR)
+        handlers.append(error_handler)
+        
+        # Per-domain files only receive records from their logger; the
+        # api file is the structured access log
+        for name, filename in DOMAIN_LOG_FILES.items():
+            domain_formatter = JSONFormatter() if name == "api" else formatter
+            domain_handler = _file_handler(logs_path / filename, domain_formatter)
+            domain_handler.addFilter(logging.Filter(name))
+            handlers.append(domain_handler)
+        
+        log_queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+        _queue_handler = BoundedQueueHandler(log_queue)
+        
+        root_logger = logging.getLogger()
+        root_logger.setLevel(logging.INFO)
+        root_logger.addHandler(_queue_handler)
+        
+        _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        
+        logging.getLogger(__name__).info("Logging system initialized")
+        return _listener
+
+def shutdown_logging():
+    """Write out queued records and stop the writer thread"""
+    global _listener, _queue_handler
+    with _setup_lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        logging.getLogger().removeHandler(_queue_handler)
+        _listener = None
+        _queue_handler = None
+
+def logging_stats() -> Dict[str, int]:
+    if _queue_handler is None:
+        return {"queued": 0, "dropped": 0}
+    return {"queued": _queue_handler.queue.qsize(), "dropped": _queue_handler.dropped}
 
 class JSONFormatter(logging.Formatter):
     """Custom JSON formatter for structured logging"""
     
     def format(self, record):
         log_record = {
-            "timestamp": datetime.utcnow().isoformat(),
+            # Creation time, not write time: records are written later by the listener
+            "timestamp": datetime.utcfromtimestamp(record.created).isoformat(),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -93,9 +166,11 @@ class JSONFormatter(logging.Formatter):
             "line": record.lineno,
         }
         
-        # Add exception info if present
-        if record.exc_info:
-            log_record["exception"] = self.formatException(record.exc_info)
+        # Add exception info if present; queued records carry it as text
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            log_record["exception"] = record.exc_text
         
         # Add extra fields
         if hasattr(record, "extra"):
@@ -110,21 +185,25 @@ class RequestLogger:
         self.logger = logging.getLogger("api")
     
     def log_request(self, request_id: str, method: str, path: str, 
-                   status_code: int, duration: float, user_id: int = None):
+                   status_code: int, duration: float, user_id: int = None,
+                   route: str = None, ttfb: float = None):
         """Log an API request"""
         extra = {
             "request_id": request_id,
             "method": method,
             "path": path,
+            "route": route,
             "status_code": status_code,
             "duration_ms": round(duration * 1000, 2),
+            "ttfb_ms": round(ttfb * 1000, 2) if ttfb is not None else None,
             "user_id": user_id
         }
         
+        # Nested under "extra" so JSONFormatter can merge the fields
         if status_code >= 400:
-            self.logger.error(f"Request failed: {method} {path} - {status_code}", extra=extra)
+            self.logger.error(f"Request failed: {method} {path} - {status_code}", extra={"extra": extra})
         else:
-            self.logger.info(f"Request: {method} {path} - {status_code}", extra=extra)
+            self.logger.info(f"Request: {method} {path} - {status_code}", extra={"extra": extra})
     
     def log_error(self, request_id: str, error: Exception, context: Dict[str, Any] = None):
         """Log an error"""
@@ -134,12 +213,7 @@ class RequestLogger:
             "error_message": str(error),
             "context": context or {}
         }
-        self.logger.error(f"Error: {type(error).__name__}: {str(error)}", extra=extra)
+        self.logger.error(f"Error: {type(error).__name__}: {str(error)}", extra={"extra": extra})
 
-# Initialize logging
-setup_logging()
 logger = logging.getLogger(__name__)
 request_logger = RequestLogger()
-
-# Test logging
-logger.info("Logging system initialized")
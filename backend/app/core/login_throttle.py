@@ -0,0 +1,152 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+from app.core.config import settings
+from app.core.metrics import rate_limit_rejections
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated_at", "failures", "locked_until")
+
+    def __init__(self, tokens: float, now: float):
+        self.tokens = tokens
+        self.updated_at = now
+        self.failures = 0.0
+        self.locked_until = 0.0
+
+
+class BucketTable:
+    """Token buckets keyed by string, least recently used first.
+
+    Every operation is O(1) amortised: touching a key moves it to the end
+    and idle buckets are evicted from the front. With
+    ``failure_decay_seconds`` set, the failure count drains by one every
+    that many seconds, so only failures close together build a streak.
+    """
+
+    def __init__(self, capacity: int, refill_seconds: float, idle_seconds: float, max_entries: int,
+                 failure_decay_seconds: Optional[float] = None):
+        self.capacity = capacity
+        self.refill_seconds = refill_seconds
+        self.idle_seconds = idle_seconds
+        self.max_entries = max_entries
+        self.failure_decay_seconds = failure_decay_seconds
+        self._buckets: "OrderedDict[str, _Bucket]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def get(self, key: str, now: float) -> _Bucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket(self.capacity, now)
+        else:
+            elapsed = now - bucket.updated_at
+            bucket.tokens = min(self.capacity, bucket.tokens + elapsed / self.refill_seconds)
+            if self.failure_decay_seconds:
+                bucket.failures = max(0.0, bucket.failures - elapsed / self.failure_decay_seconds)
+            bucket.updated_at = now
+            self._buckets.move_to_end(key)
+        self._evict(now)
+        return bucket
+
+    def _evict(self, now: float):
+        while self._buckets:
+            key, oldest = next(iter(self._buckets.items()))
+            idle = now - oldest.updated_at > self.idle_seconds and oldest.locked_until <= now
+            if not idle and len(self._buckets) <= self.max_entries:
+                break
+            del self._buckets[key]
+
+    def retry_after(self, bucket: _Bucket, now: float) -> float:
+        if bucket.locked_until > now:
+            return bucket.locked_until - now
+        if bucket.tokens < 1:
+            return (1 - bucket.tokens) * self.refill_seconds
+        return 0.0
+
+
+class LoginThrottle:
+    """Per-username and per-IP login throttling.
+
+    Each attempt takes a token from both the username's and the client
+    IP's bucket. Consecutive failures beyond ``lockout_threshold`` lock the
+    key for ``lockout_base`` seconds, doubling with every further failure
+    up to ``lockout_max``. An IP may be shared by many users (NAT), so its
+    failures decay over ``ip_failure_decay_seconds`` and a successful
+    login from it clears them. Checks happen before any user lookup or
+    bcrypt work, so throttled attempts cost almost nothing.
+    """
+
+    def __init__(
+        self,
+        username_capacity: int = settings.LOGIN_USERNAME_BUCKET_CAPACITY,
+        username_refill_seconds: float = settings.LOGIN_USERNAME_REFILL_SECONDS,
+        ip_capacity: int = settings.LOGIN_IP_BUCKET_CAPACITY,
+        ip_refill_seconds: float = settings.LOGIN_IP_REFILL_SECONDS,
+        ip_failure_decay_seconds: float = settings.LOGIN_IP_FAILURE_DECAY_SECONDS,
+        lockout_threshold: int = settings.LOGIN_LOCKOUT_THRESHOLD,
+        lockout_base: float = settings.LOGIN_LOCKOUT_BASE_SECONDS,
+        lockout_max: float = settings.LOGIN_LOCKOUT_MAX_SECONDS,
+        idle_seconds: float = settings.LOGIN_THROTTLE_IDLE_SECONDS,
+        max_entries: int = settings.LOGIN_THROTTLE_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.usernames = BucketTable(username_capacity, username_refill_seconds, idle_seconds, max_entries)
+        self.ips = BucketTable(ip_capacity, ip_refill_seconds, idle_seconds, max_entries, ip_failure_decay_seconds)
+        self.lockout_threshold = lockout_threshold
+        self.lockout_base = lockout_base
+        self.lockout_max = lockout_max
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    @staticmethod
+    def _username_key(username: str) -> str:
+        return username.strip().lower()
+
+    def acquire(self, username: str, ip: str) -> int:
+        """Take one attempt; returns 0, or seconds to wait if throttled"""
+        with self._lock:
+            now = self.clock()
+            user_bucket = self.usernames.get(self._username_key(username), now)
+            ip_bucket = self.ips.get(ip, now)
+            wait = max(self.usernames.retry_after(user_bucket, now), self.ips.retry_after(ip_bucket, now))
+            if wait > 0:
+                self.rejected += 1
+                rate_limit_rejections.labels("login").inc()
+                return max(1, math.ceil(wait))
+            user_bucket.tokens -= 1
+            ip_bucket.tokens -= 1
+            return 0
+
+    def record_failure(self, username: str, ip: str):
+        with self._lock:
+            now = self.clock()
+            for table, key in ((self.usernames, self._username_key(username)), (self.ips, ip)):
+                bucket = table.get(key, now)
+                bucket.failures += 1
+                if bucket.failures >= self.lockout_threshold:
+                    exponent = int(bucket.failures) - self.lockout_threshold
+                    lockout = self.lockout_max if exponent >= 32 else min(self.lockout_max, self.lockout_base * 2 ** exponent)
+                    bucket.locked_until = now + lockout
+
+    def record_success(self, username: str, ip: str):
+        """Clear the failure streaks of the account and the client IP"""
+        with self._lock:
+            now = self.clock()
+            for bucket in (self.usernames.get(self._username_key(username), now), self.ips.get(ip, now)):
+                bucket.failures = 0.0
+                bucket.locked_until = 0.0
+
+    def clear(self):
+        with self._lock:
+            self.usernames = BucketTable(self.usernames.capacity, self.usernames.refill_seconds,
+                                         self.usernames.idle_seconds, self.usernames.max_entries)
+            self.ips = BucketTable(self.ips.capacity, self.ips.refill_seconds,
+                                   self.ips.idle_seconds, self.ips.max_entries, self.ips.failure_decay_seconds)
+
+
+login_throttle = LoginThrottle()
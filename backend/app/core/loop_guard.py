@@ -0,0 +1,64 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+from sqlalchemy import event
+from app.core.config import settings
+from app.core.metrics import sync_db_on_event_loop
+
+logger = logging.getLogger("database")
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORE_ROOT = os.path.join(APP_ROOT, "core")
+
+
+class SyncDatabaseOnEventLoop(RuntimeError):
+    """A blocking database statement was issued from the event loop thread"""
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def _call_site() -> str:
+    """Innermost application frame outside app/core, e.g. an endpoint"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(APP_ROOT) and not filename.startswith(CORE_ROOT):
+            return f"{os.path.relpath(filename, os.path.dirname(APP_ROOT))}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "unknown"
+
+
+def guard_event_loop(engine, mode: str = settings.SYNC_DB_GUARD):
+    """Flag statements a sync engine runs on the event loop thread.
+
+    Sync endpoints and dependencies run in the threadpool, where no loop
+    is running, so only blocking calls made directly from ``async def``
+    code trip the check. Async endpoints should use get_async_db or
+    run_in_threadpool instead.
+    """
+    if mode == "off":
+        return
+    warned = set()
+    lock = threading.Lock()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _check(conn, cursor, statement, parameters, context, executemany):
+        if not _on_event_loop():
+            return
+        sync_db_on_event_loop.inc()
+        site = _call_site()
+        if mode == "raise":
+            raise SyncDatabaseOnEventLoop(f"Blocking database call on the event loop from {site}")
+        with lock:
+            if site in warned:
+                return
+            warned.add(site)
+        logger.warning(f"Blocking database call on the event loop from {site}: {statement[:200]}")
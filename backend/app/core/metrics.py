@@ -0,0 +1,158 @@
+import os
+import time
+from typing import Callable, Dict, Iterable, Optional, Sequence, Tuple, Union
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+# With several uvicorn workers, set PROMETHEUS_MULTIPROC_DIR to an empty
+# directory before start-up; every worker then writes its samples there
+# and a scrape of any worker aggregates all of them
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+registry = CollectorRegistry()
+
+# Metrics recorded on the hot path
+http_request_duration = Histogram(
+    "greatreading_http_request_duration_seconds", "HTTP request latency by route",
+    ["method", "route", "status"], registry=registry,
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+http_requests_in_flight = Gauge(
+    "greatreading_http_requests_in_flight", "HTTP requests currently being handled",
+    registry=registry, multiprocess_mode="livesum"
+)
+db_query_duration = Histogram(
+    "greatreading_db_query_duration_seconds", "Database statement latency by statement type",
+    ["operation"], registry=registry,
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+)
+pdf_parse_duration = Histogram(
+    "greatreading_pdf_parse_duration_seconds", "Time spent parsing PDFs",
+    ["stage"], registry=registry,
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+)
+rate_limit_rejections = Counter(
+    "greatreading_rate_limit_rejections_total", "Requests rejected by the rate limiter", ["rule"],
+    registry=registry
+)
+sync_db_on_event_loop = Counter(
+    "greatreading_sync_db_on_event_loop_total", "Blocking database statements issued from the event loop thread",
+    registry=registry
+)
+
+
+def instrument_engine(engine):
+    """Record per-statement counts and durations for an SQLAlchemy engine"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("query_start")
+        if not starts:
+            return
+        operation = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else "other"
+        if operation not in ("select", "insert", "update", "delete"):
+            operation = "other"
+        db_query_duration.labels(operation).observe(time.perf_counter() - starts.pop())
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        starts = context.connection.info.get("query_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
+
+
+StateValue = Union[float, Dict[Tuple[str, ...], float]]
+
+
+class AppStateCollector(Collector):
+    """Counters and queue depths the app already keeps, read at scrape time.
+
+    The state lives in one worker's memory, so in multiprocess mode the
+    samples carry a ``pid`` label and only describe the worker that
+    answered the scrape.
+    """
+
+    def __init__(self):
+        self._metrics = []
+
+    def add(self, kind: str, name: str, documentation: str, read: Callable[[], StateValue],
+            labelnames: Sequence[str] = ()):
+        self._metrics.append((kind, name, documentation, read, tuple(labelnames)))
+
+    def collect(self) -> Iterable:
+        pid = (str(os.getpid()),) if MULTIPROCESS else ()
+        for kind, name, documentation, read, labelnames in self._metrics:
+            family_class = CounterMetricFamily if kind == "counter" else GaugeMetricFamily
+            family = family_class(name, documentation, labels=labelnames + (("pid",) if pid else ()))
+            try:
+                result = read()
+            except Exception:
+                continue
+            if not isinstance(result, dict):
+                result = {(): result}
+            for values, value in result.items():
+                family.add_metric(tuple(values) + pid, value)
+            yield family
+
+
+app_state = AppStateCollector()
+
+
+def register_app_metrics():
+    """Expose counters and queue depths the app already keeps"""
+    from app.core.cache import response_cache
+    from app.core.logging import logging_stats
+    from app.core.principal_cache import principal_cache
+    from app.core.revocation import revocation_list
+    from app.core.security import password_hasher
+    from app.services.progress_buffer import progress_buffer
+
+    if app_state._metrics:
+        return
+    caches = {"response": response_cache, "principal": principal_cache}
+    app_state.add("counter", "greatreading_cache_hits_total", "Cache hits",
+                  lambda: {(name,): cache.hits for name, cache in caches.items()}, ["cache"])
+    app_state.add("counter", "greatreading_cache_misses_total", "Cache misses",
+                  lambda: {(name,): cache.misses for name, cache in caches.items()}, ["cache"])
+    app_state.add("gauge", "greatreading_queue_depth", "Items waiting in background queues", lambda: {
+        ("progress_heartbeats",): progress_buffer.pending_count,
+        ("log_records",): logging_stats()["queued"],
+        ("password_hashing",): password_hasher.in_flight,
+    }, ["queue"])
+    app_state.add("gauge", "greatreading_progress_oldest_pending_seconds", "Age of the oldest unflushed heartbeat",
+                  progress_buffer.oldest_pending_age)
+    app_state.add("counter", "greatreading_progress_heartbeats_dropped_total",
+                  "Heartbeats refused because the buffer was full", lambda: progress_buffer.heartbeats_dropped)
+    app_state.add("counter", "greatreading_log_records_dropped_total", "Log records dropped on a full queue",
+                  lambda: logging_stats()["dropped"])
+    app_state.add("counter", "greatreading_password_hash_rejections_total",
+                  "Logins shed because the hashing pool was full", lambda: password_hasher.rejected)
+    app_state.add("gauge", "greatreading_revoked_tokens", "Revoked access tokens mirrored in memory",
+                  lambda: len(revocation_list))
+    registry.register(app_state)
+
+
+def render_metrics() -> bytes:
+    """Prometheus text exposition of this worker, or of all workers in multiprocess mode"""
+    if not MULTIPROCESS:
+        return generate_latest(registry)
+    # Per-process metric objects are read back from the shared directory
+    scrape = CollectorRegistry()
+    multiprocess.MultiProcessCollector(scrape)
+    scrape.register(app_state)
+    return generate_latest(scrape)
+
+
+def mark_process_dead(pid: Optional[int] = None):
+    """Drop a stopped worker's live gauges from multiprocess aggregation"""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(pid or os.getpid())
@@ -0,0 +1,106 @@
+import base64
+import json
+import math
+from datetime import datetime
+from typing import Optional, Type
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query
+from app.schemas.responses import PaginatedResponse
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(created_at: datetime, row_id: int, page: int, direction: str, total: int) -> str:
+    """Pack a keyset position into an opaque, URL-safe token"""
+    payload = {
+        "c": created_at.isoformat(),
+        "i": row_id,
+        "p": page,
+        "d": direction,
+        "t": total,
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """Unpack a cursor produced by encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        payload["c"] = datetime.fromisoformat(payload["c"])
+        if payload["d"] not in ("next", "prev"):
+            raise ValueError("bad direction")
+        int(payload["i"]), int(payload["p"]), int(payload["t"])
+        return payload
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+def keyset_paginate(
+    query: Query,
+    model,
+    schema: Type[BaseModel],
+    cursor: Optional[str] = None,
+    size: int = DEFAULT_PAGE_SIZE,
+) -> PaginatedResponse:
+    """Paginate query newest-first on (created_at, id).
+
+    Each page is a single range scan seeking past the cursor row, so page
+    1000 costs the same as page 1. The total is counted on the first page
+    only and carried forward inside the cursor.
+    """
+    created_col, id_col = model.created_at, model.id
+
+    if cursor:
+        position = decode_cursor(cursor)
+        direction, page, total = position["d"], position["p"], position["t"]
+        created_at, row_id = position["c"], position["i"]
+        if direction == "next":
+            query = query.filter(or_(
+                created_col < created_at,
+                and_(created_col == created_at, id_col < row_id)
+            )).order_by(created_col.desc(), id_col.desc())
+        else:
+            query = query.filter(or_(
+                created_col > created_at,
+                and_(created_col == created_at, id_col > row_id)
+            )).order_by(created_col.asc(), id_col.asc())
+    else:
+        direction, page = "next", 1
+        total = query.order_by(None).count()
+        query = query.order_by(created_col.desc(), id_col.desc())
+
+    rows = query.limit(size + 1).all()
+    has_more = len(rows) > size
+    rows = rows[:size]
+
+    if direction == "prev":
+        rows.reverse()
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, cursor is not None
+
+    next_cursor = prev_cursor = None
+    if rows and has_next:
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id, page + 1, "next", total)
+    if rows and has_prev:
+        prev_cursor = encode_cursor(rows[0].created_at, rows[0].id, page - 1, "prev", total)
+
+    return PaginatedResponse(
+        items=[schema.model_validate(row) for row in rows],
+        total=total,
+        page=page,
+        size=size,
+        pages=math.ceil(total / size) if total else 0,
+        has_next=has_next,
+        has_prev=has_prev,
+        next_cursor=next_cursor,
+        prev_cursor=prev_cursor,
+    )
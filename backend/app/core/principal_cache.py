@@ -0,0 +1,95 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from app.core.config import settings
+from app.models.user import User
+
+
+class PrincipalCache:
+    """Short-lived cache of authenticated users keyed by token subject.
+
+    Cached users are detached snapshots, so they can be shared between
+    requests without tying them to a closed session. Any ORM update or
+    delete of a user (deactivation, password change) evicts it at once in
+    this process; other worker processes notice within ``ttl`` seconds.
+    """
+
+    def __init__(self, ttl: float = settings.PRINCIPAL_CACHE_TTL_SECONDS,
+                 max_entries: int = settings.PRINCIPAL_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[User, float]]" = OrderedDict()
+        self._keys_by_user: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def snapshot(user: User) -> User:
+        """Copy the user's column values into an instance outside any session"""
+        return User(**{column.key: getattr(user, column.key) for column in User.__table__.columns})
+
+    def get(self, key: str) -> Optional[User]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                if entry is not None:
+                    self._evict(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: str, user: User) -> User:
+        """Cache a snapshot of ``user`` under ``key`` and return the snapshot"""
+        principal = self.snapshot(user)
+        with self._lock:
+            self._evict(key)
+            self._entries[key] = (principal, time.monotonic() + self.ttl)
+            self._keys_by_user.setdefault(principal.id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._evict(next(iter(self._entries)))
+        return principal
+
+    def invalidate_user(self, user_id: int):
+        with self._lock:
+            for key in list(self._keys_by_user.get(user_id, ())):
+                self._evict(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def _evict(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            keys = self._keys_by_user.get(entry[0].id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_user[entry[0].id]
+
+
+principal_cache = PrincipalCache()
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _evict_changed_user(mapper, connection, target):
+    principal_cache.invalidate_user(target.id)
+    # Evict again once committed, in case another request re-cached the
+    # old row between this flush and the commit
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("changed_user_ids", set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_committed_users(session):
+    for user_id in session.info.pop("changed_user_ids", ()):
+        principal_cache.invalidate_user(user_id)
@@ -0,0 +1,170 @@
+import heapq
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta
+from typing import List, Optional
+from jose import JWTError, jwt
+from app.core.config import settings
+
+# Only stacks that pass through application code are kept, which drops
+# idle worker threads and the event loop waiting on sockets
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_ROOT = os.path.dirname(APP_ROOT)
+MAX_STACK_DEPTH = 128
+
+
+def create_profiling_token(user_id: int) -> str:
+    """Short-lived token that lets a request ask to be profiled"""
+    expire = datetime.utcnow() + timedelta(minutes=settings.PROFILING_TOKEN_EXPIRE_MINUTES)
+    return jwt.encode({"sub": str(user_id), "typ": "profile", "exp": expire},
+                      settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+def verify_profiling_token(token: str) -> bool:
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return False
+    return payload.get("typ") == "profile"
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    if filename.startswith(PROJECT_ROOT):
+        filename = os.path.relpath(filename, PROJECT_ROOT)
+    else:
+        filename = os.path.basename(filename)
+    return f"{filename}:{code.co_name}"
+
+
+class Collector:
+    """Stack samples gathered while one request ran"""
+
+    def __init__(self):
+        self.stacks: Counter = Counter()
+        self.samples = 0
+
+    def collapsed(self) -> str:
+        """Folded stacks, one "frame;frame;frame count" line per stack"""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+
+class StackSampler:
+    """Wall-clock sampling profiler for the threads running app code.
+
+    One background thread samples every ``interval`` seconds while at
+    least one collector is active, so it covers both async endpoints on
+    the event loop and sync ones in the threadpool. Requests that overlap
+    a profiled one show up in its samples too.
+    """
+
+    def __init__(self, interval: float = settings.PROFILING_INTERVAL_MS / 1000):
+        self.interval = interval
+        self._collectors: List[Collector] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> Collector:
+        collector = Collector()
+        with self._lock:
+            self._collectors.append(collector)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+                self._thread.start()
+        return collector
+
+    def stop(self, collector: Collector):
+        with self._lock:
+            if collector in self._collectors:
+                self._collectors.remove(collector)
+
+    def sample(self) -> List[str]:
+        """Collapsed stacks of every thread currently in app code"""
+        own = threading.get_ident()
+        stacks = []
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own:
+                continue
+            labels = []
+            in_app = False
+            depth = 0
+            while frame is not None and depth < MAX_STACK_DEPTH:
+                code = frame.f_code
+                if code.co_filename.startswith(APP_ROOT):
+                    in_app = True
+                labels.append(_frame_label(code))
+                frame = frame.f_back
+                depth += 1
+            if in_app:
+                stacks.append(";".join(reversed(labels)))
+        return stacks
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._collectors:
+                    self._thread = None
+                    return
+                collectors = list(self._collectors)
+            stacks = self.sample()
+            for collector in collectors:
+                collector.samples += 1
+                collector.stacks.update(stacks)
+            time.sleep(self.interval)
+
+
+class ProfileStore:
+    """Recent profiles by id plus a rolling set of the slowest requests"""
+
+    def __init__(self, max_profiles: int = settings.PROFILING_MAX_STORED,
+                 slowest_n: int = settings.PROFILING_SLOWEST_N):
+        self.max_profiles = max_profiles
+        self.slowest_n = slowest_n
+        self._profiles: "OrderedDict[str, dict]" = OrderedDict()
+        self._slowest: List[tuple] = []  # min-heap of (duration_ms, seq, entry)
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def new_id() -> str:
+        return uuid.uuid4().hex
+
+    def save(self, profile_id: str, request: dict, collector: Collector) -> dict:
+        profile = dict(request, id=profile_id, samples=collector.samples, collapsed=collector.collapsed())
+        with self._lock:
+            self._profiles[profile_id] = profile
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+        return profile
+
+    def get(self, profile_id: str) -> Optional[dict]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def record_slow(self, request: dict, profile_id: Optional[str] = None):
+        entry = dict(request, profile_id=profile_id)
+        with self._lock:
+            self._seq += 1
+            item = (entry["duration_ms"], self._seq, entry)
+            if len(self._slowest) < self.slowest_n:
+                heapq.heappush(self._slowest, item)
+            elif item[0] > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, item)
+
+    def slowest(self) -> List[dict]:
+        with self._lock:
+            items = sorted(self._slowest, reverse=True)
+        return [entry for _, _, entry in items]
+
+    def clear(self):
+        with self._lock:
+            self._profiles.clear()
+            self._slowest = []
+
+
+stack_sampler = StackSampler()
+profile_store = ProfileStore()
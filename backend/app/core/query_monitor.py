@@ -0,0 +1,89 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import List, Optional
+from sqlalchemy import event
+from app.core.config import settings
+
+logger = logging.getLogger("database")
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:\?|%s|:\w+)\s*,)+\s*(?:\?|%s|:\w+)\s*\)")
+
+
+def statement_shape(statement: str) -> str:
+    """Statement with literals and IN-lists folded, so repeats compare equal"""
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _PLACEHOLDER_LIST.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+def redact_parameters(parameters) -> str:
+    """Describe bound parameters without their values"""
+    if not parameters:
+        return "[]"
+    if isinstance(parameters, (list, tuple)) and parameters and isinstance(parameters[0], (list, tuple, dict)):
+        return f"[{len(parameters)} parameter sets redacted]"
+    return f"[{len(parameters)} values redacted]"
+
+
+class QueryStats:
+    """Queries issued while handling one request"""
+
+    def __init__(self, label: str = "", n_plus_one_threshold: int = settings.N_PLUS_ONE_THRESHOLD):
+        self.label = label
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.count = 0
+        self.total_seconds = 0.0
+        self.shapes: Counter = Counter()
+        self.repeated: List[str] = []
+
+    def record(self, statement: str, duration: float):
+        self.count += 1
+        self.total_seconds += duration
+        shape = statement_shape(statement)
+        self.shapes[shape] += 1
+        if self.shapes[shape] == self.n_plus_one_threshold:
+            self.repeated.append(shape)
+            logger.warning(
+                f"Possible N+1 in {self.label or 'request'}: statement repeated "
+                f"{self.n_plus_one_threshold}+ times: {shape[:500]}"
+            )
+
+
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+def instrument_queries(engine, slow_ms: float = settings.SLOW_QUERY_MS):
+    """Attribute statements to the current request and log slow ones"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_monitor_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("query_monitor_start")
+        if not starts:
+            return
+        duration = time.perf_counter() - starts.pop()
+        stats = current_query_stats.get()
+        if stats is not None:
+            stats.record(statement, duration)
+        if duration * 1000 >= slow_ms:
+            where = f" in {stats.label}" if stats is not None and stats.label else ""
+            logger.warning(
+                f"Slow query ({duration*1000:.1f}ms){where}: "
+                f"{_WHITESPACE.sub(' ', statement).strip()[:2000]} {redact_parameters(parameters)}"
+            )
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        conn = context.connection
+        if conn is not None and conn.info.get("query_monitor_start"):
+            conn.info["query_monitor_start"].pop()
@@ -0,0 +1,177 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Tuple
+from app.core.config import settings
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: float
+    retry_after: float
+
+
+def gcra(tat: Optional[float], now: float, limit: int, period: float) -> Tuple[RateLimitResult, Optional[float]]:
+    """Generic cell rate algorithm step.
+
+    ``tat`` is the key's theoretical arrival time (None if unseen). Returns
+    the decision and the new TAT to store, or None if nothing changes.
+    Allows bursts of ``limit`` requests and ``limit`` per ``period`` on
+    average, i.e. a smooth sliding window kept in one float per key.
+    """
+    emission = period / limit
+    tolerance = period - emission
+    tat = max(tat or now, now)
+    backlog = tat - now
+    if backlog > tolerance:
+        return RateLimitResult(False, limit, 0, backlog, backlog - tolerance), None
+    remaining = int((tolerance - backlog) / emission + 1e-9)
+    return RateLimitResult(True, limit, remaining, backlog + emission, 0.0), tat + emission
+
+
+class RateLimitBackend(ABC):
+    """Storage for per-key GCRA state.
+
+    ``hit`` must read, decide and write atomically for the key; backends
+    that are shared between worker processes make limits global. Backends
+    that can wait on I/O or locks set ``blocking`` and are called off the
+    event loop.
+    """
+
+    blocking = False
+
+    @abstractmethod
+    def hit(self, key: str, limit: int, period: float) -> RateLimitResult:
+        ...
+
+    @abstractmethod
+    def clear(self):
+        ...
+
+
+class MemoryBackend(RateLimitBackend):
+    """Per-process backend; each uvicorn worker enforces its own limits"""
+
+    def __init__(self, max_entries: int = settings.RATE_LIMIT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._tats: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._tats)
+
+    def hit(self, key: str, limit: int, period: float) -> RateLimitResult:
+        now = time.time()
+        with self._lock:
+            result, new_tat = gcra(self._tats.get(key), now, limit, period)
+            if new_tat is not None:
+                self._tats[key] = new_tat
+                self._tats.move_to_end(key)
+            # A key whose TAT has passed is indistinguishable from an unseen one
+            while self._tats:
+                oldest_key, oldest_tat = next(iter(self._tats.items()))
+                if oldest_tat > now and len(self._tats) <= self.max_entries:
+                    break
+                del self._tats[oldest_key]
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._tats.clear()
+
+
+class SQLiteBackend(RateLimitBackend):
+    """Backend shared by every worker on the host through a SQLite file.
+
+    Each hit is one short IMMEDIATE transaction, which serialises writers
+    across processes without a separate lock service.
+    """
+
+    PURGE_EVERY = 1000
+    # BEGIN IMMEDIATE waits for the file's write lock
+    blocking = True
+
+    def __init__(self, path: str = settings.RATE_LIMIT_SQLITE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._hits = 0
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS rate_limits (key TEXT PRIMARY KEY, tat REAL NOT NULL)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def hit(self, key: str, limit: int, period: float) -> RateLimitResult:
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tat FROM rate_limits WHERE key = ?", (key,)).fetchone()
+            result, new_tat = gcra(row[0] if row else None, now, limit, period)
+            if new_tat is not None:
+                conn.execute(
+                    "INSERT INTO rate_limits (key, tat) VALUES (?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET tat = excluded.tat",
+                    (key, new_tat)
+                )
+            self._hits += 1
+            if self._hits % self.PURGE_EVERY == 0:
+                conn.execute("DELETE FROM rate_limits WHERE tat <= ?", (now,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return result
+
+    def clear(self):
+        self._connect().execute("DELETE FROM rate_limits")
+
+
+RATE_LIMIT_BACKENDS = {
+    "memory": MemoryBackend,
+    "sqlite": SQLiteBackend,
+}
+
+
+def create_backend(name: str = settings.RATE_LIMIT_BACKEND) -> RateLimitBackend:
+    if name not in RATE_LIMIT_BACKENDS:
+        raise ValueError(f"Unknown rate limit backend: {name}")
+    return RATE_LIMIT_BACKENDS[name]()
+
+
+rate_limit_backend = create_backend()
+
+
+class RateLimitRule(NamedTuple):
+    name: str
+    path_prefix: str
+    limit: int
+    period: float
+    per_user: bool = True
+
+
+def rate_limit_headers(result: RateLimitResult, period: float) -> dict:
+    """Headers from the IETF RateLimit header fields draft"""
+    headers = {
+        "RateLimit-Limit": str(result.limit),
+        "RateLimit-Remaining": str(result.remaining),
+        "RateLimit-Reset": str(math.ceil(result.reset_after)),
+        "RateLimit-Policy": f"{result.limit};w={int(period)}",
+    }
+    if not result.allowed:
+        headers["Retry-After"] = str(max(1, math.ceil(result.retry_after)))
+    return headers
@@ -0,0 +1,145 @@
+import hashlib
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.revoked_token import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+# Re-read rows stamped slightly before the last sync so that revocations
+# committed late by another worker are not missed
+SYNC_OVERLAP = timedelta(seconds=5)
+PURGE_INTERVAL_SECONDS = 3600.0
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (no false negatives)"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.size = max(8, int(math.ceil(-self.capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.hash_count = max(1, int(round(self.size / self.capacity * math.log(2))))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.sha256(item.encode()).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:16], "big") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RevocationList:
+    """In-process mirror of the revoked_tokens table.
+
+    Lookups hit a Bloom filter first and only consult the exact set on a
+    possible match. Revocations made in this process apply immediately;
+    revocations made by other workers are picked up by an incremental
+    sync at most every ``sync_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        sync_interval: float = settings.REVOCATION_SYNC_INTERVAL_SECONDS,
+        capacity: int = settings.REVOCATION_BLOOM_CAPACITY,
+        error_rate: float = settings.REVOCATION_BLOOM_ERROR_RATE,
+    ):
+        self.session_factory = session_factory
+        self.sync_interval = sync_interval
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._revoked: Dict[str, datetime] = {}  # jti -> expires_at
+        self._synced_through: Optional[datetime] = None
+        self._next_sync = 0.0
+        self._next_purge = 0.0
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    def _add(self, jti: str, expires_at: datetime):
+        with self._lock:
+            if jti in self._revoked:
+                return
+            self._revoked[jti] = expires_at
+            self._bloom.add(jti)
+
+    def revoke(self, db: Session, jti: str, user_id: int, expires_at: datetime):
+        """Record a revocation; the caller commits"""
+        db.add(RevokedToken(jti=jti, user_id=user_id, expires_at=expires_at))
+        self._add(jti, expires_at)
+
+    def is_revoked(self, jti: str) -> bool:
+        if time.monotonic() >= self._next_sync:
+            self.sync()
+        if jti not in self._bloom:
+            return False
+        return jti in self._revoked
+
+    def sync(self):
+        """Pull revocations recorded since the last sync"""
+        with self._sync_lock:
+            if time.monotonic() < self._next_sync:
+                return
+            started_at = datetime.utcnow()
+            db = self.session_factory()
+            try:
+                query = db.query(RevokedToken.jti, RevokedToken.expires_at).filter(
+                    RevokedToken.expires_at > started_at
+                )
+                if self._synced_through is not None:
+                    query = query.filter(RevokedToken.revoked_at >= self._synced_through - SYNC_OVERLAP)
+                for jti, expires_at in query:
+                    self._add(jti, expires_at)
+                if time.monotonic() >= self._next_purge:
+                    self._purge(db, started_at)
+            except SQLAlchemyError as e:
+                # Keep serving from what we have and retry on the next interval
+                logger.error(f"Revocation sync failed: {e}")
+            else:
+                self._synced_through = started_at
+            finally:
+                db.close()
+                self._next_sync = time.monotonic() + self.sync_interval
+
+    def _purge(self, db: Session, now: datetime):
+        """Forget revocations of tokens that have expired anyway"""
+        db.query(RevokedToken).filter(RevokedToken.expires_at <= now).delete(synchronize_session=False)
+        db.commit()
+        with self._lock:
+            self._revoked = {jti: exp for jti, exp in self._revoked.items() if exp > now}
+            # Expired entries stay in the filter until it is rebuilt
+            if self._bloom.count > self.capacity:
+                self._bloom = BloomFilter(max(self.capacity, 2 * len(self._revoked)), self.error_rate)
+                for jti in self._revoked:
+                    self._bloom.add(jti)
+        self._next_purge = time.monotonic() + PURGE_INTERVAL_SECONDS
+
+    def clear(self):
+        with self._lock:
+            self._bloom = BloomFilter(self.capacity, self.error_rate)
+            self._revoked = {}
+            self._synced_through = None
+            self._next_sync = 0.0
+
+
+revocation_list = RevocationList()
@@ -1,10 +1,77 @@
+import asyncio
+import hashlib
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from .config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+def build_password_context(rounds: int) -> CryptContext:
+    # Pinning min/max to the configured cost makes passlib flag every hash
+    # made with another cost as needing an update
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+pwd_context = build_password_context(settings.BCRYPT_ROUNDS)
+
+class HashingPoolSaturated(Exception):
+    """Raised when the password hashing pool has no room for more work"""
+
+class PasswordHasher:
+    """Runs bcrypt on a small dedicated thread pool.
+
+    Keeping hashing off the shared request threadpool means a login burst
+    cannot starve other endpoints. At most ``workers + max_queue`` hashes
+    may be running or waiting; beyond that callers get HashingPoolSaturated
+    straight away instead of queueing behind the burst.
+    """
+
+    def __init__(self, context: CryptContext, workers: int, max_queue: int):
+        self.context = context
+        self.capacity = workers + max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _release(self, _future):
+        with self._lock:
+            self._in_flight -= 1
+
+    def _submit(self, fn, *args) -> asyncio.Future:
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self.rejected += 1
+                raise HashingPoolSaturated()
+            self._in_flight += 1
+        try:
+            future = asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        except BaseException:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(self.context.hash, password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Verify a password; also returns a new hash if the cost changed"""
+        return await self._submit(self.context.verify_and_update, plain_password, hashed_password)
+
+password_hasher = PasswordHasher(pwd_context, settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_QUEUE)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -12,6 +79,23 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+def create_user_access_token(user) -> str:
+    """Short-lived access token carrying just enough to authorize requests"""
+    return create_access_token(data={
+        "sub": str(user.id),
+        "act": bool(user.is_active),
+        "typ": "access",
+        "jti": secrets.token_hex(16),
+    })
+
+def generate_refresh_token() -> Tuple[str, str]:
+    """Return a new opaque refresh token and the hash that gets stored"""
+    token = secrets.token_urlsafe(32)
+    return token, hash_refresh_token(token)
+
+def hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
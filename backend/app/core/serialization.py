@@ -0,0 +1,21 @@
+from typing import Any
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+
+def _fallback(value: Any) -> Any:
+    return jsonable_encoder(value)
+
+
+def render_json(content: Any) -> bytes:
+    """Serialize a response body without a jsonable_encoder pass.
+
+    Pydantic models go straight through pydantic-core's serializer; plain
+    containers through orjson, falling back to jsonable_encoder only for
+    types neither understands.
+    """
+    if isinstance(content, BaseModel):
+        return to_json(content)
+    return orjson.dumps(content, default=_fallback, option=orjson.OPT_NON_STR_KEYS)
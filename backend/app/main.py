@@ -1,10 +1,26 @@
-from fastapi import FastAPI
+from datetime import datetime
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from app.core.config import settings
-from app.core.database import init_db
-from app.core.logging import setup_logging
+from app.core.database import engine, init_db
+from app.core.health import (
+    check_database, check_dictionary_upstream, check_job_queues, check_upload_dir, health_monitor
+)
+from app.core.logging import setup_logging, shutdown_logging
+from app.core.loop_guard import guard_event_loop
+from app.api.deps import require_metrics_token
+from app.core.metrics import (
+    CONTENT_TYPE, instrument_engine, mark_process_dead, register_app_metrics, render_metrics
+)
+from app.core.query_monitor import instrument_queries
 from app.middleware.logging_middleware import LoggingMiddleware, RateLimitingMiddleware
+from app.middleware.metrics_middleware import MetricsMiddleware
+from app.middleware.profiling_middleware import ProfilingMiddleware
+from app.middleware.query_stats_middleware import QueryStatsMiddleware
+from app.schemas.responses import HealthCheckResponse
+from app.services.progress_buffer import progress_buffer
 
 # Setup logging
 setup_logging()
@@ -12,19 +28,29 @@ setup_logging()
 # Initialize database on startup
 init_db()
 
+# Telemetry exposed on /metrics
+instrument_engine(engine)
+instrument_queries(engine)
+guard_event_loop(engine)
+register_app_metrics()
+
 app = FastAPI(
     title="GreatReading API",
     description="Backend API for GreatReading - Focused Reading App",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
 origins = ["https://glowing-succotash-9qwjwwqqvr937xjw-5173.app.github.dev", "http://localhost:5173", "http://localhost:3000"]
 
 # Add middleware
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(ProfilingMiddleware)
 app.add_middleware(LoggingMiddleware)
 app.add_middleware(RateLimitingMiddleware, max_requests=100, window_seconds=60)
+app.add_middleware(MetricsMiddleware)
 
 # Configure CORS
 app.add_middleware(
@@ -39,15 +65,37 @@ app.add_middleware(
 app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_DIR), name="uploads")
 
 # Import and include routers
-from app.api.endpoints import auth, books, dictionary, reading
-from app.api.endpoints.enhanced_books import router as enhanced_books_router
+from app.api.endpoints import auth, books, dictionary, reading, export, admin
+from app.api.endpoints.enhanced_books import processing_status, router as enhanced_books_router
 
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(books.router, prefix="/api/books", tags=["books"])
 app.include_router(dictionary.router, prefix="/api/dictionary", tags=["dictionary"])
 app.include_router(reading.router, prefix="/api/reading", tags=["reading"])
+app.include_router(export.router, prefix="/api/export", tags=["export"])
+app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
 app.include_router(enhanced_books_router, prefix="/api/books", tags=["books"])
 
+# Deep checks behind /health/ready; the dictionary API is optional
+health_monitor.register("database", lambda: check_database(engine))
+health_monitor.register("upload_dir", check_upload_dir)
+health_monitor.register("job_queues", lambda: check_job_queues(progress_buffer, processing_status))
+health_monitor.register("dictionary_upstream", check_dictionary_upstream, critical=False)
+
+@app.on_event("startup")
+def start_background_workers():
+    setup_logging()
+    progress_buffer.start()
+    health_monitor.start()
+
+@app.on_event("shutdown")
+def stop_background_workers():
+    # Flush buffered reading progress before the process exits
+    progress_buffer.stop()
+    health_monitor.stop()
+    mark_process_dead()
+    shutdown_logging()
+
 @app.get("/")
 def read_root():
     return {
@@ -57,14 +105,38 @@ def read_root():
         "status": "running"
     }
 
-@app.get("/health")
+def health_response(report: dict) -> HealthCheckResponse:
+    return HealthCheckResponse(
+        status=report["status"],
+        version=app.version,
+        timestamp=report["checked_at"] or datetime.utcnow(),
+        dependencies={name: result.status for name, result in report["checks"].items()},
+        uptime=round(health_monitor.uptime, 1)
+    )
+
+@app.get("/health", response_model=HealthCheckResponse)
 def health_check():
-    return {
-        "status": "healthy",
-        "database": "connected",
-        "timestamp": "now",
-        "version": "1.0.0"
-    }
+    """Last background check results; always 200"""
+    return health_response(health_monitor.report())
+
+@app.get("/health/live")
+def liveness():
+    """The process is up and serving; no dependencies are checked"""
+    return {"status": "alive", "uptime": round(health_monitor.uptime, 1)}
+
+@app.get("/health/ready", response_model=HealthCheckResponse)
+def readiness():
+    """503 until the first checks pass, or when a critical one fails"""
+    report = health_monitor.report()
+    body = health_response(report)
+    if not report["ready"]:
+        return ORJSONResponse(status_code=503, content=body.model_dump(mode="json"))
+    return body
+
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(require_metrics_token)])
+def metrics():
+    """Prometheus text format; scrapers authenticate with METRICS_SCRAPE_TOKEN"""
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE)
 
 @app.get("/api/test")
 def test_endpoint():
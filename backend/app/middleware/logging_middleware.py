@@ -1,77 +1,186 @@
+import random
 import time
 import uuid
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from typing import List, Optional, Tuple
+import anyio
+from jose import JWTError, jwt
+from starlette.datastructures import Headers, MutableHeaders
 from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import logging
+from app.core.config import settings
+from app.core.logging import request_logger
+from app.core.metrics import rate_limit_rejections
+from app.core.rate_limit import (
+    RateLimitBackend, RateLimitResult, RateLimitRule, rate_limit_backend, rate_limit_headers
+)
 
 logger = logging.getLogger(__name__)
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware for logging all HTTP requests"""
+# Routes with their own, stricter budgets on top of the global limit
+DEFAULT_ROUTE_RULES = [
+    RateLimitRule("auth", "/api/auth/", 30, 60, per_user=False),
+    RateLimitRule("export", "/api/export/", 10, 60),
+    RateLimitRule("upload", "/api/books/upload", 10, 60),
+]
+
+# Both middlewares are plain ASGI callables rather than BaseHTTPMiddleware
+# subclasses: they only touch the response start message, so bodies
+# (including streaming responses) pass through unbuffered and background
+# tasks run in the request's own task.
+
+class LoggingMiddleware:
+    """Middleware for logging all HTTP requests.
+
+    Writes one structured access record per request through
+    RequestLogger. Errors and slow requests are always logged; the rest
+    are sampled at ``sample_rate``, so a skipped request costs a single
+    random() call.
+    """
     
-    async def dispatch(self, request: Request, call_next):
-        # Generate request ID
-        request_id = str(uuid.uuid4())
-        request.state.request_id = request_id
+    def __init__(self, app: ASGIApp, sample_rate: float = settings.ACCESS_LOG_SAMPLE_RATE,
+                 slow_ms: float = settings.ACCESS_LOG_SLOW_MS):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.logged = 0
+        self.sampled_out = 0
+    
+    def _should_log(self, status_code: int, duration: float) -> bool:
+        if status_code >= 400 or duration * 1000 >= self.slow_ms:
+            return True
+        return random.random() < self.sample_rate
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        # Log request start
-        logger.info(f"Request started: {request.method} {request.url.path} - ID: {request_id}")
+        # Generate request ID; visible to endpoints as request.state.request_id
+        request_id = str(uuid.uuid4())
+        state = scope.setdefault("state", {})
+        state["request_id"] = request_id
         
-        # Process request and measure time
         start_time = time.time()
+        status_code = 500
+        ttfb = None
+        
+        async def send_wrapper(message: Message):
+            nonlocal status_code, ttfb
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Time to first byte; streamed bodies keep flowing after this
+                ttfb = time.time() - start_time
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Request-ID", request_id)
+                headers.append("X-Response-Time", f"{ttfb*1000:.2f}ms")
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                self._access_log(scope, request_id, status_code, time.time() - start_time, ttfb)
+            await send(message)
+        
         try:
-            response = await call_next(request)
-            duration = time.time() - start_time
-            
-            # Log request completion
-            logger.info(f"Request completed: {request.method} {request.url.path} - {response.status_code} - {duration*1000:.2f}ms")
-            
-            # Add request ID to response headers
-            response.headers["X-Request-ID"] = request_id
-            response.headers["X-Response-Time"] = f"{duration*1000:.2f}ms"
-            
-            return response
-            
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
             duration = time.time() - start_time
-            logger.error(f"Request error: {request.method} {request.url.path} - {str(e)} - {duration*1000:.2f}ms")
+            logger.error(f"Request error: {scope['method']} {scope['path']} - {str(e)} - {duration*1000:.2f}ms")
             raise
+    
+    def _access_log(self, scope: Scope, request_id: str, status_code: int, duration: float, ttfb: float):
+        if not self._should_log(status_code, duration):
+            self.sampled_out += 1
+            return
+        self.logged += 1
+        # Route template (e.g. /api/books/{book_id}) keeps the log low-cardinality
+        route = scope.get("route")
+        request_logger.log_request(
+            request_id, scope["method"], scope["path"], status_code, duration,
+            user_id=scope["state"].get("user_id"),
+            route=getattr(route, "path_format", None),
+            ttfb=ttfb
+        )
+
+class RateLimitingMiddleware:
+    """GCRA rate limiting with a global limit and stricter per-route limits.
 
-class RateLimitingMiddleware(BaseHTTPMiddleware):
-    """Basic rate limiting middleware"""
+    Authenticated requests are limited per user (the token subject),
+    anonymous ones per client IP. Every request costs O(1) in the backend.
+    """
     
-    def __init__(self, app, max_requests: int = 100, window_seconds: int = 60):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp, max_requests: int = 100, window_seconds: int = 60,
+                 backend: Optional[RateLimitBackend] = None, rules: Optional[List[RateLimitRule]] = None):
+        self.app = app
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self.requests = {}
+        self.backend = backend if backend is not None else rate_limit_backend
+        self.default_rule = RateLimitRule("default", "", max_requests, window_seconds)
+        self.rules = DEFAULT_ROUTE_RULES if rules is None else rules
+    
+    @staticmethod
+    def _subject(scope: Scope) -> Optional[str]:
+        """Token subject of a bearer request, or None"""
+        authorization = Headers(scope=scope).get("authorization", "")
+        if not authorization.lower().startswith("bearer "):
+            return None
+        try:
+            payload = jwt.decode(authorization[7:], settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        except JWTError:
+            return None
+        return payload.get("sub") or None
     
-    async def dispatch(self, request: Request, call_next):
-        # Get client IP
-        client_ip = request.client.host if request.client else "unknown"
+    def _check(self, rules: List[RateLimitRule], subject: Optional[str],
+               client_ip: str) -> Tuple[RateLimitResult, RateLimitRule, str]:
+        """Hit each rule in turn; returns the first denial or the tightest result"""
+        tightest = None
+        for rule in rules:
+            identity = f"user:{subject}" if rule.per_user and subject else f"ip:{client_ip}"
+            key = f"{rule.name}:{identity}"
+            result = self.backend.hit(key, rule.limit, rule.period)
+            if not result.allowed:
+                return result, rule, key
+            # Report the most restrictive limit
+            if tightest is None or result.remaining < tightest[0].remaining:
+                tightest = (result, rule, key)
+        return tightest
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        path = scope["path"]
+        applicable = [self.default_rule]
+        route_rule = next((rule for rule in self.rules if path.startswith(rule.path_prefix)), None)
+        if route_rule:
+            applicable.append(route_rule)
+        
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
+        # Decoded once, whatever the number of rules
+        subject = self._subject(scope) if any(rule.per_user for rule in applicable) else None
+        
+        if self.backend.blocking:
+            result, rule, key = await anyio.to_thread.run_sync(self._check, applicable, subject, client_ip)
+        else:
+            result, rule, key = self._check(applicable, subject, client_ip)
         
-        # Clean old entries
-        current_time = time.time()
-        self.requests = {
-            ip: [t for t in times if current_time - t < self.window_seconds]
-            for ip, times in self.requests.items()
-        }
+        if not result.allowed:
+            logger.warning(f"Rate limit '{rule.name}' exceeded for {key}")
+            rate_limit_rejections.labels(rule.name).inc()
+            response = Response(
+                content="Rate limit exceeded",
+                status_code=429,
+                headers=rate_limit_headers(result, rule.period)
+            )
+            await response(scope, receive, send)
+            return
         
-        # Check rate limit
-        if client_ip in self.requests:
-            recent_requests = self.requests[client_ip]
-            if len(recent_requests) >= self.max_requests:
-                logger.warning(f"Rate limit exceeded for IP: {client_ip}")
-                return Response(
-                    content="Rate limit exceeded",
-                    status_code=429,
-                    headers={"Retry-After": str(self.window_seconds)}
-                )
+        limit_headers = rate_limit_headers(result, rule.period)
         
-        # Add current request
-        if client_ip not in self.requests:
-            self.requests[client_ip] = []
-        self.requests[client_ip].append(current_time)
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                for name, value in limit_headers.items():
+                    headers[name] = value
+            await send(message)
         
-        return await call_next(request)
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,34 @@
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.metrics import http_request_duration, http_requests_in_flight
+
+class MetricsMiddleware:
+    """Records per-route latency and the number of in-flight requests"""
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        start_time = time.perf_counter()
+        status_code = 500
+        
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec()
+            # Route templates keep label cardinality bounded; unmatched paths share one label
+            route = getattr(scope.get("route"), "path_format", "<unmatched>")
+            http_request_duration.labels(
+                scope["method"], route, f"{status_code // 100}xx"
+            ).observe(time.perf_counter() - start_time)
@@ -0,0 +1,83 @@
+import random
+import time
+from urllib.parse import parse_qs
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.core.profiling import ProfileStore, StackSampler, profile_store, stack_sampler, verify_profiling_token
+
+PROFILE_HEADER = "x-profile-token"
+PROFILE_QUERY_PARAM = "__profile"
+
+class ProfilingMiddleware:
+    """Profiles requests on demand and keeps the slowest ones.
+
+    A request carrying a valid profiling token (``X-Profile-Token`` header
+    or ``__profile`` query parameter) is always profiled and answered with
+    an ``X-Profile-Id`` header. A further ``auto_sample_rate`` fraction of
+    requests is profiled speculatively; their profile is kept only if they
+    end up slower than ``slow_ms``. Every slow request is listed in the
+    slowest-requests store, with a profile when one was taken.
+    """
+    
+    def __init__(self, app: ASGIApp, sampler: StackSampler = None, store: ProfileStore = None,
+                 auto_sample_rate: float = settings.PROFILING_AUTO_SAMPLE_RATE,
+                 slow_ms: float = settings.PROFILING_SLOW_MS):
+        self.app = app
+        self.sampler = sampler if sampler is not None else stack_sampler
+        self.store = store if store is not None else profile_store
+        self.auto_sample_rate = auto_sample_rate
+        self.slow_ms = slow_ms
+    
+    @staticmethod
+    def _requested(scope: Scope) -> bool:
+        token = Headers(scope=scope).get(PROFILE_HEADER)
+        if token is None and scope.get("query_string"):
+            values = parse_qs(scope["query_string"].decode("latin-1")).get(PROFILE_QUERY_PARAM)
+            token = values[0] if values else None
+        return token is not None and verify_profiling_token(token)
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        requested = self._requested(scope)
+        collector = None
+        if requested or random.random() < self.auto_sample_rate:
+            collector = self.sampler.start()
+        profile_id = self.store.new_id() if collector else None
+        
+        start_time = time.perf_counter()
+        status_code = 500
+        
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if requested:
+                    MutableHeaders(scope=message).append("X-Profile-Id", profile_id)
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if collector:
+                self.sampler.stop(collector)
+            duration_ms = (time.perf_counter() - start_time) * 1000
+            slow = duration_ms >= self.slow_ms
+            if requested or slow:
+                route = scope.get("route")
+                request = {
+                    "request_id": scope.get("state", {}).get("request_id"),
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": getattr(route, "path_format", None),
+                    "status_code": status_code,
+                    "duration_ms": round(duration_ms, 2),
+                    "at": time.time(),
+                }
+                if collector and (requested or slow):
+                    self.store.save(profile_id, request, collector)
+                if slow:
+                    self.store.record_slow(request, profile_id if collector else None)
@@ -0,0 +1,50 @@
+import logging
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.core.query_monitor import QueryStats, current_query_stats
+
+logger = logging.getLogger("database")
+
+class QueryStatsMiddleware:
+    """Collects the SQL statements each request issues.
+
+    In debug mode the totals are returned as ``X-DB-Query-Count``,
+    ``X-DB-Time`` and ``Server-Timing`` headers. Statement shapes repeated
+    within one request are flagged as possible N+1 patterns in
+    database.log.
+    """
+    
+    def __init__(self, app: ASGIApp, debug: bool = settings.DEBUG):
+        self.app = app
+        self.debug = debug
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        # The contextvar is copied into threadpool workers, so sync
+        # endpoints and dependencies record into the same object
+        stats = QueryStats(label=f"{scope['method']} {scope['path']}")
+        token = current_query_stats.set(stats)
+        
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start" and self.debug:
+                db_ms = stats.total_seconds * 1000
+                headers = MutableHeaders(scope=message)
+                headers.append("X-DB-Query-Count", str(stats.count))
+                headers.append("X-DB-Time", f"{db_ms:.2f}ms")
+                headers.append("Server-Timing", f'db;dur={db_ms:.2f};desc="{stats.count} queries"')
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_query_stats.reset(token)
+            if stats.repeated:
+                route = getattr(scope.get("route"), "path_format", scope["path"])
+                logger.warning(
+                    f"{scope['method']} {route} issued {stats.count} queries "
+                    f"({stats.total_seconds*1000:.1f}ms), {len(stats.repeated)} repeated statement shape(s)"
+                )
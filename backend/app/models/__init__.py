@@ -3,5 +3,8 @@ from .user import User
 from .book import Book
 from .dictionary import DictionaryEntry
 from .reading_session import ReadingSession
+from .reading_speed import ReadingSpeed
+from .refresh_token import RefreshToken
+from .revoked_token import RevokedToken
 
-__all__ = ["Base", "BaseModel", "User", "Book", "DictionaryEntry", "ReadingSession"]
+__all__ = ["Base", "BaseModel", "User", "Book", "DictionaryEntry", "ReadingSession", "ReadingSpeed", "RefreshToken", "RevokedToken"]
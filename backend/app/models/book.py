@@ -1,21 +1,28 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, Float, DateTime
-from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
-from app.core.database import Base
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, Float, DateTime, Index
+from sqlalchemy.orm import deferred, relationship
+from datetime import datetime
+from app.core.database import Base, utcnow
 
 class Book(Base):
     __tablename__ = "books"
+    # Library listing: one user's books, newest first
+    __table_args__ = (Index("ix_books_owner_created", "owner_id", "created_at"),)
+
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True, nullable=False)
     author = Column(String, nullable=True)  # Required by your tests
     filename = Column(String, unique=True, nullable=False)
     file_path = Column(String, nullable=False)
     status = Column(String, default="processing")
-    content = Column(Text, nullable=True)
+    # Full extracted text, potentially megabytes; only loaded when asked for
+    content = deferred(Column(Text, nullable=True))
     total_pages = Column(Integer, default=0) # Required by your tests
     current_page = Column(Integer, default=0)
     progress = Column(Float, default=0.0)
     owner_id = Column(Integer, ForeignKey("users.id"))
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow, server_default=utcnow())
+    # Also bumped by bulk progress updates; backs the ETag/Last-Modified validators
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow, server_default=utcnow())
     
     owner = relationship("User", back_populates="books")
     reading_sessions = relationship("ReadingSession", back_populates="book")
\ No newline at end of file
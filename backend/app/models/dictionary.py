@@ -1,9 +1,14 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, Boolean
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, Boolean, DateTime, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
-from app.core.database import Base
+from datetime import datetime
+from app.core.database import Base, utcnow
 
 class DictionaryEntry(Base):
     __tablename__ = "dictionary_entries"
+    __table_args__ = (
+        UniqueConstraint("user_id", "word", name="uq_dictionary_entries_user_word"),
+        Index("ix_dictionary_entries_user_mastered_created", "user_id", "mastered", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     word = Column(String, index=True, nullable=False)
@@ -14,5 +19,7 @@ class DictionaryEntry(Base):
     mastered = Column(Integer, default=0) # 0: New, 1: Learning, 2: Mastered
     book_id = Column(Integer, ForeignKey("books.id"), nullable=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow, server_default=utcnow())
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow, server_default=utcnow())
 
     user = relationship("User", back_populates="dictionary_entries")
\ No newline at end of file
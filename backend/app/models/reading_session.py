@@ -1,10 +1,12 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, Float
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Float, Index
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
-from app.core.database import Base
+from datetime import datetime
+from app.core.database import Base, utcnow
 
 class ReadingSession(Base):
     __tablename__ = "reading_sessions"
+    # Stats, activity windows and session pages all filter by user and time
+    __table_args__ = (Index("ix_reading_sessions_user_created", "user_id", "created_at"),)
 
     id = Column(Integer, primary_key=True, index=True)
     book_id = Column(Integer, ForeignKey("books.id"), nullable=False)
@@ -14,7 +16,10 @@ class ReadingSession(Base):
     duration_minutes = Column(Integer, default=0)
     words_encountered = Column(Integer, default=0)
     words_saved = Column(Integer, default=0)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Heartbeats keep end_page current, so ending is recorded separately
+    ended_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow, server_default=utcnow())
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow, server_default=utcnow())
 
     user = relationship("User", back_populates="reading_sessions")
     book = relationship("Book", back_populates="reading_sessions")
\ No newline at end of file
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Float, UniqueConstraint
+from sqlalchemy.sql import func
+from datetime import datetime
+from app.core.database import Base
+
+class ReadingSpeed(Base):
+    """Running pages-per-minute estimate for a user on one book.
+
+    Rows with book_id NULL hold the user's estimate across all books.
+    """
+    __tablename__ = "reading_speeds"
+    __table_args__ = (UniqueConstraint("user_id", "book_id", name="uq_reading_speed_user_book"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    book_id = Column(Integer, ForeignKey("books.id"), nullable=True)
+    pages_per_minute = Column(Float, default=0.0)  # at baseline difficulty
+    difficulty = Column(Float, default=1.0)  # typical slowdown factor for this book
+    samples = Column(Integer, default=0)
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow, server_default=func.now())
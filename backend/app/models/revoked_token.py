@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from datetime import datetime
+from app.core.database import Base
+
+class RevokedToken(Base):
+    """Access token revoked before its expiry, identified by its jti claim.
+
+    Rows are only needed until expires_at; after that the token is
+    rejected on its own and the row can be purged.
+    """
+    __tablename__ = "revoked_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    jti = Column(String(32), unique=True, index=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    revoked_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
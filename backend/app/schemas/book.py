@@ -8,12 +8,19 @@ class BookBase(BaseModel):
 class BookCreate(BookBase):
     pass
 
-class Book(BookBase):
+class BookSummary(BookBase):
+    """Library listing entry; leaves out the extracted text"""
     id: int
     filename: str
     status: str
     owner_id: int
+    author: Optional[str] = None
+    total_pages: int = 0
+    current_page: int = 0
+    progress: float = 0.0
     created_at: datetime
-    content: Optional[str] = None
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class Book(BookSummary):
+    content: Optional[str] = None
\ No newline at end of file
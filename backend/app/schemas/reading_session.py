@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import Optional, List
 
 class ReadingSessionBase(BaseModel):
     book_id: int
@@ -16,13 +16,19 @@ class ReadingSessionUpdate(BaseModel):
     words_encountered: Optional[int] = None
     words_saved: Optional[int] = None
 
+class ReadingHeartbeat(BaseModel):
+    book_id: int
+    page: int = Field(..., ge=0)
+    session_id: Optional[int] = None
+
 class ReadingSessionInDB(ReadingSessionBase):
     id: int
     user_id: int
     words_encountered: int = 0
     words_saved: int = 0
     created_at: datetime
-    updated_at: datetime
+    updated_at: Optional[datetime] = None
+    ended_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
@@ -37,3 +43,24 @@ class ReadingStats(BaseModel):
     total_words_saved: int
     average_session_length: float
     favorite_reading_time: Optional[str] = None
+
+class ReadingActivity(BaseModel):
+    bucket: str
+    start: datetime
+    end: datetime
+    buckets: List[datetime]
+    minutes: List[int]
+    pages: List[int]
+    words_saved: List[int]
+    heatmap: List[List[int]]  # 7 x 24 minutes read, Monday first
+
+class ReadingEta(BaseModel):
+    book_id: int
+    pages_per_minute: Optional[float] = None
+    samples: int = 0
+    current_page: int
+    total_pages: int
+    pages_left: int
+    minutes_left_book: Optional[float] = None
+    chapter_end_page: Optional[int] = None
+    minutes_left_chapter: Optional[float] = None
@@ -20,6 +20,8 @@ class PaginatedResponse(BaseModel):
     pages: int
     has_next: bool
     has_prev: bool
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
 class ErrorResponse(BaseModel):
     """Error response format"""
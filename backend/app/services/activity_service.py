@@ -0,0 +1,132 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, Tuple
+import numpy as np
+from sqlalchemy.orm import Session
+from app.models.reading_session import ReadingSession
+
+# Unit used to floor timestamps for each supported bucket size
+BUCKET_UNITS = {"hour": "h", "day": "D", "week": "D"}
+MAX_BUCKETS = 10000
+DEFAULT_WINDOW_DAYS = 30
+
+# 1970-01-01 was a Thursday; shifting by 3 days makes weeks start on Monday
+_EPOCH_WEEKDAY_OFFSET = 3
+
+
+class ActivityService:
+    @staticmethod
+    def _to_naive_utc(value: datetime) -> datetime:
+        """Normalise a datetime to naive UTC (how SQLite hands them back)"""
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+    @staticmethod
+    def resolve_window(
+        start: Optional[datetime], end: Optional[datetime]
+    ) -> Tuple[datetime, datetime]:
+        """Fill in a default window and normalise both ends to naive UTC"""
+        end = ActivityService._to_naive_utc(end) if end else datetime.utcnow()
+        start = ActivityService._to_naive_utc(start) if start else end - timedelta(days=DEFAULT_WINDOW_DAYS)
+        return start, end
+
+    @staticmethod
+    def _bucket_index(timestamps: np.ndarray, origin: np.datetime64, bucket: str) -> np.ndarray:
+        """Map datetime64 timestamps to integer bucket offsets from origin"""
+        unit = BUCKET_UNITS[bucket]
+        offsets = timestamps.astype(f"datetime64[{unit}]").astype(np.int64)
+        base = origin.astype(f"datetime64[{unit}]").astype(np.int64)
+        if bucket == "week":
+            offsets = (offsets + _EPOCH_WEEKDAY_OFFSET) // 7
+            base = (base + _EPOCH_WEEKDAY_OFFSET) // 7
+        return offsets - base
+
+    @staticmethod
+    def _bucket_starts(origin: np.datetime64, count: int, bucket: str) -> np.ndarray:
+        """Start timestamp of each of the count buckets beginning at origin"""
+        if bucket == "hour":
+            first = origin.astype("datetime64[h]")
+            return first + np.arange(count)
+        first_day = origin.astype("datetime64[D]")
+        if bucket == "week":
+            weekday = (first_day.astype(np.int64) + _EPOCH_WEEKDAY_OFFSET) % 7
+            first_day = first_day - weekday
+            return first_day + np.arange(count) * 7
+        return first_day + np.arange(count)
+
+    @staticmethod
+    def get_activity(
+        db: Session,
+        user_id: int,
+        start: datetime,
+        end: datetime,
+        bucket: str = "day",
+    ) -> Dict[str, Any]:
+        """Dense time-bucketed reading activity plus an hour-of-week heatmap.
+
+        Sessions are fetched as plain column tuples and aggregated with
+        NumPy so the cost is dominated by the single indexed range scan.
+        """
+        if bucket not in BUCKET_UNITS:
+            raise ValueError(f"Unsupported bucket: {bucket}")
+        if start > end:
+            raise ValueError("'from' must not be after 'to'")
+
+        origin = np.datetime64(start, "s")
+        last = ActivityService._bucket_index(np.array([end], dtype="datetime64[s]"), origin, bucket)[0]
+        size = int(last) + 1
+        if size > MAX_BUCKETS:
+            raise ValueError(f"Requested range spans {size} buckets (max {MAX_BUCKETS})")
+
+        rows = db.query(
+            ReadingSession.created_at,
+            ReadingSession.duration_minutes,
+            ReadingSession.start_page,
+            ReadingSession.end_page,
+            ReadingSession.words_saved,
+        ).filter(
+            ReadingSession.user_id == user_id,
+            ReadingSession.created_at >= start,
+            ReadingSession.created_at <= end,
+        ).all()
+
+        minutes = np.zeros(size, dtype=np.int64)
+        pages = np.zeros(size, dtype=np.int64)
+        words = np.zeros(size, dtype=np.int64)
+        heatmap = np.zeros(7 * 24, dtype=np.int64)
+
+        if rows:
+            created, duration, start_page, end_page, saved = zip(*rows)
+            timestamps = np.array(
+                [ActivityService._to_naive_utc(ts) for ts in created], dtype="datetime64[s]"
+            )
+            duration = np.array([d or 0 for d in duration], dtype=np.int64)
+            saved = np.array([w or 0 for w in saved], dtype=np.int64)
+            # Sessions without an end page have not advanced the reader yet
+            advanced = np.array(
+                [(e - (s or 1)) if e is not None else 0 for s, e in zip(start_page, end_page)],
+                dtype=np.int64,
+            ).clip(min=0)
+
+            index = ActivityService._bucket_index(timestamps, origin, bucket)
+            minutes = np.bincount(index, weights=duration, minlength=size).astype(np.int64)
+            pages = np.bincount(index, weights=advanced, minlength=size).astype(np.int64)
+            words = np.bincount(index, weights=saved, minlength=size).astype(np.int64)
+
+            hours = timestamps.astype("datetime64[h]").astype(np.int64)
+            days = timestamps.astype("datetime64[D]").astype(np.int64)
+            weekday = (days + _EPOCH_WEEKDAY_OFFSET) % 7
+            heatmap = np.bincount(weekday * 24 + hours % 24, weights=duration, minlength=7 * 24).astype(np.int64)
+
+        starts = ActivityService._bucket_starts(origin, size, bucket).astype("datetime64[s]")
+
+        return {
+            "bucket": bucket,
+            "start": start,
+            "end": end,
+            "buckets": starts.astype(datetime).tolist(),
+            "minutes": minutes.tolist(),
+            "pages": pages.tolist(),
+            "words_saved": words.tolist(),
+            "heatmap": heatmap.reshape(7, 24).tolist(),
+        }
@@ -9,6 +9,7 @@ from pypdf import PdfReader, PdfWriter
 from pypdf.errors import PdfReadError
 import magic
 from app.core.config import settings
+from app.core.metrics import pdf_parse_duration
 
 logger = logging.getLogger("file_operations")
 
@@ -31,7 +32,7 @@ class EnhancedPDFService:
             if file_type != 'application/pdf':
                 return False, f"Invalid file type: {file_type}"
             
-            with open(file_path, 'rb') as f:
+            with open(file_path, 'rb') as f, pdf_parse_duration.labels("validate").time():
                 reader = PdfReader(f)
                 if len(reader.pages) == 0:
                     return False, "PDF has no pages"
@@ -88,7 +89,7 @@ class EnhancedPDFService:
     def extract_enhanced_metadata(file_path: str) -> Dict[str, Any]:
         metadata = {"title": "", "author": "", "total_pages": 0}
         try:
-            with open(file_path, 'rb') as f:
+            with open(file_path, 'rb') as f, pdf_parse_duration.labels("metadata").time():
                 reader = PdfReader(f)
                 metadata["total_pages"] = len(reader.pages)
                 if reader.metadata:
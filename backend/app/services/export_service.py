@@ -0,0 +1,136 @@
+import logging
+from typing import Callable, Iterator, List, Optional
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import select, Integer, Float, Boolean, DateTime
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.models.book import Book
+from app.models.dictionary import DictionaryEntry
+from app.models.reading_session import ReadingSession
+
+logger = logging.getLogger("file_operations")
+
+DEFAULT_CHUNK_SIZE = 5000
+
+# Exported tables and the column that scopes rows to a user. Book.content
+# is left out on purpose: it holds the full extracted text.
+EXPORT_TABLES = {
+    "reading_sessions": (ReadingSession, "user_id", []),
+    "dictionary_entries": (DictionaryEntry, "user_id", []),
+    "books": (Book, "owner_id", ["content"]),
+}
+
+EXPORT_FORMATS = {
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def _arrow_type(column) -> pa.DataType:
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us")
+    return pa.string()
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back in chunks"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class ExportService:
+    @staticmethod
+    def table_columns(table: str) -> list:
+        model, _, excluded = EXPORT_TABLES[table]
+        return [c for c in model.__table__.columns if c.name not in excluded]
+
+    @staticmethod
+    def arrow_schema(table: str) -> pa.Schema:
+        return pa.schema([(c.name, _arrow_type(c)) for c in ExportService.table_columns(table)])
+
+    @staticmethod
+    def stream(
+        table: str,
+        fmt: str = "arrow",
+        user_id: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ) -> Iterator[bytes]:
+        """Yield a columnar export of ``table`` as it is produced.
+
+        Rows are read through a server-side cursor ``chunk_size`` at a time
+        and each chunk is written as one record batch (Arrow) or row group
+        (Parquet), so memory use does not depend on the table size.
+        ``user_id=None`` exports every user's rows.
+        """
+        if table not in EXPORT_TABLES:
+            raise ValueError(f"Unknown table: {table}")
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown format: {fmt}")
+
+        model, owner_column, _ = EXPORT_TABLES[table]
+        columns = ExportService.table_columns(table)
+        schema = ExportService.arrow_schema(table)
+        query = select(*columns).order_by(model.__table__.c.id)
+        if user_id is not None:
+            query = query.where(model.__table__.c[owner_column] == user_id)
+
+        sink = _ChunkSink()
+        if fmt == "arrow":
+            writer = pa.ipc.new_stream(pa.PythonFile(sink, mode="w"), schema)
+        else:
+            writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema)
+
+        db = session_factory()
+        rows_written = 0
+        try:
+            result = db.execute(query, execution_options={"stream_results": True, "yield_per": chunk_size})
+            for partition in result.partitions(chunk_size):
+                batch = pa.RecordBatch.from_arrays(
+                    [pa.array(values, type=field.type) for values, field in zip(zip(*partition), schema)],
+                    schema=schema,
+                )
+                if fmt == "arrow":
+                    writer.write_batch(batch)
+                else:
+                    writer.write_batch(batch, row_group_size=chunk_size)
+                rows_written += len(partition)
+                yield sink.drain()
+            writer.close()
+            yield sink.drain()
+        finally:
+            db.close()
+            logger.info(f"Exported {rows_written} rows from {table} as {fmt} (user={user_id or 'all'})")
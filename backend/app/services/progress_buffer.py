@@ -0,0 +1,219 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+from sqlalchemy import Integer, bindparam, case, exists, or_, update
+from sqlalchemy.orm import Session
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.book import Book
+from app.models.reading_session import ReadingSession
+
+logger = logging.getLogger("database")
+
+books = Book.__table__
+sessions = ReadingSession.__table__
+page_param = bindparam("page", type_=Integer)
+session_param = bindparam("s_id", type_=Integer)
+
+# Ownership is enforced in the WHERE clause. A heartbeat from a session
+# that has since been ended is older than the end_page that PUT wrote,
+# so it must not overwrite the book's progress either
+BOOK_PROGRESS_UPDATE = update(books).where(
+    books.c.id == bindparam("b_id"),
+    books.c.owner_id == bindparam("u_id"),
+    or_(session_param.is_(None), ~exists().where(
+        sessions.c.id == session_param, sessions.c.ended_at.isnot(None)
+    ))
+).values(
+    current_page=page_param,
+    progress=case(
+        (books.c.total_pages <= 0, books.c.progress),
+        (page_param >= books.c.total_pages, 100.0),
+        else_=page_param * 100.0 / books.c.total_pages
+    )
+)
+
+SESSION_PROGRESS_UPDATE = update(sessions).where(
+    sessions.c.id == session_param,
+    sessions.c.user_id == bindparam("u_id"),
+    sessions.c.ended_at.is_(None)
+).values(end_page=page_param)
+
+
+class ProgressBuffer:
+    """Write-behind buffer for reading progress heartbeats.
+
+    Only the latest heartbeat per (user, book) is kept. Pending updates are
+    written in one transaction every ``flush_interval`` seconds, or as soon
+    as ``max_pending`` distinct books are waiting. Heartbeats accepted since
+    the last successful flush are lost if the process dies, so at most
+    ``flush_interval`` seconds of progress can go missing. While flushes
+    fail, batches are kept but at most ``capacity`` books wait; heartbeats
+    for further books are refused and counted in ``heartbeats_dropped``.
+
+    The buffer also remembers which reading sessions are open, so the
+    heartbeat endpoint only looks a session up the first time this worker
+    sees it. A session ended through another worker stays in this one's
+    set; the flush statements skip ended sessions, so its late heartbeats
+    are accepted but never written.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        flush_interval: float = settings.PROGRESS_FLUSH_INTERVAL_SECONDS,
+        max_pending: int = settings.PROGRESS_FLUSH_MAX_PENDING,
+        capacity: int = settings.PROGRESS_BUFFER_CAPACITY,
+        open_sessions_max: int = settings.PROGRESS_OPEN_SESSIONS_MAX,
+    ):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.capacity = capacity
+        self.open_sessions_max = open_sessions_max
+        self._pending: Dict[Tuple[int, int], dict] = {}
+        self._open_sessions: "OrderedDict[int, Tuple[int, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.heartbeats_received = 0
+        self.rows_flushed = 0
+        self.heartbeats_dropped = 0
+
+    def record(self, user_id: int, book_id: int, page: int, session_id: Optional[int] = None) -> bool:
+        """Queue a heartbeat, replacing any pending one for the same book.
+
+        Returns False when the buffer is full and the heartbeat was dropped.
+        """
+        key = (user_id, book_id)
+        with self._lock:
+            if key not in self._pending and len(self._pending) >= self.capacity:
+                self.heartbeats_dropped += 1
+                return False
+            self._pending[key] = {
+                "u_id": user_id,
+                "b_id": book_id,
+                "s_id": session_id,
+                "page": page,
+                "received_at": time.time(),
+            }
+            self.heartbeats_received += 1
+            pending = len(self._pending)
+
+        if pending >= self.max_pending:
+            self._wakeup.set()
+        return True
+
+    def discard(self, user_id: int, book_id: int):
+        """Forget a pending heartbeat superseded by a direct progress write"""
+        with self._lock:
+            self._pending.pop((user_id, book_id), None)
+
+    def open_session(self, session_id: int, user_id: int, book_id: int):
+        """Remember an open session so heartbeats naming it need no lookup"""
+        with self._lock:
+            self._open_sessions[session_id] = (user_id, book_id)
+            self._open_sessions.move_to_end(session_id)
+            while len(self._open_sessions) > self.open_sessions_max:
+                self._open_sessions.popitem(last=False)
+
+    def close_session(self, session_id: int):
+        with self._lock:
+            self._open_sessions.pop(session_id, None)
+
+    def is_open_session(self, session_id: int, user_id: int, book_id: int) -> bool:
+        """True if the session is known open here and belongs to this user and book"""
+        with self._lock:
+            if self._open_sessions.get(session_id) != (user_id, book_id):
+                return False
+            self._open_sessions.move_to_end(session_id)
+            return True
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def oldest_pending_age(self) -> float:
+        """Seconds the oldest unflushed heartbeat has been waiting"""
+        with self._lock:
+            if not self._pending:
+                return 0.0
+            oldest = min(entry["received_at"] for entry in self._pending.values())
+        return time.time() - oldest
+
+    def flush(self) -> int:
+        """Write all pending heartbeats in a single transaction"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+
+            if not batch:
+                return 0
+
+            rows = list(batch.values())
+            db = self.session_factory()
+            try:
+                db.execute(BOOK_PROGRESS_UPDATE, rows)
+                session_rows = [row for row in rows if row["s_id"] is not None]
+                if session_rows:
+                    db.execute(SESSION_PROGRESS_UPDATE, session_rows)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                # Keep newer heartbeats that arrived while we were flushing
+                dropped = 0
+                with self._lock:
+                    for key, entry in batch.items():
+                        if key in self._pending:
+                            continue
+                        if len(self._pending) >= self.capacity:
+                            dropped += 1
+                            continue
+                        self._pending[key] = entry
+                    self.heartbeats_dropped += dropped
+                logger.error(
+                    f"Progress flush failed, re-queueing {len(rows) - dropped} heartbeats "
+                    f"and dropping {dropped}: {e}"
+                )
+                return 0
+            finally:
+                db.close()
+
+            for user_id in {row["u_id"] for row in rows}:
+                response_cache.invalidate(user_id)
+            self.rows_flushed += len(rows)
+            return len(rows)
+
+    def start(self):
+        """Start the background flusher thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="progress-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the flusher and write whatever is still pending"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=self.flush_interval + 5)
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Progress flusher error: {e}")
+
+
+progress_buffer = ProgressBuffer()
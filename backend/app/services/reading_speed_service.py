@@ -0,0 +1,116 @@
+from typing import Optional, Dict, Any
+from sqlalchemy.orm import Session
+from app.models.reading_speed import ReadingSpeed
+
+# Weight of the newest session in the exponentially weighted average
+SPEED_ALPHA = 0.3
+# Extra reading time per word saved on a page, as a fraction of a page
+DIFFICULTY_PER_SAVED_WORD = 0.15
+# Sessions faster than this are treated as skimming and ignored
+MAX_PAGES_PER_MINUTE = 10.0
+
+
+class ReadingSpeedService:
+    @staticmethod
+    def _ewma(current: float, sample: float, samples: int) -> float:
+        if samples == 0:
+            return sample
+        return SPEED_ALPHA * sample + (1 - SPEED_ALPHA) * current
+
+    @staticmethod
+    def _get_or_create(db: Session, user_id: int, book_id: Optional[int]) -> ReadingSpeed:
+        speed = db.query(ReadingSpeed).filter(
+            ReadingSpeed.user_id == user_id,
+            ReadingSpeed.book_id.is_(None) if book_id is None else ReadingSpeed.book_id == book_id
+        ).first()
+        if speed is None:
+            speed = ReadingSpeed(user_id=user_id, book_id=book_id, pages_per_minute=0.0, difficulty=1.0, samples=0)
+            db.add(speed)
+        return speed
+
+    @staticmethod
+    def record_session(
+        db: Session,
+        user_id: int,
+        book_id: int,
+        pages: int,
+        minutes: int,
+        words_saved: int = 0
+    ) -> Optional[ReadingSpeed]:
+        """Fold one finished session into the user's speed estimates.
+
+        Updates the per-book and the user-wide rows in place, so the cost
+        is constant no matter how much history the user has. The caller
+        commits.
+        """
+        if not pages or not minutes or pages <= 0 or minutes <= 0:
+            return None
+
+        raw_speed = pages / minutes
+        if raw_speed > MAX_PAGES_PER_MINUTE:
+            return None
+
+        # Pages where the reader had to look words up took longer; normalise
+        # the sample to a baseline-difficulty page
+        difficulty = 1.0 + DIFFICULTY_PER_SAVED_WORD * (words_saved or 0) / pages
+        baseline_speed = raw_speed * difficulty
+
+        book_speed = None
+        for target in (book_id, None):
+            speed = ReadingSpeedService._get_or_create(db, user_id, target)
+            speed.pages_per_minute = ReadingSpeedService._ewma(speed.pages_per_minute, baseline_speed, speed.samples)
+            speed.difficulty = ReadingSpeedService._ewma(speed.difficulty, difficulty, speed.samples)
+            speed.samples += 1
+            if target is not None:
+                book_speed = speed
+        return book_speed
+
+    @staticmethod
+    def get_speed(db: Session, user_id: int, book_id: Optional[int] = None) -> Optional[ReadingSpeed]:
+        """Best available estimate: the book's own, else the user's overall"""
+        candidates = [book_id, None] if book_id is not None else [None]
+        for target in candidates:
+            speed = db.query(ReadingSpeed).filter(
+                ReadingSpeed.user_id == user_id,
+                ReadingSpeed.book_id.is_(None) if target is None else ReadingSpeed.book_id == target
+            ).first()
+            if speed and speed.samples > 0:
+                return speed
+        return None
+
+    @staticmethod
+    def effective_pages_per_minute(speed: Optional[ReadingSpeed]) -> Optional[float]:
+        """Expected pages per minute on this book's typical pages"""
+        if speed is None or not speed.pages_per_minute:
+            return None
+        return speed.pages_per_minute / (speed.difficulty or 1.0)
+
+    @staticmethod
+    def estimate(
+        speed: Optional[ReadingSpeed],
+        current_page: int,
+        total_pages: int,
+        chapter_end_page: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Minutes left until the end of the book and, optionally, the chapter"""
+        ppm = ReadingSpeedService.effective_pages_per_minute(speed)
+        pages_left = max(0, (total_pages or 0) - (current_page or 0))
+        chapter_pages_left = None
+        if chapter_end_page is not None:
+            chapter_pages_left = max(0, chapter_end_page - (current_page or 0))
+
+        def minutes(pages):
+            if ppm is None or pages is None:
+                return None
+            return round(pages / ppm, 1)
+
+        return {
+            "pages_per_minute": round(ppm, 3) if ppm else None,
+            "samples": speed.samples if speed else 0,
+            "current_page": current_page or 0,
+            "total_pages": total_pages or 0,
+            "pages_left": pages_left,
+            "minutes_left_book": minutes(pages_left),
+            "chapter_end_page": chapter_end_page,
+            "minutes_left_chapter": minutes(chapter_pages_left),
+        }
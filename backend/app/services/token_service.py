@@ -0,0 +1,107 @@
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.security import create_user_access_token, generate_refresh_token, hash_refresh_token
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidRefreshToken(Exception):
+    """Refresh token is unknown, expired or belongs to an inactive user"""
+
+
+class RefreshTokenReuse(InvalidRefreshToken):
+    """An already rotated refresh token was presented again"""
+
+
+class TokenService:
+    @staticmethod
+    def issue_tokens(db: Session, user: User, family_id: Optional[str] = None) -> Tuple[Dict[str, Any], RefreshToken]:
+        """Issue an access token and a new refresh token for user.
+
+        The refresh token row is added to the session; the caller commits.
+        """
+        token, token_hash = generate_refresh_token()
+        record = RefreshToken(
+            user_id=user.id,
+            token_hash=token_hash,
+            family_id=family_id or uuid.uuid4().hex,
+            expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+        )
+        db.add(record)
+        db.flush()
+
+        tokens = {
+            "access_token": create_user_access_token(user),
+            "token_type": "bearer",
+            "refresh_token": token,
+            "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        }
+        return tokens, record
+
+    @staticmethod
+    def revoke_family(db: Session, family_id: str) -> int:
+        return db.query(RefreshToken).filter(
+            RefreshToken.family_id == family_id,
+            RefreshToken.revoked_at.is_(None)
+        ).update({RefreshToken.revoked_at: datetime.utcnow()}, synchronize_session=False)
+
+    @staticmethod
+    def revoke_refresh_token(db: Session, raw_token: str, user_id: int) -> int:
+        """Revoke the family of one of the user's refresh tokens (logout)"""
+        record = db.query(RefreshToken).filter(
+            RefreshToken.token_hash == hash_refresh_token(raw_token),
+            RefreshToken.user_id == user_id
+        ).first()
+        if record is None:
+            return 0
+        return TokenService.revoke_family(db, record.family_id)
+
+    @staticmethod
+    def rotate(db: Session, raw_token: str) -> Dict[str, Any]:
+        """Exchange a refresh token for a new token pair.
+
+        The presented token is revoked and replaced by one in the same
+        family. Presenting a token that was already rotated means it
+        leaked, so the whole family is revoked.
+        """
+        now = datetime.utcnow()
+        record = db.query(RefreshToken).filter(
+            RefreshToken.token_hash == hash_refresh_token(raw_token)
+        ).first()
+
+        if record is None:
+            raise InvalidRefreshToken()
+
+        if record.revoked_at is None and record.expires_at > now:
+            # Conditional update so two concurrent refreshes cannot both win
+            claimed = db.query(RefreshToken).filter(
+                RefreshToken.id == record.id,
+                RefreshToken.revoked_at.is_(None)
+            ).update({RefreshToken.revoked_at: now}, synchronize_session=False)
+        else:
+            claimed = 0
+
+        if not claimed:
+            if record.revoked_at is not None or record.expires_at > now:
+                logger.warning(f"Refresh token reuse detected for user {record.user_id}, revoking family")
+                TokenService.revoke_family(db, record.family_id)
+                db.commit()
+                raise RefreshTokenReuse()
+            raise InvalidRefreshToken()
+
+        user = db.query(User).filter(User.id == record.user_id).first()
+        if user is None or not user.is_active:
+            TokenService.revoke_family(db, record.family_id)
+            db.commit()
+            raise InvalidRefreshToken()
+
+        tokens, replacement = TokenService.issue_tokens(db, user, family_id=record.family_id)
+        record.replaced_by_id = replacement.id
+        db.commit()
+        return tokens
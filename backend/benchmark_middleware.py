@@ -0,0 +1,139 @@
+"""
+Measure per-request middleware overhead.
+
+Compares the previous BaseHTTPMiddleware implementations of the logging
+and rate limiting middleware with the current pure ASGI ones. Requests
+are driven straight through the ASGI interface (no sockets), so the
+numbers are the middleware cost plus a trivial endpoint.
+
+Usage:
+    python benchmark_middleware.py --requests 20000
+    python benchmark_middleware.py --requests 20000 --log-sample-rate 0.1
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+# Add current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import PlainTextResponse, Response
+from starlette.routing import Route
+
+
+class LegacyLoggingMiddleware(BaseHTTPMiddleware):
+    """The BaseHTTPMiddleware logging middleware as it was"""
+
+    async def dispatch(self, request, call_next):
+        request_id = str(uuid.uuid4())
+        request.state.request_id = request_id
+        logging.getLogger("benchmark").info(f"Request started: {request.method} {request.url.path}")
+        start_time = time.time()
+        response = await call_next(request)
+        duration = time.time() - start_time
+        response.headers["X-Request-ID"] = request_id
+        response.headers["X-Response-Time"] = f"{duration*1000:.2f}ms"
+        return response
+
+
+class LegacyRateLimitingMiddleware(BaseHTTPMiddleware):
+    """The timestamp-list rate limiter as it was"""
+
+    def __init__(self, app, max_requests: int = 100, window_seconds: int = 60):
+        super().__init__(app)
+        self.max_requests = max_requests
+        self.window_seconds = window_seconds
+        self.requests = {}
+
+    async def dispatch(self, request, call_next):
+        client_ip = request.client.host if request.client else "unknown"
+        current_time = time.time()
+        self.requests = {
+            ip: [t for t in times if current_time - t < self.window_seconds]
+            for ip, times in self.requests.items()
+        }
+        if client_ip in self.requests and len(self.requests[client_ip]) >= self.max_requests:
+            return Response(content="Rate limit exceeded", status_code=429)
+        self.requests.setdefault(client_ip, []).append(current_time)
+        return await call_next(request)
+
+
+def build_app(stack: str, max_requests: int, sample_rate: float = 1.0) -> Starlette:
+    from app.core.rate_limit import MemoryBackend
+    from app.middleware.logging_middleware import LoggingMiddleware, RateLimitingMiddleware
+
+    app = Starlette(routes=[Route("/", lambda request: PlainTextResponse("ok"))])
+    if stack == "legacy":
+        app.add_middleware(LegacyLoggingMiddleware)
+        app.add_middleware(LegacyRateLimitingMiddleware, max_requests=max_requests, window_seconds=60)
+    elif stack == "asgi":
+        app.add_middleware(LoggingMiddleware, sample_rate=sample_rate)
+        app.add_middleware(RateLimitingMiddleware, max_requests=max_requests, window_seconds=60,
+                           backend=MemoryBackend(), rules=[])
+    return app
+
+
+async def drive(app, count: int, clients: int) -> float:
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for i in range(count):
+        messages = iter([{"type": "http.request", "body": b"", "more_body": False}])
+
+        async def receive():
+            return next(messages, {"type": "http.disconnect"})
+
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": "GET", "scheme": "http", "path": "/", "raw_path": b"/",
+            "query_string": b"", "root_path": "", "headers": [],
+            "client": (f"10.0.{(i % clients) // 256}.{i % 256}", 1234), "server": ("bench", 80),
+        }
+        await app(scope, receive, send)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark middleware overhead per request")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--clients", type=int, default=500, help="Distinct client IPs")
+    parser.add_argument("--log-sample-rate", type=float, default=None,
+                        help="Also measure the access log, written to a temp dir, at rate 1.0 and this rate")
+    args = parser.parse_args()
+
+    # Measure middleware, not log formatting
+    logging.disable(logging.CRITICAL)
+    limit = args.requests + 1
+
+    baseline = asyncio.run(drive(build_app("none", limit), args.requests, args.clients))
+    print(f"{'stack':<10}{'µs/request':>12}{'overhead µs':>14}")
+    print(f"{'none':<10}{baseline / args.requests * 1e6:>12.1f}{0:>14.1f}")
+    for stack in ("legacy", "asgi"):
+        elapsed = asyncio.run(drive(build_app(stack, limit), args.requests, args.clients))
+        per_request = elapsed / args.requests * 1e6
+        print(f"{stack:<10}{per_request:>12.1f}{per_request - baseline / args.requests * 1e6:>14.1f}")
+
+    if args.log_sample_rate is not None:
+        from app.core.logging import setup_logging, shutdown_logging
+        logging.disable(logging.NOTSET)
+        listener = setup_logging(tempfile.mkdtemp())
+        # Keep the files, silence the console handler
+        listener.handlers[0].setLevel(logging.CRITICAL)
+        for rate in (1.0, args.log_sample_rate):
+            elapsed = asyncio.run(drive(build_app("asgi", limit, rate), args.requests, args.clients))
+            per_request = elapsed / args.requests * 1e6
+            label = f"log@{rate:g}"
+            print(f"{label:<10}{per_request:>12.1f}{per_request - baseline / args.requests * 1e6:>14.1f}")
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Measure the cost of serializing a page of books.
+
+Compares the previous path (full Book schema including the extracted
+text, rendered through jsonable_encoder + JSONResponse) with the current
+one (BookSummary rendered by pydantic-core / orjson).
+
+Usage:
+    python benchmark_serialization.py --items 1000 --content-kb 50
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Add current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_books(count: int, content_kb: int):
+    from app.models.book import Book
+
+    content = "lorem ipsum " * (content_kb * 1024 // 12)
+    now = datetime.utcnow()
+    return [
+        Book(
+            id=i, title=f"Book {i}", author="Author", filename=f"{i}.pdf", file_path=f"/tmp/{i}.pdf",
+            status="completed", owner_id=1, total_pages=300, current_page=i % 300,
+            progress=(i % 300) / 3.0, created_at=now - timedelta(minutes=i), content=content,
+        )
+        for i in range(count)
+    ]
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from app.core.serialization import render_json
+    from app.schemas.book import Book as BookSchema, BookSummary
+    from app.schemas.responses import PaginatedResponse
+
+    parser = argparse.ArgumentParser(description="Benchmark list serialization")
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--content-kb", type=int, default=50, help="Extracted text per book")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    books = make_books(args.items, args.content_kb)
+
+    def page(schema):
+        return PaginatedResponse(
+            items=[schema.model_validate(book) for book in books],
+            total=len(books), page=1, size=len(books), pages=1, has_next=False, has_prev=False,
+        )
+
+    def before():
+        return JSONResponse(jsonable_encoder(page(BookSchema))).body
+
+    def after():
+        return render_json(page(BookSummary))
+
+    print(f"{args.items} books, {args.content_kb}KB of text each (best of {args.repeat})")
+    before_s = timed(before, args.repeat)
+    print(f"{'before (full schema + jsonable_encoder)':<45}{before_s*1000:>10.1f} ms  {len(before())/1e6:>8.2f} MB")
+    after_s = timed(after, args.repeat)
+    print(f"{'after (BookSummary + pydantic-core)':<45}{after_s*1000:>10.1f} ms  {len(after())/1e6:>8.2f} MB")
+    print(f"speedup: {before_s / after_s:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Compare SQLite write throughput with default settings and the tuned profile.
+
+Each thread commits small transactions the way sync endpoints do
+(one session per request, one UPDATE or INSERT per commit) while
+another set of threads reads.
+
+Usage:
+    python benchmark_sqlite.py --threads 8 --commits 200
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Add current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run(tuned: bool, threads: int, commits: int, readers: int, directory: str) -> dict:
+    from sqlalchemy import text
+    from app.core.database import create_db_engine
+
+    path = os.path.join(directory, f"bench_{'tuned' if tuned else 'default'}.db")
+    engine = create_db_engine(f"sqlite:///{path}", tuned=tuned)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE progress (id INTEGER PRIMARY KEY, page INTEGER, note TEXT)"))
+        conn.execute(text("INSERT INTO progress (id, page, note) VALUES (:id, 0, '')"),
+                     [{"id": i} for i in range(threads)])
+
+    errors = []
+    reads = [0]
+    stop = threading.Event()
+
+    def writer(worker: int):
+        try:
+            for i in range(commits):
+                with engine.begin() as conn:
+                    if i % 2:
+                        conn.execute(text("UPDATE progress SET page = :page WHERE id = :id"), {"page": i, "id": worker})
+                    else:
+                        conn.execute(text("INSERT INTO progress (page, note) VALUES (:page, :note)"),
+                                     {"page": i, "note": "x" * 200})
+        except Exception as e:
+            errors.append(e)
+
+    def reader():
+        while not stop.is_set():
+            try:
+                with engine.connect() as conn:
+                    conn.execute(text("SELECT count(*), max(page) FROM progress")).one()
+                reads[0] += 1
+            except Exception as e:
+                errors.append(e)
+
+    reader_threads = [threading.Thread(target=reader) for _ in range(readers)]
+    writer_threads = [threading.Thread(target=writer, args=(n,)) for n in range(threads)]
+    for thread in reader_threads:
+        thread.start()
+    start = time.perf_counter()
+    for thread in writer_threads:
+        thread.start()
+    for thread in writer_threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    for thread in reader_threads:
+        thread.join()
+    engine.dispose()
+
+    return {
+        "commits_per_s": threads * commits / elapsed,
+        "reads_per_s": reads[0] / elapsed,
+        "errors": len(errors),
+        "first_error": repr(errors[0]) if errors else "",
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SQLite write throughput")
+    parser.add_argument("--threads", type=int, default=8, help="Concurrent writers")
+    parser.add_argument("--commits", type=int, default=200, help="Commits per writer")
+    parser.add_argument("--readers", type=int, default=4, help="Concurrent readers")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{args.threads} writers x {args.commits} commits, {args.readers} readers")
+        for label, tuned in (("default (rollback journal, synchronous=FULL)", False), ("tuned profile", True)):
+            result = run(tuned, args.threads, args.commits, args.readers, directory)
+            print(f"{label:<46}{result['commits_per_s']:>10.0f} commits/s{result['reads_per_s']:>10.0f} reads/s"
+                  f"  errors={result['errors']} {result['first_error'][:80]}")
+
+
+if __name__ == "__main__":
+    main()
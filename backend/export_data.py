@@ -0,0 +1,40 @@
+"""
+Export reading data as columnar files for analysis.
+
+Usage:
+    python export_data.py reading_sessions --format parquet --user-id 3
+    python export_data.py books --output books.arrows
+"""
+import argparse
+import os
+import sys
+
+# Add current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+def main():
+    from app.services.export_service import ExportService, EXPORT_TABLES, EXPORT_FORMATS, DEFAULT_CHUNK_SIZE
+    
+    parser = argparse.ArgumentParser(description="Export GreatReading data as Arrow IPC or Parquet")
+    parser.add_argument("table", choices=sorted(EXPORT_TABLES))
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="parquet")
+    parser.add_argument("--user-id", type=int, default=None, help="Only export this user's rows (default: all users)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--output", "-o", default=None)
+    args = parser.parse_args()
+    
+    output = args.output or f"{args.table}.{EXPORT_FORMATS[args.format][1]}"
+    
+    try:
+        written = 0
+        with open(output, "wb") as f:
+            for chunk in ExportService.stream(args.table, args.format, user_id=args.user_id, chunk_size=args.chunk_size):
+                f.write(chunk)
+                written += len(chunk)
+        print(f"✅ Exported {args.table} to {output} ({written} bytes)")
+    except Exception as e:
+        print(f"❌ Export failed: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
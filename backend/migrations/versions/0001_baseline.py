@@ -0,0 +1,82 @@
+"""Baseline: the schema init_db created with create_all before migrations
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("username", sa.String(), nullable=False),
+        sa.Column("hashed_password", sa.String(), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+
+    op.create_table(
+        "books",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("author", sa.String(), nullable=True),
+        sa.Column("filename", sa.String(), nullable=False, unique=True),
+        sa.Column("file_path", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=True),
+        sa.Column("content", sa.Text(), nullable=True),
+        sa.Column("total_pages", sa.Integer(), nullable=True),
+        sa.Column("current_page", sa.Integer(), nullable=True),
+        sa.Column("progress", sa.Float(), nullable=True),
+        sa.Column("owner_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+    )
+    op.create_index("ix_books_id", "books", ["id"])
+    op.create_index("ix_books_title", "books", ["title"])
+
+    op.create_table(
+        "dictionary_entries",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("word", sa.String(), nullable=False),
+        sa.Column("definition", sa.Text(), nullable=False),
+        sa.Column("context", sa.Text(), nullable=True),
+        sa.Column("phonetic", sa.String(), nullable=True),
+        sa.Column("part_of_speech", sa.String(), nullable=True),
+        sa.Column("mastered", sa.Integer(), nullable=True),
+        sa.Column("book_id", sa.Integer(), sa.ForeignKey("books.id"), nullable=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+    )
+    op.create_index("ix_dictionary_entries_id", "dictionary_entries", ["id"])
+    op.create_index("ix_dictionary_entries_word", "dictionary_entries", ["word"])
+
+    op.create_table(
+        "reading_sessions",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("book_id", sa.Integer(), sa.ForeignKey("books.id"), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("start_page", sa.Integer(), nullable=True),
+        sa.Column("end_page", sa.Integer(), nullable=True),
+        sa.Column("duration_minutes", sa.Integer(), nullable=True),
+        sa.Column("words_encountered", sa.Integer(), nullable=True),
+        sa.Column("words_saved", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    )
+    op.create_index("ix_reading_sessions_id", "reading_sessions", ["id"])
+
+
+def downgrade():
+    op.drop_table("reading_sessions")
+    op.drop_table("dictionary_entries")
+    op.drop_table("books")
+    op.drop_table("users")
@@ -0,0 +1,56 @@
+"""created_at on books and dictionary entries, updated_at on dictionary entries
+
+Listings page newest-first on (created_at, id). Existing rows have no
+creation time, so they are stamped one microsecond apart in id order,
+ending now: listings keep their insertion order and page by a unique
+key. updated_at starts out equal to created_at.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from datetime import datetime, timedelta
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+COLUMNS = {
+    "books": ["created_at"],
+    "dictionary_entries": ["created_at", "updated_at"],
+}
+
+
+def _backfill(bind, table: str):
+    """Stamp existing rows in id order; values are bound as DateTime so
+    SQLite stores the ORM's text format"""
+    stamp = sa.bindparam("stamp", type_=sa.DateTime())
+    t = sa.table(table, sa.column("id", sa.Integer()), sa.column("created_at", sa.DateTime()))
+
+    ids = bind.execute(sa.select(t.c.id).order_by(t.c.id)).scalars().all()
+    if ids:
+        end = datetime.utcnow()
+        bind.execute(
+            t.update().where(t.c.id == sa.bindparam("row_id")).values(created_at=stamp),
+            [{"row_id": row_id, "stamp": end - timedelta(microseconds=len(ids) - i)} for i, row_id in enumerate(ids, 1)],
+        )
+
+
+def upgrade():
+    bind = op.get_bind()
+    for table, columns in COLUMNS.items():
+        with op.batch_alter_table(table) as batch_op:
+            for name in columns:
+                batch_op.add_column(sa.Column(name, sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True))
+        _backfill(bind, table)
+    bind.execute(sa.text("UPDATE dictionary_entries SET updated_at = created_at"))
+
+
+def downgrade():
+    for table, columns in COLUMNS.items():
+        with op.batch_alter_table(table) as batch_op:
+            for name in columns:
+                batch_op.drop_column(name)
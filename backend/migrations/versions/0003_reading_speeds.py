@@ -0,0 +1,32 @@
+"""reading_speeds: running pages-per-minute estimates per user and book
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "reading_speeds",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("book_id", sa.Integer(), sa.ForeignKey("books.id"), nullable=True),
+        sa.Column("pages_per_minute", sa.Float(), nullable=True),
+        sa.Column("difficulty", sa.Float(), nullable=True),
+        sa.Column("samples", sa.Integer(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.UniqueConstraint("user_id", "book_id", name="uq_reading_speed_user_book"),
+    )
+    op.create_index("ix_reading_speeds_id", "reading_speeds", ["id"])
+
+
+def downgrade():
+    op.drop_table("reading_speeds")
@@ -0,0 +1,45 @@
+"""Composite indexes for the hot per-user queries; one entry per word
+
+- books (owner_id, created_at): library listing and its keyset pages
+- reading_sessions (user_id, created_at): stats, activity, session pages
+- dictionary_entries (user_id, mastered, created_at): filtered listing
+- dictionary_entries (user_id, word) unique: the duplicate check, now
+  also enforced by the database
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    duplicates = op.get_bind().execute(sa.text(
+        "SELECT count(*) FROM (SELECT 1 FROM dictionary_entries GROUP BY user_id, word HAVING count(*) > 1) AS d"
+    )).scalar()
+    if duplicates:
+        raise RuntimeError(
+            f"{duplicates} (user_id, word) pairs have more than one dictionary entry; "
+            "merge or delete the extra rows, then run the migration again"
+        )
+
+    op.create_index("ix_books_owner_created", "books", ["owner_id", "created_at"])
+    op.create_index("ix_reading_sessions_user_created", "reading_sessions", ["user_id", "created_at"])
+    op.create_index("ix_dictionary_entries_user_mastered_created", "dictionary_entries",
+                    ["user_id", "mastered", "created_at"])
+    with op.batch_alter_table("dictionary_entries") as batch_op:
+        batch_op.create_unique_constraint("uq_dictionary_entries_user_word", ["user_id", "word"])
+
+
+def downgrade():
+    with op.batch_alter_table("dictionary_entries") as batch_op:
+        batch_op.drop_constraint("uq_dictionary_entries_user_word", type_="unique")
+    op.drop_index("ix_dictionary_entries_user_mastered_created", table_name="dictionary_entries")
+    op.drop_index("ix_reading_sessions_user_created", table_name="reading_sessions")
+    op.drop_index("ix_books_owner_created", table_name="books")
@@ -0,0 +1,52 @@
+"""Store SQLite timestamps in the format the ORM writes
+
+SQLite keeps DateTime columns as text. The ORM writes
+'YYYY-MM-DD HH:MM:SS.ffffff' but CURRENT_TIMESTAMP defaults wrote
+'YYYY-MM-DD HH:MM:SS', so a keyset cursor taken from a default-stamped
+row never compared equal to it and the same page came back forever.
+Existing second-resolution values get zero microseconds and the
+defaults switch to a matching strftime. Other databases have real
+timestamp types and are left alone.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+TABLES = ("books", "reading_sessions", "dictionary_entries")
+COLUMNS = ("created_at", "updated_at")
+ORM_FORMAT_DEFAULT = sa.text("(strftime('%Y-%m-%d %H:%M:%f000', 'now'))")
+
+
+def _alter_defaults(server_default):
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            for column in COLUMNS:
+                batch_op.alter_column(column, existing_type=sa.DateTime(timezone=True),
+                                      existing_nullable=True, server_default=server_default)
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite":
+        return
+
+    for table in TABLES:
+        for column in COLUMNS:
+            bind.execute(sa.text(
+                f"UPDATE {table} SET {column} = {column} || '.000000' WHERE length({column}) = 19"
+            ))
+    _alter_defaults(ORM_FORMAT_DEFAULT)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    _alter_defaults(sa.func.now())
@@ -0,0 +1,28 @@
+"""reading_sessions.ended_at: when the reader ended the session
+
+Progress heartbeats write end_page while a session is still running,
+so end_page can no longer tell whether a session has been ended.
+Existing sessions are left open; the next end folds them into the
+speed estimate once.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("reading_sessions") as batch_op:
+        batch_op.add_column(sa.Column("ended_at", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table("reading_sessions") as batch_op:
+        batch_op.drop_column("ended_at")
@@ -42,8 +42,12 @@ def db():
 def client(db):
     # Import here to avoid circular imports
     from app.main import app
+    from app.core.login_throttle import login_throttle
+    from app.core.rate_limit import rate_limit_backend
     
     app.dependency_overrides = {}
+    login_throttle.clear()
+    rate_limit_backend.clear()
     
     with TestClient(app) as c:
         yield c
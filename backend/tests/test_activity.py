@@ -0,0 +1,72 @@
+import pytest
+from datetime import datetime
+from app.models.user import User
+from app.models.book import Book
+from app.models.reading_session import ReadingSession
+from app.services.activity_service import ActivityService
+
+class TestActivity:
+    @pytest.fixture
+    def reader(self, db):
+        """Create a user with one book and a few sessions"""
+        user = User(email="reader@example.com", username="reader", hashed_password="x")
+        db.add(user)
+        db.flush()
+        book = Book(title="Book", filename="activity.pdf", file_path="activity.pdf", owner_id=user.id)
+        db.add(book)
+        db.flush()
+        db.add_all([
+            # Monday 2024-01-01 09:xx
+            ReadingSession(user_id=user.id, book_id=book.id, duration_minutes=10,
+                           start_page=1, end_page=6, words_saved=2,
+                           created_at=datetime(2024, 1, 1, 9, 15)),
+            ReadingSession(user_id=user.id, book_id=book.id, duration_minutes=5,
+                           start_page=6, end_page=None, words_saved=1,
+                           created_at=datetime(2024, 1, 1, 9, 45)),
+            # Wednesday 2024-01-03 21:xx
+            ReadingSession(user_id=user.id, book_id=book.id, duration_minutes=20,
+                           start_page=6, end_page=16, words_saved=0,
+                           created_at=datetime(2024, 1, 3, 21, 0)),
+            # Outside of the requested window
+            ReadingSession(user_id=user.id, book_id=book.id, duration_minutes=99,
+                           start_page=1, end_page=2, created_at=datetime(2023, 6, 1)),
+        ])
+        db.flush()
+        return user
+    
+    def test_daily_series_is_dense(self, db, reader):
+        """Test that every day in the window gets a bucket"""
+        activity = ActivityService.get_activity(
+            db, reader.id, datetime(2024, 1, 1), datetime(2024, 1, 4, 23, 59), "day"
+        )
+        assert activity["buckets"][0] == datetime(2024, 1, 1)
+        assert len(activity["buckets"]) == 4
+        assert activity["minutes"] == [15, 0, 20, 0]
+        assert activity["pages"] == [5, 0, 10, 0]
+        assert activity["words_saved"] == [3, 0, 0, 0]
+    
+    def test_weekly_buckets_start_on_monday(self, db, reader):
+        """Test weekly bucketing aligns to Monday"""
+        activity = ActivityService.get_activity(
+            db, reader.id, datetime(2024, 1, 3), datetime(2024, 1, 10), "week"
+        )
+        assert activity["buckets"] == [datetime(2024, 1, 1), datetime(2024, 1, 8)]
+        assert activity["minutes"] == [20, 0]
+    
+    def test_hour_of_week_heatmap(self, db, reader):
+        """Test the heatmap accumulates minutes per weekday and hour"""
+        activity = ActivityService.get_activity(
+            db, reader.id, datetime(2024, 1, 1), datetime(2024, 1, 7), "hour"
+        )
+        heatmap = activity["heatmap"]
+        assert len(heatmap) == 7 and all(len(row) == 24 for row in heatmap)
+        assert heatmap[0][9] == 15
+        assert heatmap[2][21] == 20
+        assert sum(map(sum, heatmap)) == 35
+    
+    def test_rejects_oversized_range(self, db, reader):
+        """Test that absurd hourly ranges are refused"""
+        with pytest.raises(ValueError):
+            ActivityService.get_activity(
+                db, reader.id, datetime(2000, 1, 1), datetime(2024, 1, 1), "hour"
+            )
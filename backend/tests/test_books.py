@@ -53,8 +53,8 @@ class TestBooks:
         response = client.get("/api/books/", headers=auth_headers)
         assert response.status_code == status.HTTP_200_OK
         data = response.json()
-        assert isinstance(data, list)
-        assert len(data) > 0
+        assert isinstance(data["items"], list)
+        assert len(data["items"]) > 0
     
     def test_get_book(self, client, auth_headers, sample_pdf_file):
         """Test getting a specific book"""
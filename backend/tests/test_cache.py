@@ -0,0 +1,230 @@
+import json
+import pytest
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from fastapi import HTTPException
+from starlette.requests import Request
+from starlette.responses import Response
+from app.api.endpoints.books import delete_book, get_page_text, list_books
+from app.core.cache import (
+    UserResponseCache, Validator, cached_json_response, etag_matches, response_cache, rows_validator
+)
+from app.models.book import Book
+from app.models.user import User
+
+def make_request(query: str = "", if_none_match: str = None, if_modified_since: str = None) -> Request:
+    headers = []
+    if if_none_match:
+        headers.append((b"if-none-match", if_none_match.encode()))
+    if if_modified_since:
+        headers.append((b"if-modified-since", if_modified_since.encode()))
+    return Request({"type": "http", "method": "GET", "path": "/", "query_string": query.encode(), "headers": headers})
+
+class TestResponseCache:
+    @pytest.fixture(autouse=True)
+    def reset_cache(self):
+        response_cache.clear()
+        yield
+        response_cache.clear()
+    
+    def test_build_only_runs_on_miss(self):
+        """Test that repeated polls are served from the cache"""
+        calls = []
+        build = lambda: calls.append(1) or {"total": len(calls)}
+        
+        first = cached_json_response(make_request(), 1, "stats", build)
+        second = cached_json_response(make_request(), 1, "stats", build)
+        
+        assert len(calls) == 1
+        assert first.body == second.body
+        assert first.headers["etag"] == second.headers["etag"]
+    
+    def test_matching_etag_returns_304(self):
+        """Test that a matching If-None-Match gets an empty 304"""
+        etag = cached_json_response(make_request(), 1, "stats", lambda: {"a": 1}).headers["etag"]
+        
+        response = cached_json_response(make_request(if_none_match=etag), 1, "stats", lambda: pytest.fail("rebuilt"))
+        assert response.status_code == 304
+        assert response.body == b""
+    
+    def test_invalidate_forces_rebuild(self):
+        """Test that a write makes the next poll rebuild and change its ETag"""
+        etag = cached_json_response(make_request(), 1, "stats", lambda: {"total": 1}).headers["etag"]
+        response_cache.invalidate(1)
+        
+        response = cached_json_response(make_request(if_none_match=etag), 1, "stats", lambda: {"total": 2})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+    
+    def test_users_and_queries_are_isolated(self):
+        """Test that entries are keyed by user and query string"""
+        cached_json_response(make_request(), 1, "books", lambda: {"user": 1})
+        other_user = cached_json_response(make_request(), 2, "books", lambda: {"user": 2})
+        other_page = cached_json_response(make_request("limit=5"), 1, "books", lambda: {"page": 2})
+        
+        assert b'"user":2' in other_user.body
+        assert b'"page":2' in other_page.body
+    
+    def test_entry_built_during_invalidation_is_stale(self):
+        """Test that data read before a concurrent write is not served afterwards"""
+        cache = UserResponseCache(ttl=60, max_entries=10)
+        version = cache.version(1)
+        cache.invalidate(1)
+        cache.set(1, "stats", b"{}", version)
+        
+        assert cache.get(1, "stats") is None
+    
+    def test_lru_bound(self):
+        """Test that the cache never exceeds max_entries"""
+        cache = UserResponseCache(ttl=60, max_entries=2)
+        for key in ("a", "b", "c"):
+            cache.set(1, key, b"{}", cache.version(1))
+        
+        assert cache.get(1, "a") is None
+        assert cache.get(1, "c") is not None
+    
+    def test_etag_matching(self):
+        """Test If-None-Match parsing"""
+        assert etag_matches('"x", "y"', '"y"')
+        assert etag_matches('W/"y"', '"y"')
+        assert etag_matches("*", '"y"')
+        assert etag_matches('"y"', 'W/"y"')
+        assert not etag_matches(None, '"y"')
+
+
+class TestConditionalGet:
+    @pytest.fixture(autouse=True)
+    def reset_cache(self):
+        response_cache.clear()
+        yield
+        response_cache.clear()
+    
+    @staticmethod
+    def validator(calls, state=(1,), last_modified=datetime(2024, 1, 1, 12, 0, 0)):
+        return lambda: calls.append("validator") or Validator(state, last_modified)
+    
+    def test_current_client_skips_build(self):
+        """Test that a matching validator answers 304 without building the body"""
+        calls = []
+        first = cached_json_response(make_request(), 1, "books", lambda: {"a": 1}, self.validator(calls))
+        response_cache.clear()
+        
+        response = cached_json_response(
+            make_request(if_none_match=first.headers["etag"]), 1, "books",
+            lambda: pytest.fail("rebuilt"), self.validator(calls)
+        )
+        assert response.status_code == 304
+        assert first.headers["etag"].startswith('"')
+        assert first.headers["last-modified"] == "Mon, 01 Jan 2024 12:00:00 GMT"
+    
+    def test_fresh_entry_skips_validator(self):
+        """Test that repeated polls are answered from memory alone"""
+        calls = []
+        etag = cached_json_response(make_request(), 1, "books", lambda: {"a": 1}, self.validator(calls)).headers["etag"]
+        
+        response = cached_json_response(
+            make_request(if_none_match=etag), 1, "books",
+            lambda: pytest.fail("rebuilt"), lambda: pytest.fail("validated")
+        )
+        assert response.status_code == 304
+        assert calls == ["validator"]
+    
+    def test_changed_state_changes_etag(self):
+        """Test that a different row state yields a fresh body"""
+        calls = []
+        etag = cached_json_response(make_request(), 1, "books", lambda: {"a": 1}, self.validator(calls)).headers["etag"]
+        response_cache.invalidate(1)
+        
+        response = cached_json_response(
+            make_request(if_none_match=etag), 1, "books", lambda: {"a": 2}, self.validator(calls, state=(2,))
+        )
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+    
+    def test_if_modified_since(self):
+        """Test that If-Modified-Since is honoured at second resolution"""
+        calls = []
+        last_modified = datetime(2024, 1, 1, 12, 0, 0, 500000)
+        not_modified = cached_json_response(
+            make_request(if_modified_since="Mon, 01 Jan 2024 12:00:00 GMT"), 1, "stats",
+            lambda: pytest.fail("rebuilt"), self.validator(calls, last_modified=last_modified)
+        )
+        response_cache.clear()
+        modified = cached_json_response(
+            make_request(if_modified_since="Mon, 01 Jan 2024 11:59:59 GMT"), 1, "stats",
+            lambda: {"a": 1}, self.validator(calls, last_modified=last_modified)
+        )
+        
+        assert not_modified.status_code == 304
+        assert modified.status_code == 200
+    
+    def test_validator_only_entry_rebuilds_body(self):
+        """Test that store_body=False keeps the 304 path but not the body"""
+        calls = []
+        build = lambda: calls.append("build") or {"content": "x" * 100}
+        etag = cached_json_response(make_request(), 1, "book:1", build, self.validator(calls), store_body=False).headers["etag"]
+        
+        not_modified = cached_json_response(make_request(if_none_match=etag), 1, "book:1", build, store_body=False)
+        full = cached_json_response(make_request(), 1, "book:1", build, self.validator(calls), store_body=False)
+        
+        assert not_modified.status_code == 304
+        assert full.status_code == 200
+        assert calls.count("build") == 2
+    
+    def test_rows_validator_tracks_updates(self, db):
+        """Test that inserts and updates both move the row validator"""
+        user = User(email="etag@example.com", username="etag", hashed_password="x")
+        db.add(user)
+        db.flush()
+        book = Book(title="Book", filename="etag.pdf", file_path="etag.pdf", owner_id=user.id)
+        db.add(book)
+        db.flush()
+        before = rows_validator(db, Book, Book.owner_id == user.id)
+        
+        book.updated_at = datetime.utcnow() + timedelta(seconds=5)
+        db.flush()
+        after = rows_validator(db, Book, Book.owner_id == user.id)
+        
+        assert before.state[0] == 1
+        assert after.state != before.state
+        assert after.last_modified is None
+    
+    def test_deleted_row_is_not_hidden_by_if_modified_since(self, db):
+        """Test that a listing polled with only If-Modified-Since shows a deletion"""
+        user = User(email="ims@example.com", username="ims", hashed_password="x")
+        db.add(user)
+        db.flush()
+        older = Book(title="Older", filename="older.pdf", file_path="older.pdf", owner_id=user.id,
+                     created_at=datetime.utcnow() - timedelta(hours=1))
+        newer = Book(title="Newer", filename="newer.pdf", file_path="newer.pdf", owner_id=user.id)
+        db.add_all([older, newer])
+        db.flush()
+        first = list_books(make_request(), None, 50, db, user)
+        
+        delete_book(older.id, db, user)
+        since = format_datetime(datetime.now(timezone.utc) + timedelta(hours=1), usegmt=True)
+        poll = list_books(make_request(if_modified_since=since), None, 50, db, user)
+        
+        assert "last-modified" not in first.headers
+        assert poll.status_code == 200
+        assert [item["id"] for item in json.loads(poll.body)["items"]] == [newer.id]
+    
+    def test_page_etag_follows_the_book(self, db):
+        """Test that page text validators change when the book is re-parsed and are owner-only"""
+        user = User(email="page@example.com", username="page", hashed_password="x")
+        db.add(user)
+        db.flush()
+        book = Book(title="Book", filename="page.pdf", file_path="page.pdf", owner_id=user.id)
+        db.add(book)
+        db.flush()
+        first = Response()
+        body = get_page_text(make_request(), first, book.id, 3, user, db)
+        etag = first.headers["etag"]
+        
+        assert get_page_text(make_request(if_none_match=etag), Response(), book.id, 3, user, db).status_code == 304
+        book.updated_at = datetime.utcnow() + timedelta(seconds=5)
+        db.flush()
+        assert get_page_text(make_request(if_none_match=etag), Response(), book.id, 3, user, db) == body
+        with pytest.raises(HTTPException) as exc:
+            get_page_text(make_request(), Response(), book.id, 3, User(id=user.id + 1), db)
+        assert exc.value.status_code == 404
@@ -0,0 +1,35 @@
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool
+from app.core.database import create_db_engine
+
+def pragma(engine, name: str):
+    with engine.connect() as conn:
+        return conn.execute(text(f"PRAGMA {name}")).scalar()
+
+class TestSQLiteProfile:
+    def test_tuned_pragmas_applied_per_connection(self, tmp_path):
+        """Test that every pooled connection gets the production pragmas"""
+        engine = create_db_engine(f"sqlite:///{tmp_path / 'tuned.db'}", tuned=True)
+        
+        assert pragma(engine, "journal_mode") == "wal"
+        assert pragma(engine, "synchronous") == 1  # NORMAL
+        assert pragma(engine, "busy_timeout") == 5000
+        assert pragma(engine, "temp_store") == 2  # MEMORY
+        assert pragma(engine, "cache_size") == -65536
+        assert isinstance(engine.pool, QueuePool)
+        assert engine.pool.size() == 20
+        engine.dispose()
+    
+    def test_defaults_when_disabled(self, tmp_path):
+        """Test that SQLITE_TUNING=False leaves SQLite's defaults alone"""
+        engine = create_db_engine(f"sqlite:///{tmp_path / 'plain.db'}", tuned=False)
+        
+        assert pragma(engine, "journal_mode") == "delete"
+        assert pragma(engine, "synchronous") == 2  # FULL
+        engine.dispose()
+    
+    def test_in_memory_database_is_untouched(self):
+        """Test that in-memory test databases skip the file-only settings"""
+        engine = create_db_engine("sqlite://", tuned=True)
+        
+        assert pragma(engine, "journal_mode") == "memory"
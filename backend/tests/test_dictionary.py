@@ -53,8 +53,8 @@ class TestDictionary:
         response = client.get("/api/dictionary/", headers=auth_headers)
         assert response.status_code == status.HTTP_200_OK
         data = response.json()
-        assert isinstance(data, list)
-        assert len(data) > 0
+        assert isinstance(data["items"], list)
+        assert len(data["items"]) > 0
     
     def test_get_dictionary_entry(self, client, auth_headers):
         """Test getting a specific dictionary entry"""
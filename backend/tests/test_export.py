@@ -0,0 +1,67 @@
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from sqlalchemy.orm import Session
+from app.models.user import User
+from app.models.book import Book
+from app.models.dictionary import DictionaryEntry
+from app.services.export_service import ExportService
+
+class TestExport:
+    @pytest.fixture
+    def users(self, db):
+        """Two users with 25 dictionary entries and one book each"""
+        users = []
+        for name in ("alice", "bob"):
+            user = User(email=f"{name}@example.com", username=name, hashed_password="x")
+            db.add(user)
+            db.flush()
+            db.add(Book(title=f"{name}'s book", filename=f"{name}.pdf", file_path=f"{name}.pdf",
+                        owner_id=user.id, content="x" * 1000))
+            for i in range(25):
+                db.add(DictionaryEntry(user_id=user.id, word=f"{name}{i}", definition="d"))
+            users.append(user)
+        db.flush()
+        return users
+    
+    @pytest.fixture
+    def session_factory(self, db):
+        connection = db.connection()
+        return lambda: Session(bind=connection)
+    
+    def test_arrow_stream_is_chunked(self, users, session_factory):
+        """Test that rows arrive in chunk_size record batches"""
+        chunks = list(ExportService.stream(
+            "dictionary_entries", "arrow", user_id=users[0].id,
+            chunk_size=10, session_factory=session_factory
+        ))
+        reader = pa.ipc.open_stream(b"".join(chunks))
+        batches = list(reader)
+        
+        assert [len(b) for b in batches] == [10, 10, 5]
+        table = pa.Table.from_batches(batches)
+        assert set(table.column("user_id").to_pylist()) == {users[0].id}
+        assert len(chunks) > 2
+    
+    def test_parquet_export_of_all_users(self, users, session_factory):
+        """Test a Parquet export without a user filter"""
+        data = b"".join(ExportService.stream(
+            "dictionary_entries", "parquet", chunk_size=20, session_factory=session_factory
+        ))
+        table = pq.read_table(pa.BufferReader(data))
+        
+        assert table.num_rows == 50
+        assert table.schema.field("created_at").type == pa.timestamp("us")
+    
+    def test_book_content_is_not_exported(self, users, session_factory):
+        """Test that the full-text column stays out of book exports"""
+        data = b"".join(ExportService.stream("books", "arrow", session_factory=session_factory))
+        table = pa.ipc.open_stream(data).read_all()
+        
+        assert "content" not in table.column_names
+        assert table.num_rows == 2
+    
+    def test_unknown_table(self):
+        """Test that only known tables can be exported"""
+        with pytest.raises(ValueError):
+            next(ExportService.stream("users"))
@@ -0,0 +1,111 @@
+import pytest
+from datetime import datetime, timedelta
+from app.core.database import create_db_engine, run_migrations
+from app.core.health import (
+    DEGRADED, FAIL, OK, CheckResult, HealthMonitor, check_database, check_job_queues, check_upload_dir
+)
+
+class FakeBuffer:
+    def __init__(self, lag: float):
+        self.lag = lag
+    
+    def oldest_pending_age(self) -> float:
+        return self.lag
+
+class TestHealthMonitor:
+    def test_not_ready_before_first_run(self):
+        """Test that a fresh worker reports itself as starting"""
+        monitor = HealthMonitor(interval=60)
+        monitor.register("database", lambda: CheckResult(OK))
+        
+        assert monitor.report()["ready"] is False
+        assert monitor.report()["status"] == "starting"
+    
+    def test_critical_failure_makes_unready(self):
+        """Test that an exception in a critical check fails readiness"""
+        monitor = HealthMonitor(interval=60)
+        monitor.register("database", lambda: 1 / 0)
+        monitor.run_checks()
+        report = monitor.report()
+        
+        assert report["ready"] is False
+        assert report["checks"]["database"].status == FAIL
+        assert "ZeroDivisionError" in report["checks"]["database"].detail
+    
+    def test_optional_failure_only_degrades(self):
+        """Test that a failing optional check leaves the worker ready"""
+        monitor = HealthMonitor(interval=60)
+        monitor.register("database", lambda: CheckResult(OK))
+        monitor.register("dictionary_upstream", lambda: CheckResult(FAIL), critical=False)
+        monitor.run_checks()
+        report = monitor.report()
+        
+        assert report["ready"] is True
+        assert report["status"] == DEGRADED
+    
+    def test_stale_results_fail(self):
+        """Test that results from a stalled checker are not trusted"""
+        monitor = HealthMonitor(interval=60, max_age=0)
+        monitor.register("database", lambda: CheckResult(OK))
+        monitor.run_checks()
+        
+        assert monitor.report()["ready"] is False
+    
+    def test_probes_do_not_run_checks(self):
+        """Test that reading the report never calls a check"""
+        calls = []
+        monitor = HealthMonitor(interval=60)
+        monitor.register("database", lambda: calls.append(1) or CheckResult(OK))
+        monitor.run_checks()
+        for _ in range(10):
+            monitor.report()
+        
+        assert len(calls) == 1
+
+class TestChecks:
+    def test_upload_dir_free_space(self, tmp_path):
+        """Test the writability probe and the free space threshold"""
+        assert check_upload_dir(str(tmp_path), min_free_mb=0).status == OK
+        assert check_upload_dir(str(tmp_path), min_free_mb=10 ** 12).status == FAIL
+        with pytest.raises(OSError):
+            check_upload_dir(str(tmp_path / "missing"), min_free_mb=0)
+    
+    def test_database_schema_must_be_current(self, tmp_path):
+        """Test that a database behind the models' migrations fails the check"""
+        engine = create_db_engine(f"sqlite:///{tmp_path / 'behind.db'}")
+        run_migrations(engine, revision="0001")
+        behind = check_database(engine)
+        run_migrations(engine)
+        current = check_database(engine)
+        engine.dispose()
+        
+        assert behind.status == FAIL and "0001" in behind.detail
+        assert current.status == OK
+    
+    def test_job_queue_lag(self):
+        """Test that a backed-up progress buffer fails and a stuck upload degrades"""
+        stuck = {"job": {"status": "processing", "started_at": datetime.now() - timedelta(hours=1)}}
+        done = {"job": {"status": "completed", "started_at": datetime.now() - timedelta(hours=1)}}
+        
+        assert check_job_queues(FakeBuffer(1), done, max_lag=60).status == OK
+        assert check_job_queues(FakeBuffer(120), done, max_lag=60).status == FAIL
+        assert check_job_queues(FakeBuffer(1), stuck, max_lag=60).status == DEGRADED
+
+class TestHealthEndpoints:
+    def test_liveness(self, client):
+        """Test that liveness reports real uptime"""
+        response = client.get("/health/live")
+        
+        assert response.status_code == 200
+        assert response.json()["uptime"] >= 0
+    
+    def test_readiness_reflects_cached_checks(self, client):
+        """Test that readiness serves the last background run"""
+        from app.core.health import health_monitor
+        health_monitor.run_checks()
+        response = client.get("/health/ready")
+        body = response.json()
+        
+        assert set(body["dependencies"]) == {"database", "upload_dir", "job_queues", "dictionary_upstream"}
+        assert response.status_code == (200 if body["status"] != FAIL else 503)
+        assert body["version"] == "1.0.0"
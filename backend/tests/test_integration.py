@@ -75,14 +75,14 @@ class TestIntegration:
         # 7. Check dictionary entries
         dict_response = client.get("/api/dictionary/", headers=auth_headers)
         assert dict_response.status_code == status.HTTP_200_OK
-        entries = dict_response.json()
+        entries = dict_response.json()["items"]
         assert len(entries) == 1
         assert entries[0]["word"] == "integrate"
         
         # 8. Check book list
         books_response = client.get("/api/books/", headers=auth_headers)
         assert books_response.status_code == status.HTTP_200_OK
-        books = books_response.json()
+        books = books_response.json()["items"]
         assert len(books) == 1
         assert books[0]["current_page"] == 5
         assert books[0]["progress"] == 25.0
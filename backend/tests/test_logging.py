@@ -0,0 +1,67 @@
+import json
+import logging
+import queue
+import sys
+from app.core.logging import BoundedQueueHandler, JSONFormatter, setup_logging
+
+class TestLoggingPipeline:
+    def test_setup_is_idempotent(self):
+        """Test that repeated setup does not attach handlers twice"""
+        listener = setup_logging()
+
+        assert setup_logging() is listener
+        queue_handlers = [h for h in logging.getLogger().handlers if isinstance(h, BoundedQueueHandler)]
+        assert len(queue_handlers) == 1
+
+    def test_full_queue_drops_and_reports(self):
+        """Test that a full queue drops records instead of blocking"""
+        log_queue = queue.Queue(maxsize=2)
+        handler = BoundedQueueHandler(log_queue)
+        record = logging.LogRecord("test", logging.INFO, __file__, 0, "message", None, None)
+
+        for _ in range(4):
+            handler.emit(record)
+        assert handler.dropped == 2
+
+        log_queue.get_nowait()
+        log_queue.get_nowait()
+        handler.emit(record)
+        log_queue.get_nowait()
+        assert "dropped 2 records" in log_queue.get_nowait().getMessage()
+
+    def test_domain_files_only_get_their_logger(self):
+        """Test that per-domain handlers filter on the logger name"""
+        listener = setup_logging()
+        database_handler = next(
+            h for h in listener.handlers
+            if getattr(h, "baseFilename", "").endswith("database.log")
+        )
+
+        assert database_handler.filter(logging.LogRecord("database", logging.INFO, __file__, 0, "m", None, None))
+        assert not database_handler.filter(logging.LogRecord("api", logging.INFO, __file__, 0, "m", None, None))
+
+    def test_access_record_is_structured(self):
+        """Test that request fields end up as JSON keys"""
+        record = logging.LogRecord("api", logging.INFO, __file__, 0, "Request: GET /", None, None)
+        record.extra = {"route": "/api/books/{book_id}", "status_code": 200, "user_id": 7}
+        data = json.loads(JSONFormatter().format(record))
+
+        assert data["route"] == "/api/books/{book_id}"
+        assert data["user_id"] == 7
+
+    def test_exception_survives_the_queue(self):
+        """Test that tracebacks reach the JSON and text formatters after queueing"""
+        log_queue = queue.Queue()
+        handler = BoundedQueueHandler(log_queue)
+        try:
+            raise ValueError("bad page")
+        except ValueError:
+            record = logging.LogRecord("database", logging.ERROR, __file__, 0, "flush %s failed", ("x",), sys.exc_info())
+        handler.emit(record)
+        queued = log_queue.get_nowait()
+
+        data = json.loads(JSONFormatter().format(queued))
+        assert data["message"] == "flush x failed"
+        assert "Traceback" in data["exception"] and "ValueError: bad page" in data["exception"]
+        text = logging.Formatter("%(message)s").format(queued)
+        assert text.startswith("flush x failed\nTraceback") and text.count("ValueError: bad page") == 1
@@ -0,0 +1,100 @@
+import pytest
+from app.core.login_throttle import LoginThrottle
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class TestLoginThrottle:
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.fixture
+    def throttle(self, clock):
+        return LoginThrottle(
+            username_capacity=3, username_refill_seconds=10,
+            ip_capacity=10, ip_refill_seconds=1, ip_failure_decay_seconds=60,
+            lockout_threshold=3, lockout_base=30, lockout_max=120,
+            idle_seconds=600, max_entries=100, clock=clock
+        )
+
+    def test_bucket_limits_attempts_per_username(self, throttle, clock):
+        """Test that a username runs out of attempts and refills over time"""
+        assert [throttle.acquire("alice", "1.1.1.1") for _ in range(3)] == [0, 0, 0]
+        assert throttle.acquire("Alice ", "2.2.2.2") == 10
+
+        clock.now += 10
+        assert throttle.acquire("alice", "3.3.3.3") == 0
+
+    def test_bucket_limits_attempts_per_ip(self, throttle):
+        """Test that one IP cannot spray many usernames"""
+        for i in range(10):
+            assert throttle.acquire(f"user{i}", "1.1.1.1") == 0
+
+        assert throttle.acquire("fresh", "1.1.1.1") == 1
+        assert throttle.acquire("fresh", "2.2.2.2") == 0
+
+    def test_exponential_lockout(self, throttle, clock):
+        """Test that lockouts double with every failure past the threshold"""
+        for _ in range(3):
+            throttle.record_failure("bob", "1.1.1.1")
+        assert throttle.acquire("bob", "9.9.9.9") == 30
+
+        throttle.record_failure("bob", "1.1.1.1")
+        assert throttle.acquire("bob", "9.9.9.9") == 60
+
+        for _ in range(5):
+            throttle.record_failure("bob", "1.1.1.1")
+        assert throttle.acquire("bob", "9.9.9.9") == 120
+
+    def test_success_clears_account_streak(self, throttle, clock):
+        """Test that a successful login resets the username's failures"""
+        for _ in range(2):
+            throttle.record_failure("carol", "1.1.1.1")
+        throttle.record_success("carol", "1.1.1.1")
+        throttle.record_failure("carol", "1.1.1.1")
+
+        assert throttle.acquire("carol", "2.2.2.2") == 0
+
+    def test_shared_ip_not_locked_by_unrelated_typos(self, throttle, clock):
+        """Test that interleaved failures and successes from one IP never lock it"""
+        for i in range(10):
+            throttle.record_failure(f"user{i}", "1.1.1.1")
+            throttle.record_success(f"user{i}", "1.1.1.1")
+            assert throttle.acquire(f"other{i}", "1.1.1.1") == 0
+
+        for i in range(10):
+            throttle.record_failure(f"typo{i}", "1.1.1.1")
+            clock.now += 60
+        assert throttle.acquire("fresh", "1.1.1.1") == 0
+
+    def test_ip_failures_in_a_burst_lock_the_ip(self, throttle, clock):
+        """Test that a burst of failures across usernames still locks the IP"""
+        for i in range(3):
+            throttle.record_failure(f"user{i}", "1.1.1.1")
+
+        assert throttle.acquire("fresh", "1.1.1.1") == 30
+        assert throttle.acquire("fresh", "2.2.2.2") == 0
+
+    def test_idle_entries_evicted(self, throttle, clock):
+        """Test that buckets untouched for the idle period are dropped"""
+        throttle.acquire("dave", "1.1.1.1")
+        clock.now += 601
+        throttle.acquire("erin", "2.2.2.2")
+
+        assert len(throttle.usernames) == 1
+        assert len(throttle.ips) == 1
+
+    def test_login_endpoint_throttled_before_lookup(self, client):
+        """Test that the login endpoint answers 429 once the bucket is empty"""
+        for _ in range(5):
+            response = client.post("/api/auth/login", data={"username": "nobody", "password": "wrong"})
+            assert response.status_code != 429
+
+        response = client.post("/api/auth/login", data={"username": "nobody", "password": "wrong"})
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, text
+from app.api.endpoints.dictionary import create_dictionary_entry
+from app.core.database import (
+    Base, async_database_url, create_async_session_factory, get_async_db, set_async_session_factory
+)
+from app.core.loop_guard import SyncDatabaseOnEventLoop, guard_event_loop
+from app.core.metrics import registry
+from app.core.query_monitor import QueryStats, current_query_stats
+from app.models.dictionary import DictionaryEntry
+from app.models.user import User
+from app.schemas.dictionary import DictionaryEntry as DictionaryEntrySchema, DictionaryEntryCreate
+
+def make_engine(mode: str):
+    engine = create_engine("sqlite://")
+    guard_event_loop(engine, mode=mode)
+    return engine
+
+def select_one(engine):
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT 1")).scalar()
+
+class TestLoopGuard:
+    def test_raise_on_event_loop(self):
+        """Test that a sync statement inside a coroutine is rejected"""
+        engine = make_engine("raise")
+        
+        async def handler():
+            return select_one(engine)
+        
+        with pytest.raises(SyncDatabaseOnEventLoop):
+            asyncio.run(handler())
+    
+    def test_threadpool_is_allowed(self):
+        """Test that offloading the statement to a thread passes the guard"""
+        engine = make_engine("raise")
+        
+        async def handler():
+            return await asyncio.to_thread(select_one, engine)
+        
+        assert asyncio.run(handler()) == 1
+        assert select_one(engine) == 1
+    
+    def test_warn_logs_each_call_site_once(self, caplog):
+        """Test that warn mode lets the statement through and logs once"""
+        engine = make_engine("warn")
+        
+        async def handler():
+            return [select_one(engine) for _ in range(3)]
+        
+        with caplog.at_level(logging.WARNING, logger="database"):
+            assert asyncio.run(handler()) == [1, 1, 1]
+        
+        warnings = [r for r in caplog.records if "event loop" in r.getMessage()]
+        assert len(warnings) == 1
+
+class TestAsyncDatabase:
+    def test_async_driver_urls(self):
+        """Test the mapping from sync URLs to asyncio drivers"""
+        assert async_database_url("sqlite:///./greatreading.db") == "sqlite+aiosqlite:///./greatreading.db"
+        assert async_database_url("postgresql+psycopg2://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+    
+    def test_async_session_round_trip(self, tmp_path):
+        """Test that async sessions get the SQLite profile, statement metrics and query stats"""
+        factory = create_async_session_factory(f"sqlite+aiosqlite:///{tmp_path / 'async.db'}", tuned=True)
+        count = lambda: registry.get_sample_value(
+            "greatreading_db_query_duration_seconds_count", {"operation": "select"}
+        ) or 0
+        before = count()
+        stats = QueryStats("async")
+        
+        async def run():
+            token = current_query_stats.set(stats)
+            try:
+                async with factory() as db:
+                    mode = (await db.execute(text("PRAGMA journal_mode"))).scalar()
+                    await db.execute(text("SELECT 1"))
+            finally:
+                current_query_stats.reset(token)
+                await factory.kw["bind"].dispose()
+            return mode
+        
+        assert asyncio.run(run()) == "wal"
+        assert count() == before + 1
+        assert stats.count == 2
+    
+    def test_async_endpoint_uses_overridden_factory(self, tmp_path):
+        """Test that an async endpoint runs against the factory set for get_async_db"""
+        factory = create_async_session_factory(f"sqlite+aiosqlite:///{tmp_path / 'endpoint.db'}")
+        user = User(id=1, email="async@example.com", username="async", hashed_password="x")
+        
+        async def run():
+            async with factory.kw["bind"].begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            async with factory() as db:
+                db.add(User(id=1, email="async@example.com", username="async", hashed_password="x"))
+                db.add(DictionaryEntry(user_id=1, word="lucid", definition="clear"))
+                await db.commit()
+            set_async_session_factory(factory)
+            try:
+                async for db in get_async_db():
+                    with pytest.raises(HTTPException) as exc:
+                        await create_dictionary_entry(DictionaryEntryCreate(word="lucid", definition="d"), user, db)
+                    return exc.value.status_code
+            finally:
+                set_async_session_factory(None)
+                await factory.kw["bind"].dispose()
+        
+        assert asyncio.run(run()) == 400
+    
+    def test_async_endpoint_creates_entry(self, tmp_path):
+        """Test that saving a new word on aiosqlite stores the entry and returns it"""
+        factory = create_async_session_factory(f"sqlite+aiosqlite:///{tmp_path / 'create.db'}")
+        user = User(id=1, email="async@example.com", username="async", hashed_password="x")
+        entry_in = DictionaryEntryCreate(
+            word="serene", definition="calm", context="a serene lake", page_number=3,
+            phonetic="/səˈriːn/", audio_url="https://example.com/serene.mp3",
+            part_of_speech="adjective", examples=["She stayed serene."]
+        )
+        
+        async def run():
+            async with factory.kw["bind"].begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            async with factory() as db:
+                db.add(User(id=1, email="async@example.com", username="async", hashed_password="x"))
+                await db.commit()
+            try:
+                async with factory() as db:
+                    entry = await create_dictionary_entry(entry_in, user, db)
+                    body = DictionaryEntrySchema.model_validate(entry)
+                async with factory() as db:
+                    stored = (await db.execute(text("SELECT word, phonetic, part_of_speech FROM dictionary_entries"))).all()
+                return body, stored
+            finally:
+                await factory.kw["bind"].dispose()
+        
+        body, stored = asyncio.run(run())
+        assert body.word == "serene" and body.user_id == 1 and body.mastered == 0
+        assert stored == [("serene", "/səˈriːn/", "adjective")]
@@ -0,0 +1,58 @@
+import os
+import subprocess
+import sys
+from app.core.config import settings
+from app.core.metrics import AppStateCollector
+from app.core.security import create_access_token
+from prometheus_client import CollectorRegistry, generate_latest
+
+BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class TestMetrics:
+    def test_app_state_is_read_at_scrape_time(self):
+        """Test that callback metrics render current values and survive failing reads"""
+        state = {"depth": 1}
+        collector = AppStateCollector()
+        collector.add("gauge", "test_queue_depth", "Depth", lambda: {("a",): state["depth"]}, ["queue"])
+        collector.add("counter", "test_broken_total", "Broken", lambda: 1 / 0)
+        scrape = CollectorRegistry()
+        scrape.register(collector)
+        state["depth"] = 3
+        text = generate_latest(scrape).decode()
+
+        assert 'test_queue_depth{queue="a"} 3.0' in text
+        assert "test_broken" not in text
+
+    def test_multiprocess_workers_are_aggregated(self, tmp_path):
+        """Test that counters from separate worker processes add up in one scrape"""
+        env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path), PYTHONPATH=BACKEND_ROOT)
+        worker = "from app.core.metrics import rate_limit_rejections; rate_limit_rejections.labels('x').inc()"
+        for _ in range(2):
+            subprocess.run([sys.executable, "-c", worker], env=env, check=True, cwd=str(tmp_path))
+        scrape = "from app.core.metrics import render_metrics; print(render_metrics().decode())"
+        text = subprocess.run([sys.executable, "-c", scrape], env=env, check=True, cwd=str(tmp_path),
+                              capture_output=True, text=True).stdout
+
+        assert 'greatreading_rate_limit_rejections_total{rule="x"} 2.0' in text
+
+    def test_metrics_endpoint_requires_scrape_token(self, client, monkeypatch):
+        """Test that /metrics takes only the scrape token, and is off without one"""
+        assert client.get("/metrics").status_code == 404
+
+        monkeypatch.setattr(settings, "METRICS_SCRAPE_TOKEN", "scrape-secret")
+        assert client.get("/metrics").status_code == 401
+        assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+        user_token = create_access_token({"sub": "1", "act": True})
+        assert client.get("/metrics", headers={"Authorization": f"Bearer {user_token}"}).status_code == 401
+
+    def test_metrics_endpoint(self, client, monkeypatch):
+        """Test that requests show up per route template"""
+        monkeypatch.setattr(settings, "METRICS_SCRAPE_TOKEN", "scrape-secret")
+        client.get("/health")
+        response = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'greatreading_http_request_duration_seconds_count{method="GET",route="/health",status="2xx"}' in response.text
+        assert "greatreading_http_requests_in_flight" in response.text
+        assert "greatreading_queue_depth" in response.text
@@ -0,0 +1,110 @@
+import asyncio
+import threading
+from app.core.rate_limit import MemoryBackend, RateLimitRule
+from app.core.security import create_access_token
+from app.middleware import logging_middleware
+from app.middleware.logging_middleware import LoggingMiddleware, RateLimitingMiddleware
+
+def run_asgi(app, path="/", headers=()):
+    events = []
+    scope = {"type": "http", "method": "GET", "path": path, "headers": list(headers), "client": ("127.0.0.1", 1234)}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        events.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return events
+
+async def streaming_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"first", "more_body": True})
+    scope["state"]["trace"].append("after first chunk")
+    await send({"type": "http.response.body", "body": b"second", "more_body": False})
+
+class TestMiddleware:
+    def test_headers_added_and_body_not_buffered(self):
+        """Test that chunks reach the server as soon as the app sends them"""
+        trace = []
+
+        async def app(scope, receive, send):
+            scope["state"] = {"trace": trace}
+            await stack(scope, receive, recording_send(send))
+
+        def recording_send(send):
+            async def wrapper(message):
+                trace.append(message["type"])
+                await send(message)
+            return wrapper
+
+        stack = LoggingMiddleware(RateLimitingMiddleware(streaming_app, backend=MemoryBackend()))
+        events = run_asgi(app)
+
+        assert trace == ["http.response.start", "http.response.body", "after first chunk", "http.response.body"]
+        headers = dict(events[0]["headers"])
+        assert b"x-request-id" in headers
+        assert b"x-response-time" in headers
+        assert headers[b"ratelimit-limit"] == b"100"
+
+    def test_rate_limited_request_short_circuits(self):
+        """Test that a denied request gets a 429 without reaching the app"""
+        calls = []
+
+        async def app(scope, receive, send):
+            calls.append(scope["path"])
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"ok"})
+
+        limited = RateLimitingMiddleware(app, max_requests=1, window_seconds=60, backend=MemoryBackend(), rules=[])
+        assert run_asgi(limited)[0]["status"] == 200
+        events = run_asgi(limited)
+
+        assert events[0]["status"] == 429
+        assert len(calls) == 1
+
+    def test_blocking_backend_runs_off_the_event_loop(self, monkeypatch):
+        """Test that a blocking backend is called in a worker thread and the token decoded once"""
+        loop_threads, hit_threads, keys, decodes = [], [], [], []
+
+        class BlockingBackend(MemoryBackend):
+            blocking = True
+
+            def hit(self, key, limit, period):
+                hit_threads.append(threading.get_ident())
+                keys.append(key)
+                return super().hit(key, limit, period)
+
+        async def app(scope, receive, send):
+            loop_threads.append(threading.get_ident())
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"ok"})
+
+        decode = logging_middleware.jwt.decode
+        monkeypatch.setattr(logging_middleware.jwt, "decode", lambda *a, **kw: decodes.append(1) or decode(*a, **kw))
+        token = create_access_token({"sub": "7"})
+        limited = RateLimitingMiddleware(app, backend=BlockingBackend(),
+                                         rules=[RateLimitRule("books", "/api/books", 10, 60)])
+        events = run_asgi(limited, "/api/books", [(b"authorization", f"Bearer {token}".encode())])
+
+        assert events[0]["status"] == 200
+        assert keys == ["default:user:7", "books:user:7"]
+        assert len(decodes) == 1
+        assert loop_threads[0] not in hit_threads
+
+    def test_access_log_sampling(self):
+        """Test that errors and slow requests bypass sampling"""
+        async def app(scope, receive, send):
+            status = 500 if scope["path"] == "/error" else 200
+            await send({"type": "http.response.start", "status": status, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        middleware = LoggingMiddleware(app, sample_rate=0.0, slow_ms=60000)
+        run_asgi(middleware, "/ok")
+        run_asgi(middleware, "/error")
+        assert (middleware.logged, middleware.sampled_out) == (1, 1)
+
+        middleware.slow_ms = 0
+        run_asgi(middleware, "/ok")
+        assert middleware.logged == 2
@@ -0,0 +1,205 @@
+import pytest
+from datetime import datetime, timedelta
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import event, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.api.endpoints.books import SUMMARY_COLUMNS
+from app.core.cache import rows_validator
+from app.core.database import Base, create_db_engine, run_migrations
+from app.core.pagination import keyset_paginate
+from app.models.book import Book
+from app.models.dictionary import DictionaryEntry
+from app.models.reading_session import ReadingSession
+from app.models.user import User
+from app.schemas.book import Book as BookSchema, BookSummary
+from app.schemas.dictionary import DictionaryEntry as DictionaryEntrySchema
+from app.schemas.reading_session import ReadingSession as ReadingSessionSchema
+from app.services.activity_service import ActivityService
+import app.models  # noqa: F401  registers every table on Base.metadata
+
+@pytest.fixture
+def migrated_engine(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'migrated.db'}")
+    run_migrations(engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def seeded(migrated_engine):
+    """A user with a few books, sessions and words"""
+    session = Session(bind=migrated_engine)
+    user = User(email="plan@example.com", username="plan", hashed_password="x")
+    session.add(user)
+    session.flush()
+    now = datetime.utcnow()
+    for i in range(3):
+        book = Book(title=f"Book {i}", filename=f"plan{i}.pdf", file_path="p", owner_id=user.id,
+                    created_at=now - timedelta(days=i))
+        session.add(book)
+        session.flush()
+        session.add(ReadingSession(user_id=user.id, book_id=book.id, created_at=now - timedelta(hours=i)))
+        session.add(DictionaryEntry(user_id=user.id, word=f"word{i}", definition="d", mastered=i % 2))
+    session.commit()
+    yield session, user.id
+    session.close()
+
+def query_plans(engine, run) -> list:
+    """EXPLAIN QUERY PLAN for every SELECT issued while ``run`` executes"""
+    statements = []
+    
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+    
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        run()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    
+    with engine.connect() as conn:
+        return [
+            (statement, " | ".join(row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)))
+            for statement, parameters in statements
+        ]
+
+def schema_diff(engine) -> list:
+    with engine.connect() as conn:
+        context = MigrationContext.configure(conn, opts={"compare_type": True})
+        return compare_metadata(context, Base.metadata)
+
+class TestMigrations:
+    def test_head_matches_models(self, migrated_engine):
+        """Test that the migrations produce exactly the schema the models declare"""
+        assert schema_diff(migrated_engine) == []
+    
+    def test_legacy_database_is_stamped_and_upgraded(self, tmp_path):
+        """Test that a create_all database without alembic_version is adopted"""
+        engine = create_db_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+        run_migrations(engine, revision="0001")
+        with engine.begin() as conn:
+            conn.execute(text("DROP TABLE alembic_version"))
+            conn.execute(text("INSERT INTO users (id, email, username, hashed_password) VALUES (1, 'a', 'a', 'x')"))
+            for i in range(1, 6):
+                conn.execute(text(
+                    "INSERT INTO books (id, title, filename, file_path, owner_id, status, total_pages, current_page, progress) "
+                    f"VALUES ({i}, 'b{i}', 'f{i}', 'p', 1, 'completed', 0, 0, 0)"
+                ))
+        
+        run_migrations(engine)
+        
+        session = Session(bind=engine)
+        query = session.query(Book).filter(Book.owner_id == 1)
+        page = keyset_paginate(query, Book, BookSchema, None, 2)
+        ids = [item.id for item in page.items]
+        while page.next_cursor:
+            page = keyset_paginate(query, Book, BookSchema, page.next_cursor, 2)
+            ids.extend(item.id for item in page.items)
+        stamps = session.query(Book.created_at, Book.updated_at).order_by(Book.id).all()
+        session.close()
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT count(*) FROM users")).scalar() == 1
+        assert schema_diff(engine) == []
+        engine.dispose()
+        
+        # Backfilled in id order, so the listing keeps insertion order
+        assert ids == [5, 4, 3, 2, 1]
+        assert len({created for created, _ in stamps}) == 5
+        assert all(created == updated for created, updated in stamps)
+    
+    def test_second_resolution_timestamps_are_normalised(self, tmp_path):
+        """Test that rows stamped by CURRENT_TIMESTAMP page through after upgrading"""
+        engine = create_db_engine(f"sqlite:///{tmp_path / 'stamped.db'}")
+        run_migrations(engine, revision="0008")
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO users (id, email, username, hashed_password) VALUES (1, 'a', 'a', 'x')"))
+            conn.execute(text("INSERT INTO books (id, title, filename, file_path, owner_id) VALUES (1, 't', 'f', 'p', 1)"))
+            for _ in range(5):
+                conn.execute(text(
+                    "INSERT INTO reading_sessions (user_id, book_id, start_page, duration_minutes, words_encountered, "
+                    "words_saved, created_at) VALUES (1, 1, 1, 0, 0, 0, '2024-01-01 10:00:00')"
+                ))
+        
+        run_migrations(engine)
+        
+        session = Session(bind=engine)
+        query = session.query(ReadingSession).filter(ReadingSession.user_id == 1)
+        page = keyset_paginate(query, ReadingSession, ReadingSessionSchema, None, 1)
+        ids = [item.id for item in page.items]
+        while page.next_cursor:
+            page = keyset_paginate(query, ReadingSession, ReadingSessionSchema, page.next_cursor, 1)
+            ids.extend(item.id for item in page.items)
+        with engine.connect() as conn:
+            stored = conn.execute(text("SELECT DISTINCT created_at FROM reading_sessions")).scalars().all()
+        session.close()
+        engine.dispose()
+        
+        assert ids == [5, 4, 3, 2, 1]
+        assert stored == ["2024-01-01 10:00:00.000000"]
+    
+    def test_word_is_unique_per_user(self, seeded):
+        """Test that the database rejects a second entry for the same word"""
+        session, user_id = seeded
+        session.add(DictionaryEntry(user_id=user_id, word="word0", definition="again"))
+        
+        with pytest.raises(IntegrityError):
+            session.commit()
+
+class TestHotQueryPlans:
+    @staticmethod
+    def assert_indexed(plans, table: str):
+        assert plans, "no statements captured"
+        for statement, plan in plans:
+            if table not in statement:
+                continue
+            assert "USING" in plan and "INDEX" in plan, f"{plan}\n{statement}"
+            assert f"SCAN {table} " not in f"{plan} ", f"full scan: {plan}\n{statement}"
+    
+    def test_book_listing(self, migrated_engine, seeded):
+        """Test that the library listing, its next page and its validator are index range scans"""
+        session, user_id = seeded
+        query = session.query(*SUMMARY_COLUMNS).filter(Book.owner_id == user_id)
+        
+        def run():
+            first = keyset_paginate(query, Book, BookSummary, None, 2)
+            keyset_paginate(query, Book, BookSummary, first.next_cursor, 2)
+            rows_validator(session, Book, Book.owner_id == user_id)
+        
+        plans = query_plans(migrated_engine, run)
+        self.assert_indexed(plans, "books")
+        assert any("ix_books_owner_created" in plan for _, plan in plans)
+    
+    def test_reading_sessions(self, migrated_engine, seeded):
+        """Test that session pages and activity windows use (user_id, created_at)"""
+        session, user_id = seeded
+        now = datetime.utcnow()
+        
+        def run():
+            query = session.query(ReadingSession).filter(ReadingSession.user_id == user_id)
+            keyset_paginate(query, ReadingSession, ReadingSessionSchema, None, 2)
+            ActivityService.get_activity(session, user_id, now - timedelta(days=7), now, "day")
+        
+        plans = query_plans(migrated_engine, run)
+        self.assert_indexed(plans, "reading_sessions")
+        assert any("ix_reading_sessions_user_created" in plan for _, plan in plans)
+    
+    def test_dictionary(self, migrated_engine, seeded):
+        """Test the duplicate-word check and the mastered-filtered listing"""
+        session, user_id = seeded
+        
+        def run():
+            session.query(DictionaryEntry.id).filter(
+                DictionaryEntry.user_id == user_id, DictionaryEntry.word == "word1"
+            ).first()
+            query = session.query(DictionaryEntry).filter(
+                DictionaryEntry.user_id == user_id, DictionaryEntry.mastered == 1
+            )
+            keyset_paginate(query, DictionaryEntry, DictionaryEntrySchema, None, 2)
+        
+        plans = query_plans(migrated_engine, run)
+        self.assert_indexed(plans, "dictionary_entries")
+        joined = " ".join(plan for _, plan in plans)
+        assert "uq_dictionary_entries_user_word" in joined or "sqlite_autoindex_dictionary_entries" in joined
+        assert "ix_dictionary_entries_user_mastered_created" in joined
@@ -0,0 +1,87 @@
+import pytest
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from sqlalchemy import text
+from app.core.pagination import keyset_paginate, decode_cursor
+from app.models.user import User
+from app.models.dictionary import DictionaryEntry
+from app.schemas.dictionary import DictionaryEntry as DictionaryEntrySchema
+
+class TestKeysetPagination:
+    @pytest.fixture
+    def entries_query(self, db):
+        """Create 25 entries, several sharing a timestamp, and return the base query"""
+        user = User(email="pages@example.com", username="pages", hashed_password="x")
+        db.add(user)
+        db.flush()
+        base = datetime(2024, 1, 1)
+        for i in range(25):
+            # Groups of three share created_at so the id tiebreaker matters
+            db.add(DictionaryEntry(
+                user_id=user.id,
+                word=f"word{i}",
+                definition="definition",
+                created_at=base + timedelta(minutes=i // 3)
+            ))
+        db.flush()
+        return db.query(DictionaryEntry).filter(DictionaryEntry.user_id == user.id)
+    
+    def walk(self, query, size):
+        page = keyset_paginate(query, DictionaryEntry, DictionaryEntrySchema, size=size)
+        pages = [page]
+        while page.next_cursor:
+            page = keyset_paginate(query, DictionaryEntry, DictionaryEntrySchema, page.next_cursor, size)
+            pages.append(page)
+        return pages
+    
+    def test_walks_every_row_once_newest_first(self, entries_query):
+        """Test forward traversal visits each row exactly once in order"""
+        pages = self.walk(entries_query, 10)
+        words = [item.word for page in pages for item in page.items]
+        
+        assert len(pages) == 3
+        assert len(words) == len(set(words)) == 25
+        assert words[0] == "word24" and words[-1] == "word0"
+        assert [page.page for page in pages] == [1, 2, 3]
+        assert all(page.total == 25 and page.pages == 3 for page in pages)
+        assert not pages[0].has_prev and pages[0].has_next
+        assert pages[-1].has_prev and not pages[-1].has_next
+    
+    def test_prev_cursor_returns_previous_page(self, entries_query):
+        """Test that following prev_cursor reproduces the earlier page"""
+        first, second, third = self.walk(entries_query, 10)
+        
+        back = keyset_paginate(entries_query, DictionaryEntry, DictionaryEntrySchema, third.prev_cursor, 10)
+        assert [i.id for i in back.items] == [i.id for i in second.items]
+        assert back.page == 2 and back.has_next and back.has_prev
+        
+        back = keyset_paginate(entries_query, DictionaryEntry, DictionaryEntrySchema, back.prev_cursor, 10)
+        assert [i.id for i in back.items] == [i.id for i in first.items]
+        assert not back.has_prev
+    
+    def test_server_default_timestamps_reach_the_end(self, db):
+        """Test that rows stamped by the database page through without repeating"""
+        user = User(email="stamps@example.com", username="stamps", hashed_password="x")
+        db.add(user)
+        db.flush()
+        for i in range(4):
+            db.execute(text(
+                "INSERT INTO dictionary_entries (user_id, word, definition, mastered) VALUES (:u, :w, 'd', 0)"
+            ), {"u": user.id, "w": f"default{i}"})
+        same_second = datetime(2024, 1, 1, 12, 0, 0)
+        for i in range(3):
+            db.add(DictionaryEntry(user_id=user.id, word=f"orm{i}", definition="d", created_at=same_second))
+        db.flush()
+        query = db.query(DictionaryEntry).filter(DictionaryEntry.user_id == user.id)
+        
+        pages = self.walk(query, 1)
+        ids = [item.id for page in pages for item in page.items]
+        
+        assert len(pages) == 7
+        assert len(ids) == len(set(ids)) == 7
+    
+    def test_invalid_cursor_is_rejected(self):
+        """Test that tampered cursors produce a 400"""
+        with pytest.raises(HTTPException) as exc:
+            decode_cursor("not-a-cursor")
+        assert exc.value.status_code == 400
@@ -0,0 +1,63 @@
+import time
+import pytest
+from sqlalchemy.orm import object_session
+from app.core.principal_cache import PrincipalCache, principal_cache
+from app.models.user import User
+
+class TestPrincipalCache:
+    @pytest.fixture
+    def user(self, db):
+        user = User(email="principal@example.com", username="principal", hashed_password="x", is_active=True)
+        db.add(user)
+        db.flush()
+        return user
+    
+    @pytest.fixture(autouse=True)
+    def reset_cache(self):
+        principal_cache.clear()
+        yield
+        principal_cache.clear()
+    
+    def test_cached_principal_is_detached_snapshot(self, user):
+        """Test that the cached user is a session-free copy"""
+        cached = principal_cache.set("principal", user)
+        
+        assert cached is not user
+        assert object_session(cached) is None
+        assert principal_cache.get("principal").id == user.id
+        assert principal_cache.get("principal").is_active
+    
+    def test_entries_expire(self, user):
+        """Test the TTL bound on staleness"""
+        cache = PrincipalCache(ttl=0.01, max_entries=10)
+        cache.set("principal", user)
+        time.sleep(0.02)
+        
+        assert cache.get("principal") is None
+    
+    def test_deactivation_evicts(self, db, user):
+        """Test that deactivating a user drops its cached principal"""
+        principal_cache.set("principal", user)
+        user.is_active = False
+        db.flush()
+        
+        assert principal_cache.get("principal") is None
+    
+    def test_password_change_evicts(self, db, user):
+        """Test that changing the password drops the cached principal"""
+        principal_cache.set("principal", user)
+        user.hashed_password = "y"
+        db.flush()
+        
+        assert principal_cache.get("principal") is None
+    
+    def test_size_bound(self, db, user):
+        """Test that the oldest entries are evicted first"""
+        cache = PrincipalCache(ttl=60, max_entries=1)
+        cache.set("a", user)
+        cache.set("b", user)
+        
+        assert cache.get("a") is None
+        assert cache.get("b") is not None
+        cache.invalidate_user(user.id)
+        assert cache.get("b") is None
@@ -0,0 +1,79 @@
+import asyncio
+import time
+from app.core.profiling import (
+    Collector, ProfileStore, StackSampler, create_profiling_token, verify_profiling_token
+)
+from app.core.security import create_access_token
+from app.middleware.profiling_middleware import ProfilingMiddleware
+
+def run_request(app, headers=()):
+    events = []
+    scope = {"type": "http", "method": "GET", "path": "/slow", "headers": list(headers),
+             "query_string": b"", "state": {"request_id": "req-1"}}
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        events.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return events
+
+async def slow_app(scope, receive, send):
+    time.sleep(0.05)
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+class TestProfiling:
+    def test_profiling_token(self):
+        """Test that only profiling tokens are accepted"""
+        assert verify_profiling_token(create_profiling_token(1))
+        assert not verify_profiling_token(create_access_token({"sub": "1", "typ": "access"}))
+        assert not verify_profiling_token("garbage")
+
+    def test_requested_profile_is_stored(self):
+        """Test that a request with a token is profiled and gets an id"""
+        store = ProfileStore()
+        middleware = ProfilingMiddleware(slow_app, sampler=StackSampler(interval=0.001), store=store,
+                                         auto_sample_rate=0.0, slow_ms=60000)
+        token = create_profiling_token(1).encode()
+        events = run_request(middleware, headers=[(b"x-profile-token", token)])
+
+        profile_id = dict(events[0]["headers"])[b"x-profile-id"].decode()
+        profile = store.get(profile_id)
+        assert profile["request_id"] == "req-1"
+        assert profile["samples"] > 0
+        assert "profiling_middleware.py:__call__" in profile["collapsed"]
+
+    def test_unprofiled_fast_request_leaves_no_trace(self):
+        store = ProfileStore()
+        middleware = ProfilingMiddleware(slow_app, store=store, auto_sample_rate=0.0, slow_ms=60000)
+        events = run_request(middleware)
+
+        assert b"x-profile-id" not in dict(events[0]["headers"])
+        assert store.slowest() == []
+
+    def test_slow_requests_captured_automatically(self):
+        """Test that sampled requests over the threshold keep their profile"""
+        store = ProfileStore()
+        middleware = ProfilingMiddleware(slow_app, sampler=StackSampler(interval=0.001), store=store,
+                                         auto_sample_rate=1.0, slow_ms=10)
+        run_request(middleware)
+
+        slowest = store.slowest()
+        assert len(slowest) == 1
+        assert store.get(slowest[0]["profile_id"])["samples"] > 0
+
+    def test_slowest_keeps_top_n(self):
+        store = ProfileStore(slowest_n=3)
+        for duration in (5, 50, 1, 40, 30, 2):
+            store.record_slow({"duration_ms": duration})
+
+        assert [entry["duration_ms"] for entry in store.slowest()] == [50, 40, 30]
+
+    def test_collapsed_output(self):
+        collector = Collector()
+        collector.stacks.update(["a;b", "a;b", "a;c"])
+
+        assert collector.collapsed() == "a;b 2\na;c 1"
@@ -0,0 +1,180 @@
+import pytest
+from datetime import datetime
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from app.api.endpoints.reading import create_reading_session, record_heartbeat, update_reading_session
+from app.models.user import User
+from app.models.book import Book
+from app.models.reading_session import ReadingSession
+from app.schemas.reading_session import ReadingHeartbeat, ReadingSessionCreate, ReadingSessionUpdate
+from app.services.progress_buffer import ProgressBuffer, progress_buffer
+
+class TestProgressBuffer:
+    @pytest.fixture
+    def book(self, db):
+        """Create a user owning a 200 page book"""
+        user = User(email="buffer@example.com", username="buffer", hashed_password="x")
+        db.add(user)
+        db.flush()
+        book = Book(title="Book", filename="buffer.pdf", file_path="buffer.pdf",
+                    owner_id=user.id, total_pages=200)
+        db.add(book)
+        db.flush()
+        return book
+    
+    @pytest.fixture
+    def buffer(self, db):
+        """Buffer whose flushes share the test transaction"""
+        connection = db.connection()
+        return ProgressBuffer(
+            session_factory=lambda: Session(bind=connection),
+            flush_interval=60,
+            max_pending=100
+        )
+    
+    def test_heartbeats_are_coalesced(self, db, book, buffer):
+        """Test that only the latest heartbeat per book is written"""
+        for page in range(1, 51):
+            buffer.record(book.owner_id, book.id, page)
+        
+        assert buffer.pending_count == 1
+        assert buffer.flush() == 1
+        
+        db.refresh(book)
+        assert book.current_page == 50
+        assert book.progress == 25.0
+        assert buffer.pending_count == 0
+    
+    def test_flush_updates_session_end_page(self, db, book, buffer):
+        """Test that a heartbeat tied to a session moves its end page"""
+        session = ReadingSession(user_id=book.owner_id, book_id=book.id, start_page=1)
+        db.add(session)
+        db.flush()
+        
+        buffer.record(book.owner_id, book.id, 250, session_id=session.id)
+        buffer.flush()
+        
+        db.refresh(book)
+        db.refresh(session)
+        assert session.end_page == 250
+        assert book.progress == 100.0
+    
+    def test_flush_bumps_updated_at(self, db, book, buffer):
+        """Test that batched progress writes move the ETag timestamp"""
+        book.updated_at = datetime(2000, 1, 1)
+        db.flush()
+        
+        buffer.record(book.owner_id, book.id, 10)
+        buffer.flush()
+        
+        db.refresh(book)
+        assert book.updated_at.year > 2000
+    
+    def test_foreign_books_are_ignored(self, db, book, buffer):
+        """Test that heartbeats for someone else's book change nothing"""
+        buffer.record(book.owner_id + 1, book.id, 120)
+        buffer.flush()
+        
+        db.refresh(book)
+        assert book.current_page == 0
+    
+    def test_size_threshold_wakes_flusher(self, book, buffer):
+        """Test that reaching max_pending signals an early flush"""
+        buffer.max_pending = 2
+        buffer.record(book.owner_id, book.id, 1)
+        assert not buffer._wakeup.is_set()
+        buffer.record(book.owner_id, book.id + 1, 1)
+        assert buffer._wakeup.is_set()
+
+    
+    def test_ended_session_is_not_overwritten(self, db, book, buffer):
+        """Test that a heartbeat buffered before the session was ended is discarded at flush"""
+        session = ReadingSession(user_id=book.owner_id, book_id=book.id, start_page=1)
+        db.add(session)
+        db.flush()
+        buffer.record(book.owner_id, book.id, 100, session_id=session.id)
+        session.end_page = book.current_page = 120
+        session.ended_at = datetime.utcnow()
+        db.flush()
+        
+        buffer.flush()
+        
+        db.refresh(book)
+        db.refresh(session)
+        assert session.end_page == 120
+        assert book.current_page == 120
+    
+    def test_capacity_refuses_new_books(self, book, buffer):
+        """Test that a full buffer still coalesces but drops heartbeats for new books"""
+        buffer.capacity = 2
+        assert buffer.record(book.owner_id, book.id, 1)
+        assert buffer.record(book.owner_id, book.id + 1, 1)
+        assert buffer.record(book.owner_id, book.id, 2)
+        assert not buffer.record(book.owner_id, book.id + 2, 1)
+        
+        assert buffer.pending_count == 2
+        assert buffer.heartbeats_dropped == 1
+    
+    def test_failed_flush_requeue_is_capped(self, book):
+        """Test that re-queued batches never grow the buffer past its capacity"""
+        class FailingSession:
+            def execute(self, *args):
+                # A heartbeat for another book arrives mid-flush
+                buffer.record(book.owner_id, book.id + 2, 1)
+                raise RuntimeError("database is locked")
+            def rollback(self):
+                pass
+            def close(self):
+                pass
+        buffer = ProgressBuffer(session_factory=FailingSession, flush_interval=60, capacity=2)
+        buffer.record(book.owner_id, book.id, 1)
+        buffer.record(book.owner_id, book.id + 1, 1)
+        
+        assert buffer.flush() == 0
+        assert buffer.pending_count == 2
+        assert buffer.heartbeats_dropped == 1
+    
+    def test_heartbeat_session_is_checked_on_accept(self, db, book):
+        """Test that heartbeats naming another book's or an ended session are rejected"""
+        user = db.get(User, book.owner_id)
+        session = ReadingSession(user_id=user.id, book_id=book.id, start_page=1)
+        db.add(session)
+        db.flush()
+        
+        with pytest.raises(HTTPException) as exc:
+            record_heartbeat(ReadingHeartbeat(book_id=book.id + 1, page=5, session_id=session.id), user, db)
+        assert exc.value.status_code == 404
+        
+        session.ended_at = datetime.utcnow()
+        db.flush()
+        with pytest.raises(HTTPException) as exc:
+            record_heartbeat(ReadingHeartbeat(book_id=book.id, page=5, session_id=session.id), user, db)
+        assert exc.value.status_code == 409
+    
+    def test_open_session_heartbeats_skip_lookup(self, db, book):
+        """Test that heartbeats for a session started here run no query until it ends"""
+        user = db.get(User, book.owner_id)
+        session = create_reading_session(
+            ReadingSessionCreate(book_id=book.id, duration_minutes=0, start_page=1), user, db
+        )
+        
+        # No database session at all: any lookup would fail
+        heartbeat = ReadingHeartbeat(book_id=book.id, page=5, session_id=session.id)
+        assert record_heartbeat(heartbeat, user, None) == {"status": "accepted"}
+        
+        update_reading_session(session.id, ReadingSessionUpdate(end_page=10), user, db)
+        assert not progress_buffer.is_open_session(session.id, user.id, book.id)
+        with pytest.raises(HTTPException) as exc:
+            record_heartbeat(heartbeat, user, db)
+        assert exc.value.status_code == 409
+    
+    def test_open_sessions_are_bounded(self, buffer):
+        """Test that the open-session set forgets the least recently used ids"""
+        buffer.open_sessions_max = 2
+        for session_id in (1, 2):
+            buffer.open_session(session_id, 7, 1)
+        assert buffer.is_open_session(1, 7, 1)
+        buffer.open_session(3, 7, 1)
+        
+        assert [buffer.is_open_session(i, 7, 1) for i in (1, 2, 3)] == [True, False, True]
+        assert not buffer.is_open_session(1, 8, 1)
@@ -0,0 +1,53 @@
+import logging
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+from app.core.query_monitor import QueryStats, instrument_queries, redact_parameters, statement_shape
+from app.middleware.query_stats_middleware import QueryStatsMiddleware
+
+class TestQueryMonitor:
+    def test_statement_shape_folds_literals(self):
+        """Test that statements differing only in values share a shape"""
+        a = statement_shape("SELECT * FROM books WHERE id = 1 AND title = 'x'")
+        b = statement_shape("SELECT *  FROM books\n WHERE id = 22 AND title = 'it''s'")
+
+        assert a == b
+        assert statement_shape("SELECT 1 WHERE id IN (?, ?, ?)") == statement_shape("SELECT 1 WHERE id IN (?, ?)")
+
+    def test_parameters_redacted(self):
+        assert redact_parameters(("secret", 3)) == "[2 values redacted]"
+        assert "secret" not in redact_parameters([("secret",), ("other",)])
+
+    def test_repeated_shape_flagged(self, caplog):
+        """Test that the N+1 warning fires once per shape"""
+        stats = QueryStats(label="GET /x", n_plus_one_threshold=3)
+        with caplog.at_level(logging.WARNING, logger="database"):
+            for book_id in range(6):
+                stats.record(f"SELECT * FROM books WHERE id = {book_id}", 0.001)
+
+        assert stats.count == 6
+        assert len(stats.repeated) == 1
+        assert sum("Possible N+1" in record.message for record in caplog.records) == 1
+
+    def test_sync_endpoint_queries_counted(self, caplog):
+        """Test that threadpool queries reach the request's stats and slow ones are logged"""
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        instrument_queries(engine, slow_ms=0)
+        app = FastAPI()
+
+        @app.get("/books")
+        def books():
+            with engine.connect() as conn:
+                for book_id in range(3):
+                    conn.execute(text("SELECT :id"), {"id": book_id})
+            return {}
+
+        app.add_middleware(QueryStatsMiddleware, debug=True)
+        with caplog.at_level(logging.WARNING, logger="database"):
+            response = TestClient(app).get("/books")
+
+        assert response.headers["X-DB-Query-Count"] == "3"
+        assert response.headers["Server-Timing"].startswith("db;dur=")
+        slow = [record.message for record in caplog.records if "Slow query" in record.message]
+        assert slow and "values redacted" in slow[0]
@@ -0,0 +1,68 @@
+import pytest
+from app.core.rate_limit import gcra, MemoryBackend, SQLiteBackend, create_backend
+
+class TestGcra:
+    def test_allows_burst_then_denies(self):
+        """Test that a fresh key gets a full burst and then must wait"""
+        tat = None
+        for expected_remaining in (2, 1, 0):
+            result, tat = gcra(tat, 100.0, limit=3, period=3)
+            assert result.allowed
+            assert result.remaining == expected_remaining
+
+        result, new_tat = gcra(tat, 100.0, limit=3, period=3)
+        assert not result.allowed
+        assert new_tat is None
+        assert result.retry_after == pytest.approx(1.0)
+
+    def test_window_slides(self):
+        """Test that capacity comes back gradually, not all at once"""
+        tat = None
+        for _ in range(3):
+            _, tat = gcra(tat, 100.0, limit=3, period=3)
+
+        result, tat = gcra(tat, 101.0, limit=3, period=3)
+        assert result.allowed
+        assert result.remaining == 0
+        assert not gcra(tat, 101.0, limit=3, period=3)[0].allowed
+
+class TestBackends:
+    def test_memory_backend_evicts_recovered_keys(self):
+        """Test that keys whose window has fully passed are dropped"""
+        backend = MemoryBackend(max_entries=2)
+        for i in range(5):
+            backend.hit(f"key{i}", limit=10, period=60)
+
+        assert len(backend) == 2
+
+    def test_sqlite_backend_shared_between_instances(self, tmp_path):
+        """Test that two workers pointing at one file share a limit"""
+        path = str(tmp_path / "ratelimit.db")
+        worker_a, worker_b = SQLiteBackend(path), SQLiteBackend(path)
+
+        assert worker_a.hit("user:1", limit=2, period=60).allowed
+        assert worker_b.hit("user:1", limit=2, period=60).allowed
+        assert not worker_a.hit("user:1", limit=2, period=60).allowed
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            create_backend("redis")
+
+class TestRateLimitMiddleware:
+    def test_headers_present(self, client):
+        """Test that responses carry the standard RateLimit headers"""
+        response = client.get("/")
+
+        assert response.headers["RateLimit-Limit"] == "100"
+        assert int(response.headers["RateLimit-Remaining"]) == 99
+        assert response.headers["RateLimit-Policy"] == "100;w=60"
+
+    def test_route_limit_applies(self, client):
+        """Test that the stricter auth budget is reported and enforced"""
+        for _ in range(30):
+            response = client.post("/api/auth/refresh", json={"refresh_token": "x"})
+            assert response.status_code != 429
+
+        response = client.post("/api/auth/refresh", json={"refresh_token": "x"})
+        assert response.status_code == 429
+        assert "Retry-After" in response.headers
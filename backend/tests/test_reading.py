@@ -65,8 +65,8 @@ class TestReading:
         response = client.get("/api/reading/sessions", headers=auth_headers)
         assert response.status_code == status.HTTP_200_OK
         data = response.json()
-        assert isinstance(data, list)
-        assert len(data) > 0
+        assert isinstance(data["items"], list)
+        assert len(data["items"]) > 0
     
     def test_get_reading_stats(self, client, auth_headers, book_id):
         """Test getting reading statistics"""
@@ -0,0 +1,123 @@
+import pytest
+from fastapi import HTTPException
+from app.models.user import User
+from app.models.book import Book
+from app.models.reading_session import ReadingSession
+from app.api.endpoints.reading import (
+    create_reading_session, get_timer_presets, record_heartbeat, update_reading_session
+)
+from app.schemas.reading_session import ReadingHeartbeat, ReadingSessionCreate, ReadingSessionUpdate
+from app.services.reading_speed_service import ReadingSpeedService, SPEED_ALPHA
+
+class TestReadingSpeed:
+    @pytest.fixture
+    def book(self, db):
+        """Create a user owning a 300 page book"""
+        user = User(email="speed@example.com", username="speed", hashed_password="x")
+        db.add(user)
+        db.flush()
+        book = Book(title="Book", filename="speed.pdf", file_path="speed.pdf",
+                    owner_id=user.id, total_pages=300, current_page=100)
+        db.add(book)
+        db.flush()
+        return book
+    
+    def test_first_session_sets_estimate(self, db, book):
+        """Test that the first sample becomes the estimate"""
+        ReadingSpeedService.record_session(db, book.owner_id, book.id, pages=20, minutes=10)
+        db.flush()
+        
+        speed = ReadingSpeedService.get_speed(db, book.owner_id, book.id)
+        assert speed.samples == 1
+        assert speed.pages_per_minute == pytest.approx(2.0)
+    
+    def test_estimate_is_exponentially_weighted(self, db, book):
+        """Test that later sessions move the estimate by SPEED_ALPHA"""
+        ReadingSpeedService.record_session(db, book.owner_id, book.id, pages=20, minutes=10)
+        db.flush()
+        ReadingSpeedService.record_session(db, book.owner_id, book.id, pages=10, minutes=10)
+        db.flush()
+        
+        speed = ReadingSpeedService.get_speed(db, book.owner_id, book.id)
+        assert speed.samples == 2
+        assert speed.pages_per_minute == pytest.approx(SPEED_ALPHA * 1.0 + (1 - SPEED_ALPHA) * 2.0)
+    
+    def test_user_wide_estimate_is_fallback(self, db, book):
+        """Test that other books fall back to the user's overall speed"""
+        ReadingSpeedService.record_session(db, book.owner_id, book.id, pages=20, minutes=10)
+        db.flush()
+        
+        speed = ReadingSpeedService.get_speed(db, book.owner_id, book.id + 1)
+        assert speed is not None and speed.book_id is None
+    
+    def test_invalid_sessions_are_ignored(self, db, book):
+        """Test that empty or implausible sessions do not skew the model"""
+        assert ReadingSpeedService.record_session(db, book.owner_id, book.id, pages=0, minutes=10) is None
+        assert ReadingSpeedService.record_session(db, book.owner_id, book.id, pages=5, minutes=0) is None
+        assert ReadingSpeedService.record_session(db, book.owner_id, book.id, pages=500, minutes=1) is None
+        assert ReadingSpeedService.get_speed(db, book.owner_id, book.id) is None
+    
+    def test_eta_for_book_and_chapter(self, db, book):
+        """Test time-left estimates from the current page"""
+        ReadingSpeedService.record_session(db, book.owner_id, book.id, pages=20, minutes=10)
+        db.flush()
+        speed = ReadingSpeedService.get_speed(db, book.owner_id, book.id)
+        
+        eta = ReadingSpeedService.estimate(speed, book.current_page, book.total_pages, chapter_end_page=120)
+        assert eta["pages_left"] == 200
+        assert eta["minutes_left_book"] == 100.0
+        assert eta["minutes_left_chapter"] == 10.0
+    
+    def test_difficult_pages_slow_the_estimate(self, db, book):
+        """Test that words saved per page lower the expected speed"""
+        ReadingSpeedService.record_session(db, book.owner_id, book.id, pages=20, minutes=10, words_saved=20)
+        db.flush()
+        speed = ReadingSpeedService.get_speed(db, book.owner_id, book.id)
+        
+        assert speed.pages_per_minute > 2.0
+        assert ReadingSpeedService.effective_pages_per_minute(speed) == pytest.approx(2.0)
+    
+    def test_ending_after_heartbeats_records_speed(self, db, book):
+        """Test that a session whose end_page came from heartbeats is still folded in once"""
+        session = ReadingSession(user_id=book.owner_id, book_id=book.id, start_page=100, duration_minutes=10)
+        db.add(session)
+        db.flush()
+        # What the heartbeat flush leaves behind
+        session.end_page = 110
+        db.flush()
+        user = db.get(User, book.owner_id)
+        
+        update_reading_session(session.id, ReadingSessionUpdate(end_page=120), user, db)
+        update_reading_session(session.id, ReadingSessionUpdate(end_page=130), user, db)
+        
+        speed = ReadingSpeedService.get_speed(db, book.owner_id, book.id)
+        assert session.ended_at is not None
+        assert speed.samples == 1
+        assert speed.pages_per_minute == pytest.approx(2.0)
+    
+    def test_session_logged_finished_is_counted_once(self, db, book):
+        """Test that a session created with an end page is ended and not counted again"""
+        user = db.get(User, book.owner_id)
+        created = create_reading_session(
+            ReadingSessionCreate(book_id=book.id, start_page=100, end_page=120, duration_minutes=10), user, db
+        )
+        
+        update_reading_session(created.id, ReadingSessionUpdate(end_page=125), user, db)
+        with pytest.raises(HTTPException) as exc:
+            record_heartbeat(ReadingHeartbeat(book_id=book.id, page=130, session_id=created.id), user, db)
+        
+        assert created.ended_at is not None
+        assert ReadingSpeedService.get_speed(db, book.owner_id, book.id).samples == 1
+        assert exc.value.status_code == 409
+    
+    def test_timer_presets_are_public(self, db, book):
+        """Test that anonymous callers get the default presets"""
+        ReadingSpeedService.record_session(db, book.owner_id, book.id, pages=20, minutes=10)
+        db.flush()
+        
+        anonymous = get_timer_presets(book.id, None, db)
+        personal = get_timer_presets(book.id, db.get(User, book.owner_id), db)
+        
+        assert [preset["minutes"] for preset in anonymous] == [5, 10, 15]
+        assert all("pages" not in preset for preset in anonymous)
+        assert [preset["pages"] for preset in personal] == [10, 20, 30]
@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy.orm import Session
+from app.core.revocation import BloomFilter, RevocationList
+from app.models.revoked_token import RevokedToken
+from app.models.user import User
+
+class TestBloomFilter:
+    def test_no_false_negatives(self):
+        """Test that every added item is reported as present"""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        items = [f"jti-{i}" for i in range(1000)]
+        for item in items:
+            bloom.add(item)
+
+        assert all(item in bloom for item in items)
+
+    def test_false_positive_rate(self):
+        """Test that the false positive rate stays near the target"""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"jti-{i}")
+
+        false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+        assert false_positives < 300
+
+class TestRevocationList:
+    @pytest.fixture
+    def user(self, db):
+        user = User(email="revoke@example.com", username="revoke", hashed_password="x", is_active=True)
+        db.add(user)
+        db.flush()
+        return user
+
+    @pytest.fixture
+    def revocations(self, db):
+        return RevocationList(session_factory=lambda: Session(bind=db.connection()), sync_interval=60)
+
+    def test_local_revocation_applies_immediately(self, db, user, revocations):
+        """Test that a token revoked in this process is rejected at once"""
+        revocations.revoke(db, "a" * 32, user.id, datetime.utcnow() + timedelta(minutes=15))
+        db.flush()
+
+        assert revocations.is_revoked("a" * 32)
+        assert not revocations.is_revoked("b" * 32)
+
+    def test_sync_picks_up_other_workers(self, db, user, revocations):
+        """Test that revocations written by another worker arrive on sync"""
+        assert not revocations.is_revoked("c" * 32)
+
+        db.add(RevokedToken(jti="c" * 32, user_id=user.id, expires_at=datetime.utcnow() + timedelta(minutes=15)))
+        db.flush()
+        assert not revocations.is_revoked("c" * 32)
+
+        revocations._next_sync = 0.0
+        assert revocations.is_revoked("c" * 32)
+
+    def test_expired_revocations_are_purged(self, db, user, revocations):
+        """Test that rows for already expired tokens are dropped"""
+        db.add(RevokedToken(jti="d" * 32, user_id=user.id, expires_at=datetime.utcnow() - timedelta(minutes=1)))
+        db.flush()
+        revocations.sync()
+
+        assert db.query(RevokedToken).filter(RevokedToken.jti == "d" * 32).count() == 0
+        assert len(revocations) == 0
@@ -0,0 +1,37 @@
+import asyncio
+import time
+import pytest
+from app.core.security import PasswordHasher, HashingPoolSaturated, build_password_context
+
+class TestPasswordHasher:
+    @pytest.fixture
+    def hasher(self):
+        return PasswordHasher(build_password_context(4), workers=1, max_queue=1)
+    
+    async def test_hash_and_verify(self, hasher):
+        """Test hashing and verifying on the dedicated pool"""
+        hashed = await hasher.hash("secret")
+        assert await hasher.verify_and_update("secret", hashed) == (True, None)
+        assert (await hasher.verify_and_update("wrong", hashed))[0] is False
+        assert hasher.in_flight == 0
+    
+    async def test_cost_change_upgrades_hash(self, hasher):
+        """Test that hashes made with another cost are re-hashed on login"""
+        old_hash = build_password_context(5).hash("secret")
+        
+        valid, new_hash = await hasher.verify_and_update("secret", old_hash)
+        assert valid
+        assert new_hash.startswith("$2b$04$")
+        assert await hasher.verify_and_update("secret", new_hash) == (True, None)
+    
+    async def test_saturated_pool_sheds_load(self, hasher):
+        """Test that work beyond workers + max_queue is rejected immediately"""
+        running = [hasher._submit(time.sleep, 0.2) for _ in range(hasher.capacity)]
+        
+        with pytest.raises(HashingPoolSaturated):
+            await hasher.hash("secret")
+        assert hasher.rejected == 1
+        
+        await asyncio.gather(*running)
+        assert hasher.in_flight == 0
+        assert await hasher.hash("secret")
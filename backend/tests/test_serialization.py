@@ -0,0 +1,115 @@
+import json
+import pytest
+from datetime import datetime
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event
+from app.api.endpoints.books import SUMMARY_COLUMNS, delete_book, update_book
+from app.core.pagination import keyset_paginate
+from app.core.serialization import render_json
+from app.models.book import Book as BookModel
+from app.schemas.book import Book, BookSummary
+from app.schemas.responses import PaginatedResponse
+from app.models.user import User
+
+def make_book(**overrides) -> BookModel:
+    fields = dict(
+        id=1, title="Dune", author="Frank Herbert", filename="dune.pdf", file_path="/tmp/dune.pdf",
+        status="completed", owner_id=1, total_pages=400, current_page=12, progress=3.0,
+        created_at=datetime(2024, 1, 1, 12, 30), content="x" * 1000,
+    )
+    fields.update(overrides)
+    return BookModel(**fields)
+
+class TestRenderJson:
+    def test_model_matches_jsonable_encoder(self):
+        """Test that models render the same JSON as the default encoder"""
+        page = PaginatedResponse(
+            items=[BookSummary.model_validate(make_book())], total=1, page=1, size=20,
+            pages=1, has_next=False, has_prev=False,
+        )
+        
+        assert json.loads(render_json(page)) == jsonable_encoder(page)
+    
+    def test_plain_containers(self):
+        """Test that dicts with dates and int keys are rendered"""
+        body = json.loads(render_json({"when": datetime(2024, 1, 1), 7: [1.5, None]}))
+        
+        assert body == {"when": "2024-01-01T00:00:00", "7": [1.5, None]}
+
+class TestBookSummary:
+    def test_summary_omits_content(self):
+        """Test that list items do not carry the extracted text"""
+        summary = BookSummary.model_validate(make_book())
+        
+        assert "content" not in summary.model_dump()
+        assert Book.model_validate(make_book()).content == "x" * 1000
+
+class TestDeferredContent:
+    @staticmethod
+    def add_book(db) -> int:
+        user = User(email="defer@example.com", username="defer", hashed_password="x")
+        db.add(user)
+        db.flush()
+        book = make_book(id=None, owner_id=user.id, content="x" * 100_000)
+        db.add(book)
+        db.flush()
+        db.expunge_all()
+        return user.id
+    
+    def test_plain_query_skips_content(self, db):
+        """Test that loading a book does not pull its extracted text"""
+        self.add_book(db)
+        
+        book = db.query(BookModel).first()
+        
+        assert "content" not in book.__dict__
+        assert len(book.content) == 100_000
+    
+    def test_listing_selects_summary_columns(self, db):
+        """Test that the library listing never selects books.content"""
+        user_id = self.add_book(db)
+        statements = []
+        capture = lambda conn, cursor, statement, *args: statements.append(statement)
+        engine = db.get_bind().engine
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            query = db.query(*SUMMARY_COLUMNS).filter(BookModel.owner_id == user_id)
+            page = keyset_paginate(query, BookModel, BookSummary, None, 20)
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+        
+        assert [item.title for item in page.items] == ["Dune"]
+        assert statements and not any("books.content" in statement for statement in statements)
+    
+    def test_update_and_delete_skip_content(self, db):
+        """Test that editing and deleting a book never select books.content"""
+        user_id = self.add_book(db)
+        book_id = db.query(BookModel.id).scalar()
+        owner = db.get(User, user_id)
+        statements = []
+        capture = lambda conn, cursor, statement, *args: statements.append(statement)
+        engine = db.get_bind().engine
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            updated = update_book(book_id, {"title": "Dune Messiah", "content": "y"}, db, owner)
+            delete_book(book_id, db, owner)
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+        
+        assert isinstance(updated, BookSummary) and updated.title == "Dune Messiah"
+        assert not any("books.content" in statement for statement in statements if statement.lstrip().startswith("SELECT"))
+        assert db.query(BookModel.id).filter(BookModel.id == book_id).first() is None
+    
+    def test_update_other_users_book(self, db):
+        """Test that a book owned by someone else is not found"""
+        self.add_book(db)
+        book_id = db.query(BookModel.id).scalar()
+        stranger = User(email="other@example.com", username="other", hashed_password="x")
+        db.add(stranger)
+        db.flush()
+        
+        with pytest.raises(HTTPException) as exc:
+            update_book(book_id, {"title": "Mine now"}, db, stranger)
+        
+        assert exc.value.status_code == 404
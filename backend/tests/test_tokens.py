@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+import pytest
+from jose import jwt
+from app.core.config import settings
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+from app.services.token_service import TokenService, InvalidRefreshToken, RefreshTokenReuse
+
+class TestTokenService:
+    @pytest.fixture
+    def user(self, db):
+        user = User(email="tokens@example.com", username="tokens", hashed_password="x", is_active=True)
+        db.add(user)
+        db.flush()
+        return user
+
+    def test_access_token_claims(self, db, user):
+        """Test that access tokens carry the user id and active flag"""
+        tokens, _ = TokenService.issue_tokens(db, user)
+        payload = jwt.decode(tokens["access_token"], settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+        assert payload["sub"] == str(user.id)
+        assert payload["act"] is True
+        assert payload["typ"] == "access"
+        assert tokens["expires_in"] == settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+    def test_refresh_token_stored_hashed(self, db, user):
+        """Test that only the hash of the refresh token is persisted"""
+        tokens, record = TokenService.issue_tokens(db, user)
+
+        assert record.token_hash != tokens["refresh_token"]
+        assert len(record.token_hash) == 64
+
+    def test_rotate_replaces_token(self, db, user):
+        """Test that rotation revokes the old token within the same family"""
+        tokens, record = TokenService.issue_tokens(db, user)
+        rotated = TokenService.rotate(db, tokens["refresh_token"])
+        db.refresh(record)
+
+        assert rotated["refresh_token"] != tokens["refresh_token"]
+        assert record.revoked_at is not None
+        replacement = db.get(RefreshToken, record.replaced_by_id)
+        assert replacement.family_id == record.family_id
+        assert replacement.revoked_at is None
+
+    def test_reuse_revokes_family(self, db, user):
+        """Test that presenting a rotated token kills the whole family"""
+        tokens, record = TokenService.issue_tokens(db, user)
+        rotated = TokenService.rotate(db, tokens["refresh_token"])
+
+        with pytest.raises(RefreshTokenReuse):
+            TokenService.rotate(db, tokens["refresh_token"])
+        with pytest.raises(InvalidRefreshToken):
+            TokenService.rotate(db, rotated["refresh_token"])
+
+        active = db.query(RefreshToken).filter(
+            RefreshToken.family_id == record.family_id,
+            RefreshToken.revoked_at.is_(None)
+        ).count()
+        assert active == 0
+
+    def test_expired_token_rejected(self, db, user):
+        """Test that an expired refresh token cannot be rotated"""
+        tokens, record = TokenService.issue_tokens(db, user)
+        record.expires_at = datetime.utcnow() - timedelta(seconds=1)
+        db.flush()
+
+        with pytest.raises(InvalidRefreshToken):
+            TokenService.rotate(db, tokens["refresh_token"])
+
+    def test_unknown_token_rejected(self, db):
+        """Test that a token that was never issued is rejected"""
+        with pytest.raises(InvalidRefreshToken):
+            TokenService.rotate(db, "not-a-real-token")
@@ -1,13 +1,14 @@
 import { Link, useNavigate } from 'react-router-dom';
 import { BookOpen, User, LogOut, BarChart2 } from 'lucide-react';
 import { useAuth } from '../contexts/AuthContext';
+import { enhancedApi } from '../services/enhancedApi';
 
 const Navbar = () => {
   const { setUser } = useAuth();
   const navigate = useNavigate();
 
   const logout = () => {
-    localStorage.removeItem('token');
+    enhancedApi.logout().catch(() => {});
     setUser(null);
     navigate('/login');
   };
@@ -36,7 +36,7 @@ export function AuthProvider({ children }: AuthProviderProps) {
           const userData = await enhancedApi.getCurrentUser()
           setUser(userData)
         } catch (error) {
-          localStorage.removeItem('token')
+          enhancedApi.clearTokens()
           console.error('Auth initialization failed:', error)
         }
       }
@@ -73,7 +73,7 @@ export function AuthProvider({ children }: AuthProviderProps) {
 
   const logout = () => {
     setUser(null)
-    localStorage.removeItem('token')
+    enhancedApi.logout().catch(() => {})
     toast.info('Logged out successfully')
   }
 
@@ -1,4 +1,5 @@
 import axios from 'axios';
+import { fetchAllPages } from './pagination';
 
 const API_BASE_URL = 'http://localhost:8000';
 
@@ -29,7 +30,7 @@ export const apiService = {
   getCurrentUser: () => api.get('/api/auth/me').then(res => res.data),
 
   // Books
-  getBooks: () => api.get('/api/books').then(res => res.data),
+  getBooks: () => fetchAllPages(api, '/api/books/'),
 
   uploadBook: (file: File) => {
     const formData = new FormData();
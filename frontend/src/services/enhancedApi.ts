@@ -1,5 +1,6 @@
-import axios, { AxiosError } from 'axios';
+import axios, { AxiosError, InternalAxiosRequestConfig } from 'axios';
 import { toast } from 'sonner';
+import { fetchAllPages } from './pagination';
 
 // const API_BASE_URL = 'http://localhost:8000';
 
@@ -11,6 +12,9 @@ class EnhancedApiService {
     headers: { 'Content-Type': 'application/json' },
   });
 
+  // One refresh in flight at a time; concurrent 401s wait on the same one
+  private refreshing: Promise<string> | null = null;
+
   constructor() {
     this.api.interceptors.request.use((config) => {
       const token = localStorage.getItem('token');
@@ -20,10 +24,24 @@ class EnhancedApiService {
 
     this.api.interceptors.response.use(
       (res) => res,
-      (error: AxiosError) => {
+      async (error: AxiosError) => {
+        const original = error.config as (InternalAxiosRequestConfig & { _retried?: boolean }) | undefined;
+        const isTokenCall = /^\/api\/auth\/(login|refresh|logout)/.test(original?.url ?? '');
+        if (error.response?.status === 401 && original && !original._retried && !isTokenCall
+            && localStorage.getItem('refreshToken')) {
+          // Access tokens are short-lived: renew once and replay the request
+          original._retried = true;
+          try {
+            const token = await this.refreshAccessToken();
+            original.headers.Authorization = `Bearer ${token}`;
+            return this.api(original);
+          } catch {
+            // Refresh token expired or revoked: fall through to a full login
+          }
+        }
         const detail = (error.response?.data as any)?.detail;
         if (error.response?.status === 401) {
-          localStorage.removeItem('token');
+          this.clearTokens();
           if (!window.location.pathname.includes('/login')) {
             window.location.href = '/login';
           }
@@ -37,6 +55,30 @@ class EnhancedApiService {
     );
   }
 
+  private storeTokens(data: { access_token?: string; refresh_token?: string }) {
+    if (data.access_token) localStorage.setItem('token', data.access_token);
+    if (data.refresh_token) localStorage.setItem('refreshToken', data.refresh_token);
+  }
+
+  clearTokens() {
+    localStorage.removeItem('token');
+    localStorage.removeItem('refreshToken');
+  }
+
+  // Exchanges the stored refresh token for a new pair (the old one is rotated out)
+  private refreshAccessToken(): Promise<string> {
+    if (!this.refreshing) {
+      const refresh_token = localStorage.getItem('refreshToken');
+      this.refreshing = this.api.post('/api/auth/refresh', { refresh_token })
+        .then(({ data }) => {
+          this.storeTokens(data);
+          return data.access_token as string;
+        })
+        .finally(() => { this.refreshing = null; });
+    }
+    return this.refreshing;
+  }
+
   // AUTH: Uses URLSearchParams for OAuth2 compatibility
   async login(username: string, password: string) {
     const params = new URLSearchParams();
@@ -49,9 +91,7 @@ class EnhancedApiService {
         headers: { 'Content-Type': 'application/x-www-form-urlencoded' }
       });
       
-      if (data.access_token) {
-        localStorage.setItem('token', data.access_token);
-      }
+      this.storeTokens(data);
       return data;
     } catch (error) {
        console.error("Request blocked or failed:", error);
@@ -63,12 +103,22 @@ class EnhancedApiService {
     return (await this.api.post('/api/auth/register', payload)).data;
   }
 
+  // Revokes the access token and the refresh token family server-side
+  async logout() {
+    const refresh_token = localStorage.getItem('refreshToken');
+    try {
+      await this.api.post('/api/auth/logout', { refresh_token });
+    } finally {
+      this.clearTokens();
+    }
+  }
+
   async getCurrentUser() {
     return (await this.api.get('/api/auth/me')).data;
   }
 
   // BOOK ENDPOINTS (Kept exactly as requested)
-  async getBooks() { return (await this.api.get('/api/books/')).data; }
+  async getBooks() { return fetchAllPages(this.api, '/api/books/'); }
   async getBook(id: number) { return (await this.api.get(`/api/books/${id}`)).data; }
   async deleteBook(id: number) { return (await this.api.delete(`/api/books/${id}`)).data; }
   async getPageText(id: number, p: number) { return (await this.api.get(`/api/books/${id}/page/${p}`)).data; }
@@ -78,6 +128,12 @@ class EnhancedApiService {
     fd.append('title', title);
     return (await this.api.post('/api/books/upload', fd, { headers: { 'Content-Type': 'multipart/form-data' }})).data;
   }
+
+  // DICTIONARY & READING: whole collections, all pages
+  async getDictionaryEntries(mastered?: number) {
+    return fetchAllPages(this.api, '/api/dictionary/', mastered === undefined ? {} : { mastered });
+  }
+  async getReadingSessions() { return fetchAllPages(this.api, '/api/reading/sessions'); }
 }
 
 export const enhancedApi = new EnhancedApiService();
\ No newline at end of file
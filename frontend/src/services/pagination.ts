@@ -0,0 +1,28 @@
+import type { AxiosInstance } from 'axios';
+
+// Largest page the API serves (MAX_PAGE_SIZE on the backend)
+export const MAX_PAGE_SIZE = 100;
+
+interface Page<T> {
+  items: T[];
+  next_cursor: string | null;
+}
+
+// Collection endpoints are cursor-paginated: follow next_cursor until the
+// last page so callers get the whole collection, not just the first page
+export async function fetchAllPages<T = any>(
+  api: AxiosInstance,
+  url: string,
+  params: Record<string, unknown> = {}
+): Promise<T[]> {
+  const items: T[] = [];
+  let cursor: string | null = null;
+  do {
+    const { data }: { data: Page<T> } = await api.get(url, {
+      params: { ...params, limit: MAX_PAGE_SIZE, ...(cursor ? { cursor } : {}) },
+    });
+    items.push(...data.items);
+    cursor = data.next_cursor;
+  } while (cursor);
+  return items;
+}